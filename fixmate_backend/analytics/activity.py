@@ -0,0 +1,198 @@
+# FixMate - Activity Event Log
+#
+# Events are recorded from model signals but not inserted one by one: they
+# are queued once the writer's transaction commits and flushed with a single
+# bulk_create when the queue is full, when it is older than the flush
+# interval (checked at the end of every request), before the log is read,
+# and at process exit. The full-queue and end-of-request flushes wait until
+# no transaction is open, so a batch is never written (or rolled back) as
+# part of an unrelated caller's transaction. With ACTIVITY_FLUSH_INTERVAL = 0
+# events are written as soon as they are queued; the test runner uses that.
+#
+# The price is a loss window: events queued in a worker that is killed
+# outright (SIGKILL, OOM) are lost - at most ACTIVITY_BATCH_SIZE of them,
+# queued for ACTIVITY_FLUSH_INTERVAL seconds or until the worker's next
+# request ends. A flush that fails puts its batch back at the head of the
+# queue for the next attempt; while the database stays unavailable the
+# queue keeps at most ACTIVITY_MAX_QUEUED events and drops the oldest. The
+# log read in one worker does not include events still queued in another.
+
+import atexit
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .models import ActivityEvent
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """Process-wide queue of unsaved ActivityEvent rows"""
+
+    def __init__(self):
+        self._events = []
+        self._oldest = None
+        self._lock = threading.Lock()
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'ACTIVITY_BATCH_SIZE', 100)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 2.0)
+
+    @property
+    def max_queued(self):
+        return getattr(settings, 'ACTIVITY_MAX_QUEUED', 10000)
+
+    def add(self, event):
+        self.extend([event])
+
+    def extend(self, events):
+        with self._lock:
+            if not self._events:
+                self._oldest = time.monotonic()
+            self._events.extend(events)
+            full = len(self._events) >= self.batch_size
+        if not self.flush_interval or (full and not _in_transaction()):
+            self.try_flush()
+
+    def is_due(self):
+        return bool(self._events) and time.monotonic() - self._oldest >= self.flush_interval
+
+    def clear(self):
+        """Drop the queued events without saving them"""
+        with self._lock:
+            self._events, self._oldest = [], None
+
+    def flush(self):
+        """Insert the queued events; on failure they are queued again and the error is raised"""
+        with self._lock:
+            events, self._events = self._events, []
+            oldest = self._oldest
+        if not events:
+            return 0
+        try:
+            with transaction.atomic():  # All batches or none, so a retry cannot insert duplicates
+                ActivityEvent.objects.bulk_create(events, batch_size=self.batch_size)
+        except Exception:
+            self._requeue(events, oldest)
+            raise
+        return len(events)
+
+    def try_flush(self):
+        """flush() for callers that must not fail: a database error is logged and the events kept"""
+        try:
+            return self.flush()
+        except DatabaseError:
+            logger.exception('Activity events could not be saved; %d queued for retry', len(self._events))
+            return 0
+
+    def _requeue(self, events, oldest):
+        with self._lock:
+            self._events[:0] = events
+            self._oldest = oldest if oldest is not None else time.monotonic()
+            dropped = len(self._events) - self.max_queued
+            if dropped > 0:
+                del self._events[:dropped]
+        if dropped > 0:
+            logger.error('Activity queue is full; dropped the %d oldest events', dropped)
+
+    def __len__(self):
+        return len(self._events)
+
+
+buffer = ActivityBuffer()
+
+
+def _in_transaction():
+    return transaction.get_connection().in_atomic_block
+
+
+def record(event_type, description, user=None, provider=None):
+    """Queue an activity event; it is only kept if the surrounding transaction commits"""
+    event = ActivityEvent(
+        event_type=event_type,
+        description=description[:255],
+        user_id=getattr(user, 'pk', user),
+        provider_id=getattr(provider, 'pk', provider),
+        created_at=timezone.now(),
+    )
+    transaction.on_commit(lambda: buffer.add(event))
+
+
+def record_many(event_type, entries):
+    """
+    Queue one event per (description, user, provider) in ``entries`` with a
+    single commit hook; for set-based writes that change many rows at once.
+    """
+    now = timezone.now()
+    events = [
+        ActivityEvent(
+            event_type=event_type,
+            description=description[:255],
+            user_id=getattr(user, 'pk', user),
+            provider_id=getattr(provider, 'pk', provider),
+            created_at=now,
+        )
+        for description, user, provider in entries
+    ]
+    if events:
+        transaction.on_commit(lambda: buffer.extend(events))
+
+
+def flush():
+    return buffer.flush()
+
+
+def flush_if_due(**kwargs):
+    # Never inside someone else's atomic block: its rollback would take the batch with it
+    if buffer.is_due() and not _in_transaction():
+        buffer.try_flush()
+
+
+def flush_at_exit():
+    try:
+        buffer.flush()
+    except DatabaseError:
+        pass
+
+
+request_finished.connect(flush_if_due, dispatch_uid='analytics.activity.flush_if_due')
+atexit.register(flush_at_exit)
+
+
+def recent_events(provider=None):
+    """
+    Queryset of the visible activity stream, newest first. Only this worker's
+    queue is flushed first; other workers' queued events appear once they flush.
+    """
+    buffer.try_flush()
+    events = ActivityEvent.objects.only('id', 'event_type', 'description', 'created_at')
+    if provider is not None:
+        events = events.filter(provider=provider)
+    return events
+
+
+def prune(days=None, batch_size=5000):
+    """Delete events older than the retention window, oldest first in small batches"""
+    days = days if days is not None else getattr(settings, 'ACTIVITY_RETENTION_DAYS', 90)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = list(
+            ActivityEvent.objects.filter(created_at__lt=cutoff)
+            .order_by('created_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += ActivityEvent.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import Counter, ActivityEvent, JobRollup, RollupWatermark
+
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ('name', 'value', 'updated_at', 'reconciled_at')
+    search_fields = ('name',)
+    ordering = ('name',)
+    readonly_fields = ('name', 'value', 'updated_at', 'reconciled_at')
+
+
+@admin.register(ActivityEvent)
+class ActivityEventAdmin(admin.ModelAdmin):
+    list_display = ('event_type', 'description', 'created_at')
+    list_filter = ('event_type',)
+    ordering = ('-created_at', '-id')
+    readonly_fields = ('event_type', 'description', 'user', 'provider', 'created_at')
+
+
+@admin.register(JobRollup)
+class JobRollupAdmin(admin.ModelAdmin):
+    list_display = ('period', 'bucket', 'category', 'created', 'accepted', 'completed', 'cancelled', 'revenue')
+    list_filter = ('period', 'category')
+    ordering = ('-bucket', 'category')
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('name', 'processed_until', 'updated_at')
+    readonly_fields = ('name', 'processed_until', 'updated_at')
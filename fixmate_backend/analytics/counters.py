@@ -0,0 +1,128 @@
+# FixMate - Denormalized Counters
+#
+# The admin dashboard needs a handful of row counts on every refresh. Instead
+# of running COUNT(*) over the users, providers and jobs tables each time, the
+# counts live in the small Counter table: signals adjust them with F()
+# updates inside the writer's transaction, and reconcile() recomputes them
+# periodically (manage.py reconcile_counters) to correct any drift caused by
+# bulk updates or raw SQL that bypass signals.
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from services.models import ServiceProvider
+from jobs.models import Job
+from .models import Counter
+
+User = get_user_model()
+
+USERS_TOTAL = 'users.total'
+PROVIDERS_TOTAL = 'providers.total'
+JOBS_TOTAL = 'jobs.total'
+
+
+def provider_validation(status):
+    return f'providers.validation.{status}'
+
+
+def job_status(status):
+    return f'jobs.status.{status}'
+
+
+def counter_names():
+    """Every counter maintained by this module"""
+    names = [USERS_TOTAL, PROVIDERS_TOTAL, JOBS_TOTAL]
+    names += [provider_validation(status) for status, _ in ServiceProvider.VALIDATION_STATUS_CHOICES]
+    names += [job_status(status) for status, _ in Job.STATUS_CHOICES]
+    return names
+
+
+def adjust(deltas):
+    """
+    Apply {counter name: delta} with atomic F() updates.
+
+    Counters that do not exist yet are left alone: the first read reconciles
+    them from the tables, which already include the row being written.
+    """
+    now = timezone.now()
+    for name, delta in deltas.items():
+        if delta:
+            Counter.objects.filter(name=name).update(value=F('value') + delta, updated_at=now)
+
+
+def get_counts(names=None):
+    """Return {name: value} for the requested counters in a single query"""
+    names = list(names or counter_names())
+    counts = dict(Counter.objects.filter(name__in=names).values_list('name', 'value'))
+    if len(counts) < len(names):
+        reconcile(approximate=False)
+        counts = dict(Counter.objects.filter(name__in=names).values_list('name', 'value'))
+    return {name: counts.get(name, 0) for name in names}
+
+
+def approximate_totals():
+    """
+    Planner row estimates for the large tables, from Postgres' pg_class.reltuples.
+
+    Returns None on other databases, or when a table has never been analyzed.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    tables = {
+        User._meta.db_table: USERS_TOTAL,
+        ServiceProvider._meta.db_table: PROVIDERS_TOTAL,
+        Job._meta.db_table: JOBS_TOTAL,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)',
+            [list(tables)],
+        )
+        rows = cursor.fetchall()
+    if len(rows) < len(tables) or any(reltuples < 0 for _, reltuples in rows):
+        return None
+    return {tables[relname]: int(reltuples) for relname, reltuples in rows}
+
+
+def exact_counts():
+    """Recount everything with one grouped query per table"""
+    counts = {name: 0 for name in counter_names()}
+    counts[USERS_TOTAL] = User.objects.count()
+
+    for row in ServiceProvider.objects.order_by().values('validation_status').annotate(n=Count('id')):
+        counts[provider_validation(row['validation_status'])] = row['n']
+        counts[PROVIDERS_TOTAL] += row['n']
+
+    for row in Job.objects.order_by().values('status').annotate(n=Count('id')):
+        counts[job_status(row['status'])] = row['n']
+        counts[JOBS_TOTAL] += row['n']
+    return counts
+
+
+def reconcile(approximate=None):
+    """
+    Rewrite the counters from the source tables and return the new values.
+
+    In approximate mode (ANALYTICS_APPROXIMATE_COUNTS, Postgres only) the
+    totals come from planner statistics instead of sequential scans and the
+    per-status counters keep their signal-maintained values.
+    """
+    if approximate is None:
+        approximate = getattr(settings, 'ANALYTICS_APPROXIMATE_COUNTS', False)
+
+    counts = approximate_totals() if approximate else None
+    if counts is None:
+        counts = exact_counts()
+
+    now = timezone.now()
+    with transaction.atomic():
+        Counter.objects.bulk_create(
+            [Counter(name=name, value=value, updated_at=now, reconciled_at=now) for name, value in counts.items()],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['value', 'updated_at', 'reconciled_at'],
+        )
+    return counts
@@ -0,0 +1,133 @@
+# FixMate - Streaming Bulk Exports
+#
+# Full dumps of the main tables for offline analysis. Rows are read with
+# values_list() through iterator(chunk_size=...) (a server-side cursor on
+# Postgres), encoded as CSV or NDJSON and optionally gzipped on the fly, so
+# memory stays flat whatever the size of the table. Used by the admin
+# export endpoint and the export_data management command.
+
+import csv
+import datetime
+import io
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from services.models import ServiceProvider, Review
+from jobs.models import Job
+
+User = get_user_model()
+
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+DATASETS = {
+    'jobs': (Job, [
+        'id', 'title', 'status', 'category_id', 'category__name', 'customer_id', 'provider_id',
+        'address', 'preferred_date', 'preferred_time', 'urgency', 'estimated_price', 'final_price',
+        'created_at', 'updated_at', 'accepted_at', 'completed_at',
+    ]),
+    'reviews': (Review, [
+        'id', 'provider_id', 'customer_id', 'job_id', 'rating', 'comment', 'is_flagged', 'created_at',
+    ]),
+    'providers': (ServiceProvider, [
+        'id', 'user_id', 'business_name', 'user__email', 'service_area', 'experience_years',
+        'hourly_rate', 'rating', 'total_jobs', 'validation_status', 'is_available', 'is_active',
+        'insurance_verified', 'created_at', 'updated_at',
+    ]),
+    'users': (User, [
+        'id', 'username', 'email', 'first_name', 'last_name', 'user_type', 'is_active',
+        'is_verified', 'is_staff', 'date_joined', 'created_at',
+    ]),
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def parse_since(value):
+    """
+    Aware datetime for a ``since`` date or datetime string; a bare date means
+    midnight in the current time zone. Raises ValueError for anything else.
+    """
+    try:
+        since = parse_datetime(value) or parse_date(value)
+    except ValueError:  # Well-formed but impossible, such as 2026-13-45
+        since = None
+    if since is None:
+        raise ValueError(f'Invalid since date "{value}"')
+    if not isinstance(since, datetime.datetime):
+        since = datetime.datetime.combine(since, datetime.time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_rows(dataset, since=None):
+    """Yield value tuples for ``dataset`` in primary key order without loading model instances"""
+    model, fields = DATASETS[dataset]
+    queryset = model.objects.order_by('id')
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    return queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _encode_csv(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(fields, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    parts, size = [], 0
+    for row in rows:
+        line = encoder.encode(dict(zip(fields, row))) + '\n'
+        parts.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(parts).encode('utf-8')
+            parts, size = [], 0
+    yield ''.join(parts).encode('utf-8')
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(dataset, fmt='csv', compress=False, since=None):
+    """Return an iterator of encoded byte chunks for ``dataset``"""
+    if dataset not in DATASETS:
+        raise ValueError(f'Unknown dataset "{dataset}", choose from {", ".join(DATASETS)}')
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format "{fmt}", choose from {", ".join(FORMATS)}')
+
+    fields = DATASETS[dataset][1]
+    encode = _encode_csv if fmt == 'csv' else _encode_ndjson
+    chunks = (chunk for chunk in encode(fields, export_rows(dataset, since)) if chunk)
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(dataset, fmt, compress):
+    return f'fixmate-{dataset}.{fmt}' + ('.gz' if compress else '')
+
+
+def export_content_type(fmt, compress):
+    return 'application/gzip' if compress else FORMATS[fmt]
@@ -0,0 +1,38 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import exports
+
+
+class Command(BaseCommand):
+    help = 'Stream a full export of jobs, reviews, providers or users as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(exports.DATASETS))
+        parser.add_argument('--format', dest='fmt', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output on the fly')
+        parser.add_argument('--since', help='Only rows created at or after this date/datetime')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = exports.parse_since(options['since'])
+            except ValueError as e:
+                raise CommandError(f'--since: {e}')
+
+        chunks = exports.stream_export(options['dataset'], options['fmt'],
+                                       compress=options['gzip'], since=since)
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        written = 0
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if options['output']:
+                output.close()
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f'Wrote {written} bytes to {options["output"]}'))
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analytics import activity
+
+
+class Command(BaseCommand):
+    help = 'Delete activity events older than the retention window (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help=f'Retention in days (default: ACTIVITY_RETENTION_DAYS = {settings.ACTIVITY_RETENTION_DAYS})')
+
+    def handle(self, *args, **options):
+        deleted = activity.prune(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} activity events'))
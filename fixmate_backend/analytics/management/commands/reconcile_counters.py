@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from analytics import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized dashboard counters from the source tables (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--approximate', action='store_true', default=None,
+                            help='Use Postgres planner estimates for the table totals')
+
+    def handle(self, *args, **options):
+        before = counters.get_counts()
+        after = counters.reconcile(approximate=options['approximate'])
+        for name in sorted(after):
+            drift = after[name] - before.get(name, 0)
+            suffix = f' (drift {drift:+d})' if drift else ''
+            self.stdout.write(f'{name}: {after[name]}{suffix}')
+        self.stdout.write(self.style.SUCCESS('Counters reconciled'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from analytics import rollups
+
+
+class Command(BaseCommand):
+    help = 'Fold jobs changed since the last run into the day/week rollup tables (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Ignore the watermark and recompute every bucket')
+
+    def handle(self, *args, **options):
+        seen, written = rollups.update(rebuild=options['rebuild'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {seen} changed jobs, wrote {written} rollup buckets'))
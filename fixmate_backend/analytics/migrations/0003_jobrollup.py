@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_activityevent'),
+        ('services', '0005_review_is_flagged_and_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('processed_until', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=10)),
+                ('bucket', models.DateField()),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('accepted', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cancelled', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('accept_p50_seconds', models.FloatField(blank=True, null=True)),
+                ('accept_p90_seconds', models.FloatField(blank=True, null=True)),
+                ('complete_p50_seconds', models.FloatField(blank=True, null=True)),
+                ('complete_p90_seconds', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='services.servicecategory')),
+            ],
+            options={
+                'ordering': ['period', 'bucket', 'category'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='jobrollup',
+            constraint=models.UniqueConstraint(fields=('period', 'bucket', 'category'), name='rollup_bucket_unique'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-17 07:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_jobrollup'),
+        ('services', '0013_review_provider_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaleRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='services.servicecategory')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='stalerollup',
+            constraint=models.UniqueConstraint(fields=('category', 'week'), name='stale_rollup_unique'),
+        ),
+    ]
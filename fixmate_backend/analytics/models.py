@@ -0,0 +1,115 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Counter(models.Model):
+    """A denormalized row count kept up to date by signals (see analytics.counters)"""
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only activity stream shown on the admin and provider dashboards.
+
+    Rows are never updated; references to users and providers are kept without
+    foreign key constraints so deleting them does not rewrite the log.
+    """
+    EVENT_TYPES = [
+        ('user_registration', 'User Registration'),
+        ('provider_validation', 'Provider Validation'),
+        ('job_created', 'Job Created'),
+        ('job_completed', 'Job Completed'),
+        ('review_posted', 'Review Posted'),
+    ]
+
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    description = models.CharField(max_length=255)
+    user = models.ForeignKey('users.User', on_delete=models.DO_NOTHING, db_constraint=False,
+                             null=True, blank=True, related_name='+')
+    provider = models.ForeignKey('services.ServiceProvider', on_delete=models.DO_NOTHING, db_constraint=False,
+                                 null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='activity_created_idx'),
+            models.Index(fields=['provider', 'created_at', 'id'], name='activity_provider_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()}: {self.description}"
+
+
+class JobRollup(models.Model):
+    """
+    Pre-aggregated job metrics for one category over one day or week (see analytics.rollups).
+
+    Each metric is bucketed by the timestamp of its own event: created by
+    created_at, accepted by accepted_at, completed and revenue by
+    completed_at. Cancelled jobs are counted in their created_at bucket
+    because jobs carry no cancellation timestamp.
+    """
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+    ]
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    bucket = models.DateField()  # First day of the period (weeks start on Monday)
+    category = models.ForeignKey('services.ServiceCategory', on_delete=models.CASCADE, related_name='+')
+    created = models.PositiveIntegerField(default=0)
+    accepted = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    cancelled = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    accept_p50_seconds = models.FloatField(blank=True, null=True)
+    accept_p90_seconds = models.FloatField(blank=True, null=True)
+    complete_p50_seconds = models.FloatField(blank=True, null=True)
+    complete_p90_seconds = models.FloatField(blank=True, null=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['period', 'bucket', 'category']
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'bucket', 'category'], name='rollup_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.bucket} category {self.category_id}"
+
+
+class RollupWatermark(models.Model):
+    """How far into Job.updated_at the rollups have been brought up to date"""
+    name = models.CharField(max_length=100, primary_key=True)
+    processed_until = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.processed_until}"
+
+
+class StaleRollup(models.Model):
+    """
+    A (category, week) bucket that lost jobs the watermark can't see: a job was
+    deleted, or moved out of the bucket by a change of category or timestamp.
+    Recorded by analytics.signals and consumed by the next rollups.update().
+    """
+    category = models.ForeignKey('services.ServiceCategory', on_delete=models.DO_NOTHING, db_constraint=False,
+                                 related_name='+')
+    week = models.DateField()  # Monday of the week
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'week'], name='stale_rollup_unique'),
+        ]
+
+    def __str__(self):
+        return f"week {self.week} category {self.category_id}"
@@ -0,0 +1,201 @@
+# FixMate - Job Time-Series Rollups
+#
+# Marketplace charts read per-category day and week buckets from the
+# JobRollup table instead of scanning jobs. update() is run periodically
+# (manage.py rollup_jobs): it looks at the jobs whose updated_at moved past
+# the stored watermark, works out which (category, week) buckets they touch
+# and recomputes only those buckets, days included, from the source rows.
+# A deleted job, or one moved to another category or week, leaves nothing
+# behind for the watermark to find, so analytics.signals records the
+# buckets it left as StaleRollup rows and update() recomputes those too.
+# (QuerySet.update() and raw SQL send no signals; use --rebuild after
+# rewriting jobs that way.) The watermark trails the clock by ANALYTICS_ROLLUP_SETTLE_SECONDS so rows
+# from transactions that commit late are not skipped.
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs.models import Job
+from .models import JobRollup, RollupWatermark, StaleRollup
+
+WATERMARK = 'jobs'
+
+FIELDS = ('category_id', 'status', 'created_at', 'accepted_at', 'completed_at', 'final_price')
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def bucket_start(value, period):
+    day = timezone.localtime(value).date()
+    return week_start(day) if period == 'week' else day
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not values:
+        return None
+    rank = (len(values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def _day_range(first_day, last_day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(first_day, time.min), tz)
+    end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _touched_weeks(row):
+    category_id, _, created_at, accepted_at, completed_at, _ = row
+    for value in (created_at, accepted_at, completed_at):
+        if value is not None:
+            yield category_id, bucket_start(value, 'week')
+
+
+def touched_weeks(row):
+    """The (category_id, week) buckets a job row of FIELDS values counts in"""
+    return set(_touched_weeks(row))
+
+
+def mark_stale(buckets):
+    """Have the next update() recompute these (category_id, week) buckets"""
+    if buckets:
+        StaleRollup.objects.bulk_create(
+            [StaleRollup(category_id=category_id, week=week) for category_id, week in buckets],
+            ignore_conflicts=True,
+        )
+
+
+def aggregate(rows, keep):
+    """
+    Fold job rows into {(period, bucket, category_id): metrics}.
+
+    Only buckets for which ``keep(period, bucket, category_id)`` is true are
+    produced, so rows fetched for a wider range cannot leak partial buckets.
+    """
+    buckets = defaultdict(lambda: {
+        'created': 0, 'accepted': 0, 'completed': 0, 'cancelled': 0,
+        'revenue': Decimal('0'), 'accept': [], 'complete': [],
+    })
+
+    def add(value, category_id, metric, amount=1):
+        for period in ('day', 'week'):
+            key = (period, bucket_start(value, period), category_id)
+            if keep(*key):
+                if isinstance(amount, list):
+                    buckets[key][metric].extend(amount)
+                else:
+                    buckets[key][metric] += amount
+
+    for category_id, status, created_at, accepted_at, completed_at, final_price in rows:
+        add(created_at, category_id, 'created')
+        if status == 'cancelled':
+            add(created_at, category_id, 'cancelled')
+        if accepted_at is not None:
+            add(accepted_at, category_id, 'accepted')
+            add(accepted_at, category_id, 'accept', [(accepted_at - created_at).total_seconds()])
+        if completed_at is not None and status == 'completed':
+            add(completed_at, category_id, 'completed')
+            if final_price is not None:
+                add(completed_at, category_id, 'revenue', final_price)
+            if accepted_at is not None:
+                add(completed_at, category_id, 'complete', [(completed_at - accepted_at).total_seconds()])
+    return buckets
+
+
+def _to_rollup(key, metrics):
+    period, bucket, category_id = key
+    accept = sorted(metrics['accept'])
+    complete = sorted(metrics['complete'])
+    return JobRollup(
+        period=period, bucket=bucket, category_id=category_id,
+        created=metrics['created'], accepted=metrics['accepted'],
+        completed=metrics['completed'], cancelled=metrics['cancelled'],
+        revenue=metrics['revenue'],
+        accept_p50_seconds=percentile(accept, 50), accept_p90_seconds=percentile(accept, 90),
+        complete_p50_seconds=percentile(complete, 50), complete_p90_seconds=percentile(complete, 90),
+    )
+
+
+def recompute(weeks_by_category):
+    """Rebuild the week buckets {category_id: {week start}} and the days inside them"""
+    written = 0
+    for category_id, weeks in weeks_by_category.items():
+        start, end = _day_range(min(weeks), max(weeks) + timedelta(days=6))
+        rows = Job.objects.filter(category_id=category_id).filter(
+            Q(created_at__gte=start, created_at__lt=end)
+            | Q(accepted_at__gte=start, accepted_at__lt=end)
+            | Q(completed_at__gte=start, completed_at__lt=end)
+        ).order_by().values_list(*FIELDS).iterator(chunk_size=2000)
+
+        buckets = aggregate(rows, lambda period, bucket, _: week_start(bucket) in weeks)
+        days = [week + timedelta(days=i) for week in weeks for i in range(7)]
+        with transaction.atomic():
+            JobRollup.objects.filter(category_id=category_id).filter(
+                Q(period='week', bucket__in=weeks) | Q(period='day', bucket__in=days)
+            ).delete()
+            JobRollup.objects.bulk_create([_to_rollup(key, metrics) for key, metrics in buckets.items()])
+        written += len(buckets)
+    return written
+
+
+def update(rebuild=False):
+    """
+    Bring the rollups up to date with jobs changed since the watermark.
+
+    Returns (jobs seen, buckets written). ``rebuild`` ignores the watermark and
+    recomputes every bucket, category by category; charts keep reading the
+    previous buckets until each category's are replaced.
+    """
+    settle = getattr(settings, 'ANALYTICS_ROLLUP_SETTLE_SECONDS', 60)
+    horizon = timezone.now() - timedelta(seconds=settle)
+    watermark = None if rebuild else (
+        RollupWatermark.objects.filter(name=WATERMARK).values_list('processed_until', flat=True).first()
+    )
+
+    changed = Job.objects.filter(updated_at__lte=horizon)
+    if watermark is not None:
+        changed = changed.filter(updated_at__gt=watermark)
+
+    weeks_by_category = defaultdict(set)
+    if rebuild:
+        # Existing buckets are recomputed too, so those no job counts in any more are
+        # deleted by recompute(), in the transaction that replaces their category's buckets
+        for category_id, bucket in JobRollup.objects.order_by().values_list('category_id', 'bucket').distinct():
+            weeks_by_category[category_id].add(week_start(bucket))
+    stale = list(StaleRollup.objects.values_list('pk', 'category_id', 'week'))
+    for _, category_id, week in stale:
+        weeks_by_category[category_id].add(week)
+    seen = 0
+    for row in changed.order_by().values_list(*FIELDS).iterator(chunk_size=2000):
+        seen += 1
+        for category_id, week in _touched_weeks(row):
+            weeks_by_category[category_id].add(week)
+
+    written = recompute(weeks_by_category)
+    # Only the rows read above: one recorded meanwhile waits for the next run
+    StaleRollup.objects.filter(pk__in=[pk for pk, _, _ in stale]).delete()
+    RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={'processed_until': horizon})
+    return seen, written
+
+
+def series(period='day', since=None, until=None, category=None):
+    """Rollup rows for charts between the ``since`` and ``until`` dates, oldest bucket first"""
+    rows = JobRollup.objects.filter(period=period).order_by('bucket', 'category_id')
+    if since is not None:
+        rows = rows.filter(bucket__gte=week_start(since) if period == 'week' else since)
+    if until is not None:
+        rows = rows.filter(bucket__lte=until)
+    if category is not None:
+        rows = rows.filter(category_id=category)
+    return rows
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from services.serializers import CategoryNameField
+from .models import ActivityEvent, JobRollup
+
+class ActivityEventSerializer(serializers.ModelSerializer):
+    type = serializers.CharField(source='event_type', read_only=True)
+
+    class Meta:
+        model = ActivityEvent
+        fields = ['id', 'type', 'description', 'created_at']
+        read_only_fields = fields
+
+
+class JobRollupSerializer(serializers.ModelSerializer):
+    category_name = CategoryNameField(source='category_id')
+
+    class Meta:
+        model = JobRollup
+        fields = [
+            'period', 'bucket', 'category', 'category_name', 'created', 'accepted', 'completed',
+            'cancelled', 'revenue', 'accept_p50_seconds', 'accept_p90_seconds',
+            'complete_p50_seconds', 'complete_p90_seconds',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,126 @@
+# FixMate - Analytics Signal Handlers
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from services.models import ServiceProvider, Review
+from jobs.models import Job
+from . import activity, counters, rollups
+
+User = get_user_model()
+
+
+def _tracked_value(instance, field):
+    # Read straight from __dict__ so deferred fields (.only()/.defer()) are never loaded
+    return instance.__dict__.get(field)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.adjust({counters.USERS_TOTAL: 1})
+        activity.record(
+            'user_registration',
+            f'New user {instance.get_full_name() or instance.username} registered',
+            user=instance,
+        )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    counters.adjust({counters.USERS_TOTAL: -1})
+
+
+@receiver(post_init, sender=ServiceProvider)
+def remember_validation_status(sender, instance, **kwargs):
+    instance._counted_validation_status = _tracked_value(instance, 'validation_status')
+
+
+@receiver(post_save, sender=ServiceProvider)
+def provider_saved(sender, instance, created, update_fields=None, **kwargs):
+    new = instance.validation_status
+    if created:
+        counters.adjust({counters.PROVIDERS_TOTAL: 1, counters.provider_validation(new): 1})
+    elif update_fields is None or 'validation_status' in update_fields:
+        old = instance._counted_validation_status
+        if old is not None and old != new:
+            counters.adjust({counters.provider_validation(old): -1, counters.provider_validation(new): 1})
+            if new in ('validated', 'rejected'):
+                activity.record(
+                    'provider_validation',
+                    f'Provider {instance.business_name or "#%s" % instance.pk} {new}',
+                    user=instance.user_id,
+                    provider=instance,
+                )
+    instance._counted_validation_status = new
+
+
+@receiver(post_delete, sender=ServiceProvider)
+def provider_deleted(sender, instance, **kwargs):
+    status = instance._counted_validation_status or instance.validation_status
+    counters.adjust({counters.PROVIDERS_TOTAL: -1, counters.provider_validation(status): -1})
+
+
+@receiver(post_init, sender=Job)
+def remember_job_status(sender, instance, **kwargs):
+    instance._counted_status = _tracked_value(instance, 'status')
+    instance._rollup_row = _rollup_row(instance)
+
+
+def _rollup_row(instance):
+    # None when a rollup field is deferred: the buckets the job was in are unknown
+    if any(field not in instance.__dict__ for field in rollups.FIELDS):
+        return None
+    return tuple(instance.__dict__[field] for field in rollups.FIELDS)
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, update_fields=None, **kwargs):
+    new = instance.status
+    if created:
+        counters.adjust({counters.JOBS_TOTAL: 1, counters.job_status(new): 1})
+        activity.record(
+            'job_created',
+            f'New job "{instance.title}" created',
+            user=instance.customer_id,
+            provider=instance.provider_id,
+        )
+    elif update_fields is None or 'status' in update_fields:
+        old = instance._counted_status
+        if old is not None and old != new:
+            counters.adjust({counters.job_status(old): -1, counters.job_status(new): 1})
+            if new == 'completed':
+                activity.record(
+                    'job_completed',
+                    f'Job "{instance.title}" completed',
+                    user=instance.customer_id,
+                    provider=instance.provider_id,
+                )
+    instance._counted_status = new
+
+    # Buckets the job moved out of get no changed row to find them by (analytics.rollups)
+    old_row, new_row = getattr(instance, '_rollup_row', None), _rollup_row(instance)
+    if not created and old_row is not None and new_row is not None and old_row != new_row:
+        rollups.mark_stale(rollups.touched_weeks(old_row) - rollups.touched_weeks(new_row))
+    instance._rollup_row = new_row
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    status = instance._counted_status or instance.status
+    counters.adjust({counters.JOBS_TOTAL: -1, counters.job_status(status): -1})
+    row = _rollup_row(instance)
+    if row is not None:
+        rollups.mark_stale(rollups.touched_weeks(row))
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    if created:
+        activity.record(
+            'review_posted',
+            f'New {instance.rating}-star review posted',
+            user=instance.customer_id,
+            provider=instance.provider_id,
+        )
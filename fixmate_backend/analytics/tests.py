@@ -0,0 +1,197 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.db import DatabaseError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from services.models import ServiceCategory
+from users.models import User
+from . import activity, rollups
+from .models import ActivityEvent, JobRollup, RollupWatermark, StaleRollup
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+
+@override_settings(ANALYTICS_ROLLUP_SETTLE_SECONDS=0)
+class RollupTest(TestCase):
+    """Day/week job rollups, kept current from the updated_at watermark and the stale buckets"""
+
+    monday = datetime.date(2026, 9, 7)
+
+    def setUp(self):
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.electrical = ServiceCategory.objects.create(name='Electrical', description='Wiring')
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+
+    def job(self, created, category=None, status='pending', accepted=None, completed=None, price=None):
+        job = Job.objects.create(
+            customer=self.customer, category=category or self.plumbing, title='Leak', description='',
+            address='Leeds', preferred_date=self.monday, preferred_time='morning',
+        )
+        # created_at is auto_now_add: backdate it with update(), which leaves updated_at alone
+        Job.objects.filter(pk=job.pk).update(
+            created_at=created, accepted_at=accepted, completed_at=completed, status=status, final_price=price,
+        )
+        return Job.objects.get(pk=job.pk)
+
+    def week(self, category=None, bucket=None):
+        return JobRollup.objects.filter(period='week', bucket=bucket or self.monday,
+                                        category=category or self.plumbing).first()
+
+    def test_percentile(self):
+        self.assertIsNone(rollups.percentile([], 50))
+        self.assertEqual(rollups.percentile([7], 90), 7)
+        self.assertEqual(rollups.percentile([1, 2, 3, 4], 50), 2.5)
+        self.assertAlmostEqual(rollups.percentile([0, 10, 20, 30, 40], 90), 36)
+
+    def test_aggregate(self):
+        created = at(self.monday)
+        rows = [
+            (self.plumbing.pk, 'completed', created, created + datetime.timedelta(hours=1),
+             at(self.monday + datetime.timedelta(days=8)), Decimal('80.00')),
+            (self.plumbing.pk, 'cancelled', created, None, None, None),
+        ]
+        buckets = rollups.aggregate(rows, lambda period, bucket, category_id: True)
+        first = buckets[('week', self.monday, self.plumbing.pk)]
+        self.assertEqual((first['created'], first['accepted'], first['cancelled'], first['completed']), (2, 1, 1, 0))
+        self.assertEqual(first['accept'], [3600.0])
+        # Completion and revenue land in the week of completed_at
+        second = buckets[('week', self.monday + datetime.timedelta(days=7), self.plumbing.pk)]
+        self.assertEqual((second['created'], second['completed'], second['revenue']), (0, 1, Decimal('80.00')))
+        self.assertEqual(buckets[('day', self.monday, self.plumbing.pk)]['created'], 2)
+
+        kept = rollups.aggregate(rows, lambda period, bucket, category_id: period == 'week')
+        self.assertTrue(all(period == 'week' for period, _, _ in kept))
+
+    def test_watermark(self):
+        self.job(at(self.monday))
+        self.assertEqual(rollups.update(), (1, 2))  # One job: its week and its day
+        self.assertEqual(self.week().created, 1)
+        self.assertTrue(RollupWatermark.objects.filter(name=rollups.WATERMARK).exists())
+
+        self.assertEqual(rollups.update(), (0, 0))  # Nothing changed since
+        self.job(at(self.monday + datetime.timedelta(days=1)))
+        self.assertEqual(rollups.update()[0], 1)
+        self.assertEqual(self.week().created, 2)
+
+        with override_settings(ANALYTICS_ROLLUP_SETTLE_SECONDS=3600):
+            self.job(at(self.monday))  # Updated within the settle window: left for a later run
+            self.assertEqual(rollups.update()[0], 0)
+        self.assertEqual(self.week().created, 2)
+        self.assertEqual(rollups.update(rebuild=True)[0], 3)
+        self.assertEqual(self.week().created, 3)
+
+    def test_deleted_job_is_recomputed(self):
+        keep, gone = self.job(at(self.monday)), self.job(at(self.monday))
+        rollups.update()
+        gone.delete()
+        self.assertTrue(StaleRollup.objects.filter(category=self.plumbing, week=self.monday).exists())
+        rollups.update()
+        self.assertEqual(self.week().created, 1)
+        self.assertFalse(StaleRollup.objects.exists())
+        keep.delete()
+        rollups.update()
+        self.assertIsNone(self.week())
+
+    def test_moved_job_is_recomputed(self):
+        job = self.job(at(self.monday))
+        rollups.update()
+        job.category = self.electrical
+        job.save()
+        rollups.update()
+        self.assertIsNone(self.week())  # The old category's bucket is gone, not left at 1
+        self.assertEqual(self.week(self.electrical).created, 1)
+
+        job.created_at = at(self.monday + datetime.timedelta(days=7))
+        job.save()
+        rollups.update()
+        self.assertIsNone(self.week(self.electrical))
+        self.assertEqual(self.week(self.electrical, self.monday + datetime.timedelta(days=7)).created, 1)
+
+
+    def test_rebuild_replaces_buckets_in_place(self):
+        job = self.job(at(self.monday))
+        rollups.update()
+        next_week = self.monday + datetime.timedelta(days=7)
+        Job.objects.filter(pk=job.pk).update(created_at=at(next_week))  # No signals: only a rebuild sees it
+
+        with mock.patch.object(JobRollup.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                rollups.update(rebuild=True)
+        self.assertEqual(self.week().created, 1)  # A failed rebuild leaves the previous buckets readable
+
+        rollups.update(rebuild=True)
+        self.assertIsNone(self.week())
+        self.assertFalse(JobRollup.objects.filter(period='day', bucket=self.monday).exists())
+        self.assertEqual(self.week(bucket=next_week).created, 1)
+
+@override_settings(ACTIVITY_FLUSH_INTERVAL=2.0)
+class ActivityBufferTest(TransactionTestCase):
+    """Batched activity log writes; transactions commit for real here, so the queue is flushed as in production"""
+
+    def setUp(self):
+        activity.buffer.clear()
+        self.addCleanup(activity.buffer.clear)
+
+    def record(self, count):
+        for n in range(count):
+            activity.record('job_created', f'Job {n}')
+
+    def test_queued_until_flushed(self):
+        with transaction.atomic():
+            activity.record('job_created', 'Rolled back')  # Never queued: its transaction did not commit
+            transaction.set_rollback(True)
+        self.record(2)
+        self.assertEqual((len(activity.buffer), ActivityEvent.objects.count()), (2, 0))
+        self.assertEqual([event.description for event in activity.recent_events()], ['Job 1', 'Job 0'])
+        self.assertEqual(len(activity.buffer), 0)
+
+    @override_settings(ACTIVITY_FLUSH_INTERVAL=0)
+    def test_written_when_queued(self):
+        self.record(1)
+        self.assertEqual((len(activity.buffer), ActivityEvent.objects.count()), (0, 1))
+
+    def test_not_flushed_inside_other_transactions(self):
+        self.record(2)
+        with mock.patch.object(activity.buffer, 'is_due', return_value=True):
+            with transaction.atomic():
+                activity.flush_if_due()
+                self.assertEqual(len(activity.buffer), 2)
+            activity.flush_if_due()
+        self.assertEqual((len(activity.buffer), ActivityEvent.objects.count()), (0, 2))
+
+    @override_settings(ACTIVITY_BATCH_SIZE=3)
+    def test_full_queue_is_flushed(self):
+        self.record(3)
+        self.assertEqual((len(activity.buffer), ActivityEvent.objects.count()), (0, 3))
+        with transaction.atomic():
+            activity.buffer.extend([ActivityEvent(event_type='job_created', description='Inside') for _ in range(3)])
+            self.assertEqual(len(activity.buffer), 3)  # Left for a flush outside this transaction
+
+    def test_failed_flush_keeps_the_batch(self):
+        self.record(2)
+        with mock.patch.object(ActivityEvent.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            with self.assertRaises(DatabaseError):
+                activity.flush()
+            self.record(1)  # Queued behind the batch that failed
+            with self.assertLogs('analytics.activity', 'ERROR'):
+                self.assertEqual(list(activity.recent_events()), [])
+        self.assertEqual(len(activity.buffer), 3)
+        self.assertEqual(activity.flush(), 3)
+        self.assertEqual(sorted(ActivityEvent.objects.values_list('description', flat=True)),
+                         ['Job 0', 'Job 0', 'Job 1'])
+
+    @override_settings(ACTIVITY_MAX_QUEUED=2)
+    def test_queue_is_bounded_while_failing(self):
+        self.record(3)
+        with mock.patch.object(ActivityEvent.objects, 'bulk_create', side_effect=DatabaseError('down')):
+            with self.assertLogs('analytics.activity', 'ERROR'):
+                activity.buffer.try_flush()
+        self.assertEqual(len(activity.buffer), 2)
+        activity.flush()
+        self.assertEqual(sorted(ActivityEvent.objects.values_list('description', flat=True)), ['Job 1', 'Job 2'])
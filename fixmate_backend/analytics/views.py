@@ -0,0 +1,25 @@
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from fixmate_backend.pagination import KeysetPagination
+from services.models import ServiceProvider
+from . import activity
+from .serializers import ActivityEventSerializer
+
+class ActivityViewSet(viewsets.ViewSet):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @action(detail=False, methods=['get'])
+    def recent(self, request):
+        """Activity relevant to the current user, newest first, keyset-paginated"""
+        user = request.user
+        if user.is_staff:
+            events = activity.recent_events()
+        elif user.user_type == 'provider':
+            provider_id = ServiceProvider.objects.filter(user=user).values_list('id', flat=True).first()
+            events = activity.recent_events(provider=provider_id) if provider_id else activity.recent_events().none()
+        else:
+            events = activity.recent_events().filter(user=user)
+
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(events, request, view=self)
+        return paginator.get_paginated_response(ActivityEventSerializer(page, many=True).data)
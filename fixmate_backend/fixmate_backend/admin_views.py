@@ -1,10 +1,13 @@
 # FixMate - Admin Views
 
-from rest_framework import viewsets, status, permissions
+from rest_framework import viewsets, status, permissions, serializers
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Count, Avg, Q
 from django.utils import timezone
 from datetime import timedelta
@@ -12,8 +15,18 @@ import random
 
 from services.models import ServiceProvider, Review
 from jobs.models import Job
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from analytics import activity, counters, exports, rollups
+from analytics.models import JobRollup
+from analytics.serializers import ActivityEventSerializer, JobRollupSerializer
+from moderation import queue
+from moderation.models import ReviewClaim
+from users.models import UserVerification
+from .pagination import KeysetPagination
+from . import bulk, health
 from .serializers import (
-    UserSerializer, ServiceProviderSerializer, JobSerializer, ReviewSerializer
+    UserSerializer, ServiceProviderSerializer, JobSerializer, ReviewSerializer, UserVerificationSerializer
 )
 
 User = get_user_model()
@@ -37,6 +50,93 @@ def admin_auth_verify(request):
     })
 
 
+class AdminListMixin:
+    """
+    Keyset-paginated, filtered list for the admin viewsets.
+
+    Subclasses set ``list_serializer`` (whose ``setup_eager_loading`` avoids
+    per-row queries), the query parameters accepted as exact-match filters
+    and the indexed columns allowed for ``?ordering=``. Every page costs a
+    single query.
+    """
+    list_serializer = None
+    filter_fields = {}
+    ordering_fields = ('created_at', 'id')
+    default_ordering = '-created_at'
+    page_size = 50
+    bulk_max_size = 10000
+
+    def filter_list(self, queryset, params):
+        """``queryset`` narrowed by the filter parameters; raises ValueError for a value the field can't hold"""
+        for param, field in self.filter_fields.items():
+            value = params.get(param)
+            if value in (None, ''):
+                continue
+            if isinstance(value, str) and value.lower() in ('true', 'false'):
+                value = value.lower() == 'true'
+            model_field = queryset.model._meta.get_field(field)
+            try:
+                value = model_field.to_python(value)
+            except ValidationError:
+                raise ValueError(f'Invalid value for {param}: {value!r}')
+            if model_field.choices and value not in dict(model_field.flatchoices):
+                raise ValueError(f'Invalid value for {param}: {value!r}')
+            queryset = queryset.filter(**{field: value})
+        return queryset
+
+    def get_flag(self, request, name, default):
+        """Boolean ``name`` from the request body, accepting "false"/"0" from forms; raises ValueError"""
+        value = request.data.get(name, default)
+        try:
+            return serializers.BooleanField().to_internal_value(value)
+        except serializers.ValidationError:
+            raise ValueError(f'{name} must be true or false')
+
+    def get_bulk_ids(self, request, queryset):
+        """
+        Target IDs of a bulk action: an explicit ``ids`` list, or every row
+        matching ``filter`` (the same parameters the list endpoint accepts).
+        Raises ValueError for a malformed or oversized request.
+        """
+        ids, filters = request.data.get('ids'), request.data.get('filter')
+        if ids is not None:
+            if not isinstance(ids, list):
+                raise ValueError('ids must be a list')
+            try:
+                ids = list(dict.fromkeys(int(pk) for pk in ids))
+            except (TypeError, ValueError):
+                raise ValueError('ids must be integers')
+        elif isinstance(filters, dict) and any(filters.get(param) not in (None, '') for param in self.filter_fields):
+            ids = list(self.filter_list(queryset, filters).order_by('pk').values_list('pk', flat=True)[:self.bulk_max_size + 1])
+        else:
+            raise ValueError('Provide ids or a non-empty filter')
+
+        if not ids:
+            raise ValueError('No rows selected')
+        if len(ids) > self.bulk_max_size:
+            raise ValueError(f'At most {self.bulk_max_size} rows can be changed at once')
+        return ids
+
+    def get_keyset_ordering(self, params):
+        ordering = params.get('ordering', self.default_ordering)
+        if ordering.lstrip('-') not in self.ordering_fields:
+            ordering = self.default_ordering
+        if ordering.lstrip('-') == 'id':
+            return (ordering,)
+        return (ordering, '-id' if ordering.startswith('-') else 'id')
+
+    def paginated_list(self, request, queryset):
+        try:
+            queryset = self.filter_list(queryset, request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = self.list_serializer.setup_eager_loading(queryset)
+        paginator = KeysetPagination(ordering=self.get_keyset_ordering(request.query_params),
+                                     page_size=self.page_size)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.list_serializer(page, many=True).data)
+
+
 class AdminDashboardViewSet(viewsets.ViewSet):
     """
     Admin Dashboard API endpoints
@@ -47,16 +147,18 @@ class AdminDashboardViewSet(viewsets.ViewSet):
     def stats(self, request):
         """Get dashboard statistics"""
         try:
-            total_users = User.objects.count()
-            total_providers = ServiceProvider.objects.count()
-            total_jobs = Job.objects.count()
-            pending_validations = ServiceProvider.objects.filter(validation_status='pending').count()
+            # Served from the denormalized counters table: one small query regardless of table sizes
+            counts = counters.get_counts()
 
             stats = {
-                'total_users': total_users,
-                'total_providers': total_providers,
-                'total_jobs': total_jobs,
-                'pending_validations': pending_validations
+                'total_users': counts[counters.USERS_TOTAL],
+                'total_providers': counts[counters.PROVIDERS_TOTAL],
+                'total_jobs': counts[counters.JOBS_TOTAL],
+                'pending_validations': counts[counters.provider_validation('pending')],
+                'jobs_by_status': {
+                    job_status: counts[counters.job_status(job_status)]
+                    for job_status, _ in Job.STATUS_CHOICES
+                },
             }
 
             return Response(stats)
@@ -67,41 +169,36 @@ class AdminDashboardViewSet(viewsets.ViewSet):
     def activity(self, request):
         """Get recent activity"""
         try:
-            # Generate sample recent activities
-            activities = [
-                {
-                    'id': 1,
-                    'type': 'user_registration',
-                    'description': 'New user John Doe registered',
-                    'timestamp': (timezone.now() - timedelta(hours=2)).isoformat()
-                },
-                {
-                    'id': 2,
-                    'type': 'provider_validation',
-                    'description': 'Provider ABC Plumbing validated',
-                    'timestamp': (timezone.now() - timedelta(hours=5)).isoformat()
-                },
-                {
-                    'id': 3,
-                    'type': 'job_created',
-                    'description': 'New job "Fix leaking faucet" created',
-                    'timestamp': (timezone.now() - timedelta(hours=8)).isoformat()
-                },
-                {
-                    'id': 4,
-                    'type': 'job_completed',
-                    'description': 'Job "Install new outlet" completed',
-                    'timestamp': (timezone.now() - timedelta(days=1)).isoformat()
-                },
-                {
-                    'id': 5,
-                    'type': 'review_posted',
-                    'description': 'New 5-star review posted',
-                    'timestamp': (timezone.now() - timedelta(days=1)).isoformat()
-                }
-            ]
-
-            return Response(activities)
+            paginator = KeysetPagination(ordering=('-created_at', '-id'))
+            page = paginator.paginate_queryset(activity.recent_events(), request, view=self)
+            serializer = ActivityEventSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['get'])
+    def rollups(self, request):
+        """Get pre-aggregated job metrics: ?period=day|week&since=&until=&category="""
+        period = request.query_params.get('period', 'day')
+        if period not in dict(JobRollup.PERIOD_CHOICES):
+            return Response({'error': 'period must be day or week'}, status=status.HTTP_400_BAD_REQUEST)
+
+        dates = {}
+        for param in ('since', 'until'):
+            value = request.query_params.get(param)
+            if value:
+                try:
+                    dates[param] = parse_date(value)
+                except ValueError:  # Well-formed but impossible, such as 2026-13-45
+                    dates[param] = None
+                if dates[param] is None:
+                    return Response({'error': f'Invalid {param} date'}, status=status.HTTP_400_BAD_REQUEST)
+        if 'since' not in dates:
+            dates['since'] = timezone.localdate() - timedelta(days=90 if period == 'day' else 364)
+
+        try:
+            rows = rollups.series(period, category=request.query_params.get('category') or None, **dates)
+            return Response({'period': period, 'results': JobRollupSerializer(rows, many=True).data})
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -109,42 +206,24 @@ class AdminDashboardViewSet(viewsets.ViewSet):
     def status(self, request):
         """Get system status"""
         try:
-            status_data = {
-                'database': {
-                    'status': 'healthy',
-                    'message': 'Database connection stable'
-                },
-                'api': {
-                    'status': 'healthy',
-                    'message': 'API services running normally'
-                },
-                'websocket': {
-                    'status': 'healthy',
-                    'message': 'WebSocket server active'
-                },
-                'storage': {
-                    'status': 'healthy',
-                    'message': 'Storage systems operational'
-                }
-            }
-
-            return Response(status_data)
+            force = request.query_params.get('refresh') == 'true'
+            return Response(health.get_status(force=force))
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class AdminUserViewSet(viewsets.ViewSet):
+class AdminUserViewSet(AdminListMixin, viewsets.ViewSet):
     """
     Admin User Management API endpoints
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
+    list_serializer = UserSerializer
+    filter_fields = {'user_type': 'user_type', 'is_active': 'is_active', 'is_verified': 'is_verified'}
 
     def list(self, request):
-        """Get all users"""
+        """Get users, one keyset page at a time"""
         try:
-            users = User.objects.all()
-            serializer = UserSerializer(users, many=True)
-            return Response(serializer.data)
+            return self.paginated_list(request, User.objects.all())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -177,19 +256,36 @@ class AdminUserViewSet(viewsets.ViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'])
+    def bulk_status(self, request):
+        """Activate or deactivate many users: {"ids": [...] | "filter": {...}, "is_active": bool}"""
+        try:
+            ids = self.get_bulk_ids(request, User.objects.all())
+            is_active = self.get_flag(request, 'is_active', False)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                results, _ = bulk.set_values(User.objects.all(), ids, {'is_active': is_active},
+                                             touch=['updated_at'])
+            return Response(bulk.summarize(results))
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 
-class AdminProviderViewSet(viewsets.ViewSet):
+class AdminProviderViewSet(AdminListMixin, viewsets.ViewSet):
     """
     Admin Provider Management API endpoints
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
+    list_serializer = ServiceProviderSerializer
+    filter_fields = {'validation_status': 'validation_status', 'is_available': 'is_available'}
 
     def list(self, request):
-        """Get all providers"""
+        """Get providers, one keyset page at a time"""
         try:
-            providers = ServiceProvider.objects.all()
-            serializer = ServiceProviderSerializer(providers, many=True)
-            return Response(serializer.data)
+            return self.paginated_list(request, ServiceProvider.objects.all())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -198,18 +294,21 @@ class AdminProviderViewSet(viewsets.ViewSet):
         """Get providers pending validation"""
         try:
             pending_providers = ServiceProvider.objects.filter(validation_status='pending')
-            serializer = ServiceProviderSerializer(pending_providers, many=True)
-            return Response(serializer.data)
+            return self.paginated_list(request, pending_providers)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=True, methods=['post'])
     def validate(self, request, pk=None):
         """Validate or reject provider"""
+        try:
+            approved = self.get_flag(request, 'approved', False)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             provider = ServiceProvider.objects.get(pk=pk)
-            approved = request.data.get('approved', False)
-            
+
             if approved:
                 provider.validation_status = 'validated'
                 provider.is_active = True
@@ -231,6 +330,21 @@ class AdminProviderViewSet(viewsets.ViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'])
+    def bulk_validate(self, request):
+        """Approve or reject many providers: {"ids": [...] | "filter": {...}, "approved": bool}"""
+        try:
+            ids = self.get_bulk_ids(request, ServiceProvider.objects.all())
+            approved = self.get_flag(request, 'approved', False)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = bulk.validate_providers(ids, approved)
+            return Response(bulk.summarize(results))
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=True, methods=['get'])
     def details(self, request, pk=None):
         """Get provider details"""
@@ -244,18 +358,19 @@ class AdminProviderViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class AdminJobViewSet(viewsets.ViewSet):
+class AdminJobViewSet(AdminListMixin, viewsets.ViewSet):
     """
     Admin Job Management API endpoints
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
+    list_serializer = JobSerializer
+    filter_fields = {'status': 'status', 'category': 'category_id',
+                     'customer': 'customer_id', 'provider': 'provider_id'}
 
     def list(self, request):
-        """Get all jobs"""
+        """Get jobs, one keyset page at a time"""
         try:
-            jobs = Job.objects.all()
-            serializer = JobSerializer(jobs, many=True)
-            return Response(serializer.data)
+            return self.paginated_list(request, Job.objects.all())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -284,18 +399,18 @@ class AdminJobViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class AdminReviewViewSet(viewsets.ViewSet):
+class AdminReviewViewSet(AdminListMixin, viewsets.ViewSet):
     """
     Admin Review Management API endpoints
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
+    list_serializer = ReviewSerializer
+    filter_fields = {'provider': 'provider_id', 'rating': 'rating', 'is_flagged': 'is_flagged'}
 
     def list(self, request):
-        """Get all reviews"""
+        """Get reviews, one keyset page at a time"""
         try:
-            reviews = Review.objects.all()
-            serializer = ReviewSerializer(reviews, many=True)
-            return Response(serializer.data)
+            return self.paginated_list(request, Review.objects.all())
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -328,6 +443,22 @@ class AdminReviewViewSet(viewsets.ViewSet):
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=False, methods=['post'])
+    def bulk_flag(self, request):
+        """Flag or unflag many reviews: {"ids": [...] | "filter": {...}, "is_flagged": bool}"""
+        try:
+            ids = self.get_bulk_ids(request, Review.objects.all())
+            is_flagged = self.get_flag(request, 'is_flagged', True)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                results, _ = bulk.set_values(Review.objects.all(), ids, {'is_flagged': is_flagged})
+            return Response(bulk.summarize(results))
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=True, methods=['delete'])
     def delete(self, request, pk=None):
         """Delete a review"""
@@ -341,6 +472,145 @@ class AdminReviewViewSet(viewsets.ViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class AdminReviewQueueViewSet(viewsets.ViewSet):
+    """
+    Claim-based review queue for pending verifications and provider validations.
+    Every request names the queue with ``kind`` (verification or provider).
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    item_serializers = {
+        'verification': (UserVerification, UserVerificationSerializer),
+        'provider': (ServiceProvider, ServiceProviderSerializer),
+    }
+
+    def get_kind(self, request):
+        kind = request.data.get('kind') or request.query_params.get('kind')
+        if kind not in queue.QUEUES:
+            raise ValueError(f'kind must be one of {", ".join(queue.QUEUES)}')
+        return kind
+
+    def get_ids(self, data, key, required=False):
+        ids = data.get(key)
+        if ids is None:
+            if required:
+                raise ValueError(f'{key} is required')
+            return None
+        if not isinstance(ids, list):
+            raise ValueError(f'{key} must be a list')
+        try:
+            return [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} must be integers')
+
+    def list(self, request):
+        """Queue depth: pending items and live claims per kind"""
+        try:
+            now = timezone.now()
+            claimed = dict(
+                ReviewClaim.objects.filter(expires_at__gt=now).order_by()
+                .values('kind').annotate(n=Count('id')).values_list('kind', 'n')
+            )
+            return Response({
+                kind: {'pending': queue.pending(kind).count(), 'claimed': claimed.get(kind, 0)}
+                for kind in queue.QUEUES
+            })
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        """Lease the next items: {"kind": ..., "limit": N}"""
+        try:
+            kind = self.get_kind(request)
+            max_claim = getattr(settings, 'REVIEW_QUEUE_MAX_CLAIM', 50)
+            limit = max(1, min(int(request.data.get('limit', 10)), max_claim))
+        except (TypeError, ValueError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            ids, expires_at = queue.claim(request.user, kind, limit)
+            model, serializer = self.item_serializers[kind]
+            items = {obj.pk: obj for obj in serializer.setup_eager_loading(model.objects.filter(pk__in=ids))}
+            return Response({
+                'kind': kind,
+                'lease_expires_at': expires_at,
+                'items': serializer([items[pk] for pk in ids if pk in items], many=True).data,
+            })
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'])
+    def heartbeat(self, request):
+        """Extend the current reviewer's leases: {"kind": ..., "ids": [...] (optional)}"""
+        try:
+            kind = self.get_kind(request)
+            ids = self.get_ids(request.data, 'ids')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            extended, expires_at = queue.heartbeat(request.user, kind, ids)
+            return Response({'extended': extended, 'lease_expires_at': expires_at})
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'])
+    def ack(self, request):
+        """Record decisions in bulk: {"kind": ..., "approve": [...], "reject": [...]}"""
+        try:
+            kind = self.get_kind(request)
+            approve = self.get_ids(request.data, 'approve') or []
+            reject = self.get_ids(request.data, 'reject') or []
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = queue.ack(request.user, kind, approve=approve, reject=reject)
+            return Response(bulk.summarize(results))
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """Return claimed items to the queue undecided: {"kind": ..., "ids": [...] (optional)}"""
+        try:
+            kind = self.get_kind(request)
+            ids = self.get_ids(request.data, 'ids')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            return Response({'released': queue.release(request.user, kind, ids)})
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AdminExportViewSet(viewsets.ViewSet):
+    """
+    Admin bulk export endpoints: /api/admin/exports/<dataset>/?fmt=csv|ndjson&gzip=true&since=<date>
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def list(self, request):
+        """List the available datasets and formats"""
+        return Response({'datasets': list(exports.DATASETS), 'formats': list(exports.FORMATS)})
+
+    def retrieve(self, request, pk=None):
+        """Stream a full dataset export"""
+        fmt = request.query_params.get('fmt', 'csv')
+        compress = request.query_params.get('gzip') == 'true'
+        since = request.query_params.get('since')
+        try:
+            since = exports.parse_since(since) if since else None
+            chunks = exports.stream_export(pk, fmt, compress=compress, since=since)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(chunks, content_type=exports.export_content_type(fmt, compress))
+        response['Content-Disposition'] = f'attachment; filename="{exports.export_filename(pk, fmt, compress)}"'
+        return response
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def admin_auth_verify(request):
@@ -0,0 +1,107 @@
+# FixMate - Set-Based Bulk Updates
+#
+# Admin bulk actions read the current values of the targeted rows once
+# (locking them), then write every row that actually changes with a single
+# UPDATE ... WHERE id IN (...). Per-ID outcomes are worked out from that one
+# read instead of a load/save round trip per object. QuerySet.update() does
+# not send signals, so callers apply any side effects (counters, activity,
+# related rows) themselves, again set-based, inside the same transaction.
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from jobs import matching
+from services import caching, leaderboard
+from services.models import ServiceProvider
+from users.models import UserVerification
+from analytics import activity, counters
+
+User = get_user_model()
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+
+
+def set_values(queryset, ids, values, touch=None, read=()):
+    """
+    Set ``values`` on the rows of ``queryset`` whose pk is in ``ids``.
+
+    Must run inside a transaction. ``touch`` lists auto_now fields to bump on
+    the changed rows; ``read`` lists further fields to fetch in the same
+    query, for side effects. Returns (results, before): the per-ID outcome in
+    the order of ``ids`` and {pk: {field: old value}} for the rows that
+    changed, ``read`` fields included.
+    """
+    fields = list(values)
+    rows = (
+        queryset.filter(pk__in=ids).select_for_update().order_by('pk')
+        .values_list('pk', *fields, *read)
+    )
+    target = tuple(values.values())
+    current = {row[0]: row[1:] for row in rows}
+    before = {
+        pk: dict(zip([*fields, *read], old)) for pk, old in current.items() if old[:len(fields)] != target
+    }
+
+    if before:
+        now = timezone.now()
+        queryset.model.objects.filter(pk__in=list(before)).update(
+            **values, **{field: now for field in touch or ()}
+        )
+
+    results = [
+        {'id': pk, 'result': UPDATED if pk in before else UNCHANGED if pk in current else NOT_FOUND}
+        for pk in ids
+    ]
+    return results, before
+
+
+def summarize(results):
+    summary = {UPDATED: 0, UNCHANGED: 0, NOT_FOUND: 0}
+    for row in results:
+        summary[row['result']] = summary.get(row['result'], 0) + 1
+    summary['results'] = results
+    return summary
+
+
+def validate_providers(ids, approved):
+    """Approve or reject the providers with ``ids``; returns per-ID results"""
+    new_status = 'validated' if approved else 'rejected'
+    with transaction.atomic():
+        results, before = set_values(
+            ServiceProvider.objects.all(), ids,
+            {'validation_status': new_status, 'is_active': approved},
+            touch=['updated_at'], read=['user_id', 'business_name'],
+        )
+        # update() skips the signals that maintain the dashboard counters and activity log
+        changed = {pk: old for pk, old in before.items() if old['validation_status'] != new_status}
+        deltas = {counters.provider_validation(new_status): len(changed)}
+        for old in changed.values():
+            name = counters.provider_validation(old['validation_status'])
+            deltas[name] = deltas.get(name, 0) - 1
+        counters.adjust(deltas)
+        # One event per provider, as provider_saved records for a single validation
+        activity.record_many('provider_validation', [
+            (f'Provider {old["business_name"] or "#%s" % pk} {new_status}', old['user_id'], pk)
+            for pk, old in changed.items()
+        ])
+        if before:
+            caching.bump_on_commit()
+            leaderboard.mark_dirty()
+            matching.mark_dirty(before)
+    return results
+
+
+def review_verifications(ids, approved):
+    """Approve or reject the verifications with ``ids`` and sync User.is_verified; returns per-ID results"""
+    with transaction.atomic():
+        results, before = set_values(
+            UserVerification.objects.all(), ids,
+            {'verification_status': 'approved' if approved else 'rejected'},
+            touch=['reviewed_at'],
+        )
+        if before:
+            User.objects.filter(verification__in=list(before)).update(is_verified=approved, updated_at=timezone.now())
+    return results
@@ -0,0 +1,236 @@
+# FixMate - System Health Probes
+#
+# Real, timed checks behind the admin dashboard status panel. Each probe
+# returns a dict with a status (healthy / warning / error, matching the
+# admin.css classes), a human readable message, the measured latency and
+# the thresholds it was judged against. Results are cached for a few seconds
+# so admins polling the dashboard cannot turn the health check into load.
+
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+DEFAULT_THRESHOLDS = {
+    # (warning, error) limits
+    'database_ms': (50, 250),
+    'api_ms': (100, 500),
+    'connection_usage_pct': (70, 90),
+    'websocket_ms': (50, 250),
+    'storage_ms': (50, 250),
+    'storage_free_mb': (1024, 256),  # lower is worse
+}
+
+CACHE_KEY = 'fixmate:health'
+
+_probe_lock = threading.Lock()
+
+
+def get_thresholds():
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    thresholds.update(getattr(settings, 'HEALTH_THRESHOLDS', {}))
+    return thresholds
+
+
+def _grade(value, limits, lower_is_worse=False):
+    warning, error = limits
+    if lower_is_worse:
+        return 'error' if value <= error else 'warning' if value <= warning else 'healthy'
+    return 'error' if value >= error else 'warning' if value >= warning else 'healthy'
+
+
+def _worst(*statuses):
+    order = ['healthy', 'warning', 'error']
+    return max(statuses, key=order.index)
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def probe_database(thresholds):
+    limits = thresholds['database_ms']
+    try:
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        latency = _elapsed_ms(started)
+    except Exception as e:
+        return {'status': 'error', 'message': f'Database unreachable: {e}'}
+
+    result = {
+        'status': _grade(latency, limits),
+        'message': f'Round trip {latency} ms',
+        'latency_ms': latency,
+        'thresholds': {'warning_ms': limits[0], 'error_ms': limits[1]},
+        'vendor': connection.vendor,
+    }
+
+    if connection.vendor == 'postgresql':
+        usage_limits = thresholds['connection_usage_pct']
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT (SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()),"
+                    " current_setting('max_connections')::int"
+                )
+                used, maximum = cursor.fetchone()
+        except Exception as e:
+            result['status'] = _worst(result['status'], 'warning')
+            result['message'] += f', connection usage unavailable: {e}'
+            return result
+        usage = round(used * 100 / maximum, 1)
+        result['connections'] = {
+            'used': used,
+            'max': maximum,
+            'usage_pct': usage,
+            'thresholds': {'warning_pct': usage_limits[0], 'error_pct': usage_limits[1]},
+        }
+        result['status'] = _worst(result['status'], _grade(usage, usage_limits))
+        result['message'] += f', {used}/{maximum} connections'
+    return result
+
+
+def probe_api(thresholds):
+    # Times the query behind the dashboard stats endpoint as a representative API read
+    from analytics import counters
+
+    limits = thresholds['api_ms']
+    try:
+        started = time.perf_counter()
+        counters.get_counts()
+        latency = _elapsed_ms(started)
+    except Exception as e:
+        return {'status': 'error', 'message': f'API read failed: {e}'}
+    return {
+        'status': _grade(latency, limits),
+        'message': f'Dashboard stats read {latency} ms',
+        'latency_ms': latency,
+        'thresholds': {'warning_ms': limits[0], 'error_ms': limits[1]},
+        'pid': os.getpid(),
+    }
+
+
+def _channel_layer():
+    """The default channel layer, or the result to report when there is none"""
+    try:
+        from channels.layers import get_channel_layer
+    except ImportError:
+        return None, {'status': 'warning', 'message': 'Channels is not installed'}
+    layer = get_channel_layer()
+    if layer is None:
+        return None, {'status': 'warning', 'message': 'No channel layer configured'}
+    return layer, None
+
+
+def probe_websocket(thresholds):
+    from asgiref.sync import async_to_sync
+
+    limits = thresholds['websocket_ms']
+    layer, missing = _channel_layer()
+    if layer is None:
+        return missing
+    # Probes run under _probe_lock: a layer that never delivers must not hold it
+    timeout = getattr(settings, 'HEALTH_PROBE_TIMEOUT_SECONDS', 2.0)
+
+    async def round_trip():
+        group = f'health_{uuid.uuid4().hex}'
+        channel = await layer.new_channel()
+        await layer.group_add(group, channel)
+        try:
+            started = time.perf_counter()
+            await layer.group_send(group, {'type': 'health.ping'})
+            await asyncio.wait_for(layer.receive(channel), timeout)
+            return _elapsed_ms(started)
+        finally:
+            await layer.group_discard(group, channel)
+
+    try:
+        latency = async_to_sync(round_trip)()
+    except asyncio.TimeoutError:
+        return {'status': 'error', 'message': f'Channel layer did not deliver within {timeout} s',
+                'backend': type(layer).__name__}
+    except Exception as e:
+        return {'status': 'error', 'message': f'Channel layer round trip failed: {e}'}
+    return {
+        'status': _grade(latency, limits),
+        'message': f'group_send/receive round trip {latency} ms',
+        'latency_ms': latency,
+        'thresholds': {'warning_ms': limits[0], 'error_ms': limits[1]},
+        'backend': type(layer).__name__,
+    }
+
+
+def probe_storage(thresholds):
+    limits = thresholds['storage_ms']
+    free_limits = thresholds['storage_free_mb']
+    media_root = str(settings.MEDIA_ROOT)
+    payload = os.urandom(4096)
+    try:
+        os.makedirs(media_root, exist_ok=True)
+        started = time.perf_counter()
+        with tempfile.NamedTemporaryFile(dir=media_root, prefix='.health-') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            f.seek(0)
+            if f.read() != payload:
+                return {'status': 'error', 'message': 'Storage read back different data'}
+        latency = _elapsed_ms(started)
+        free_mb = shutil.disk_usage(media_root).free // (1024 * 1024)
+    except OSError as e:
+        return {'status': 'error', 'message': f'Storage not writable: {e}'}
+
+    return {
+        'status': _worst(_grade(latency, limits), _grade(free_mb, free_limits, lower_is_worse=True)),
+        'message': f'Write/read {latency} ms, {free_mb} MB free',
+        'latency_ms': latency,
+        'free_mb': free_mb,
+        'thresholds': {
+            'warning_ms': limits[0], 'error_ms': limits[1],
+            'warning_free_mb': free_limits[0], 'error_free_mb': free_limits[1],
+        },
+    }
+
+
+PROBES = {
+    'database': probe_database,
+    'api': probe_api,
+    'websocket': probe_websocket,
+    'storage': probe_storage,
+}
+
+
+def run_probes():
+    thresholds = get_thresholds()
+    started = time.perf_counter()
+    results = {name: probe(thresholds) for name, probe in PROBES.items()}
+    results['checked_at'] = timezone.now().isoformat()
+    results['duration_ms'] = _elapsed_ms(started)
+    return results
+
+
+def get_status(force=False):
+    """Return cached probe results, running the probes at most once per HEALTH_CHECK_CACHE_SECONDS"""
+    ttl = getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5)
+    if not force:
+        cached = cache.get(CACHE_KEY)
+        if cached is not None:
+            return cached
+
+    # Concurrent pollers in this process wait for a single probe run
+    with _probe_lock:
+        cached = None if force else cache.get(CACHE_KEY)
+        if cached is None:
+            cached = run_probes()
+            cache.set(CACHE_KEY, cached, ttl)
+    return cached
@@ -4,7 +4,9 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.db import models
 from services.models import ServiceProvider, ServiceCategory, Review
+from services.serializers import CategoryNameField
 from jobs.models import Job
+from users.models import UserVerification
 
 User = get_user_model()
 
@@ -18,6 +20,10 @@ class UserSerializer(serializers.ModelSerializer):
                  'is_active', 'date_joined', 'created_at']
         read_only_fields = ['date_joined', 'created_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.only(*UserSerializer.Meta.fields)
+
 
 class ServiceProviderSerializer(serializers.ModelSerializer):
     """Service Provider serializer for admin views"""
@@ -35,12 +41,19 @@ class ServiceProviderSerializer(serializers.ModelSerializer):
                  'rating', 'total_jobs', 'validation_status', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        fields = [f for f in ServiceProviderSerializer.Meta.fields if f not in ('owner_name', 'email')]
+        return queryset.select_related('user').only(
+            *fields, 'user__first_name', 'user__last_name', 'user__email'
+        )
+
 
 class JobSerializer(serializers.ModelSerializer):
     """Job serializer for admin views"""
     customer_name = serializers.CharField(source='customer.get_full_name', read_only=True)
     provider_name = serializers.CharField(source='provider.business_name', read_only=True)
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_name = CategoryNameField(source='category_id')
     
     class Meta:
         model = Job
@@ -50,6 +63,14 @@ class JobSerializer(serializers.ModelSerializer):
                  'created_at', 'updated_at', 'accepted_at', 'completed_at']
         read_only_fields = ['created_at', 'updated_at', 'accepted_at', 'completed_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        fields = [f for f in JobSerializer.Meta.fields
+                  if f not in ('category_name', 'customer_name', 'provider_name')]
+        return queryset.select_related('customer', 'provider').only(
+            *fields, 'category', 'customer__first_name', 'customer__last_name', 'provider__business_name'
+        )
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     """Review serializer for admin views"""
@@ -63,4 +84,33 @@ class ReviewSerializer(serializers.ModelSerializer):
                  'comment', 'is_flagged', 'created_at']
         read_only_fields = ['created_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('customer', 'provider', 'job').only(
+            'id', 'rating', 'comment', 'is_flagged', 'created_at',
+            'customer__first_name', 'customer__last_name',
+            'provider__business_name', 'job__title'
+        )
+
+
+
+
+class UserVerificationSerializer(serializers.ModelSerializer):
+    """Identity verification serializer for the admin review queue"""
+    user_id = serializers.IntegerField(read_only=True)
+    user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    email = serializers.CharField(source='user.email', read_only=True)
+
+    class Meta:
+        model = UserVerification
+        fields = ['id', 'user_id', 'user_name', 'email', 'selfie_image', 'id_front_image',
+                 'id_back_image', 'verification_status', 'submitted_at']
+        read_only_fields = fields
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('user').only(
+            'id', 'user_id', 'selfie_image', 'id_front_image', 'id_back_image',
+            'verification_status', 'submitted_at',
+            'user__first_name', 'user__last_name', 'user__email'
+        )
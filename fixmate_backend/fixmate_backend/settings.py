@@ -28,6 +28,9 @@ INSTALLED_APPS = [
     'services',
     'chat',
     'jobs',
+    'frontend',
+    'analytics',
+    'moderation',
 ]
 
 MIDDLEWARE = [
@@ -62,6 +65,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'fixmate_backend.wsgi.application'
 
+TEST_RUNNER = 'fixmate_backend.test_runner.TestRunner'
+
 # Database
 if 'DATABASE_URL' in os.environ:
     # Production database (Render PostgreSQL)
@@ -85,6 +90,30 @@ else:
         }
     }
 
+# Cache: the provider listing version, dashboards and leaderboard markers must be seen by every worker,
+# so production needs a shared backend (services.checks refuses LocMemCache unless DEBUG).
+# REDIS_URL selects Redis; otherwise the database cache table (manage.py createcachetable) is used.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif DEBUG:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'fixmate_cache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -112,9 +141,27 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage',
+    },
+}
+
+# Content-hashed bundles written by `manage.py build_frontend`, cached forever by browsers
+FRONTEND_BUNDLE_DIR = BASE_DIR / 'static' / 'bundles'
+WHITENOISE_IMMUTABLE_FILE_TEST = r'^.+/bundles/.+\.[0-9a-f]{12}\.(js|css)$'
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Frontend pages (HTML/JS/CSS) live one level up from the backend
+FRONTEND_ROOT = BASE_DIR.parent
+FRONTEND_CACHE_MAX_SIZE = 512 * 1024  # Larger files are streamed with sendfile instead of cached
+FRONTEND_CACHE_CHECK_INTERVAL = 1.0  # Seconds between mtime checks of a cached file
+
 # Security settings for production
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
@@ -140,6 +187,61 @@ else:
     ]
     CORS_ALLOW_CREDENTIALS = True
 
+# Dashboard counters: use Postgres planner estimates for table totals when reconciling
+ANALYTICS_APPROXIMATE_COUNTS = os.environ.get('ANALYTICS_APPROXIMATE_COUNTS', 'False') == 'True'
+
+# Job rollups: how far behind the clock the rollup_jobs watermark stays, so late commits are picked up
+ANALYTICS_ROLLUP_SETTLE_SECONDS = 60
+
+# Activity log: events are inserted in batches and rolled off after the retention window
+ACTIVITY_BATCH_SIZE = 100
+ACTIVITY_FLUSH_INTERVAL = 2.0  # Seconds an event may wait in the queue; 0 writes each event when queued
+ACTIVITY_MAX_QUEUED = 10000  # Events kept for retry while the database is unavailable; the oldest go first
+ACTIVITY_RETENTION_DAYS = 90
+
+# Review queue: how long a reviewer holds claimed items without a heartbeat, and the most claimed at once
+REVIEW_QUEUE_LEASE_SECONDS = 300
+REVIEW_QUEUE_MAX_CLAIM = 50
+
+# Admin status panel: probe results are cached so polling cannot become load.
+# HEALTH_THRESHOLDS may override the (warning, error) limits in fixmate_backend/health.py
+HEALTH_CHECK_CACHE_SECONDS = 5
+HEALTH_PROBE_TIMEOUT_SECONDS = 2.0  # Longest wait for the channel layer round trip
+
+# Public provider listing: cached pages are invalidated by version bumps, the TTL only reaps orphans
+PROVIDER_LIST_CACHE_SECONDS = 300
+
+# Featured leaderboard: providers kept per board, and the fewest seconds between write-triggered rebuilds
+# (across all workers); False rebuilds inline when the write commits, with no retry after a claimed interval
+FEATURED_LEADERBOARD_SIZE = 12
+FEATURED_LEADERBOARD_REFRESH_INTERVAL = 60
+FEATURED_LEADERBOARD_REFRESH_IN_BACKGROUND = True
+
+# Reference data (categories, choice tables): seconds a worker trusts its snapshot before checking the version row
+REFERENCE_DATA_CHECK_INTERVAL = 5.0
+
+# Job matching: seconds before a worker fully reloads its provider snapshot, and the furthest match shown
+MATCHING_SNAPSHOT_MAX_AGE = 300
+MATCHING_MAX_DISTANCE_KM = 50
+
+# Provider job feed: default ?radius_km= around the provider's service area
+JOB_FEED_RADIUS_KM = 50
+
+# Dashboard counters and job lists: per-user cache lifetime; job writes invalidate them sooner
+DASHBOARD_CACHE_SECONDS = 60
+
+# Job photo derivatives (jobs.images): worker processes rendering them; 0 renders inline after commit
+IMAGE_PIPELINE_WORKERS = 2
+
+# Chunked job photo uploads (jobs.uploads): largest chunk and photo, photos per batch, hours an unfinished
+# upload is kept, and where chunks are assembled (None: <system temp dir>/fixmate-uploads; must be shared
+# by every worker serving the API)
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024
+UPLOAD_MAX_FILE_BYTES = 25 * 1024 * 1024
+UPLOAD_MAX_FILES = 10
+UPLOAD_SESSION_HOURS = 24
+UPLOAD_TEMP_DIR = None
+
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
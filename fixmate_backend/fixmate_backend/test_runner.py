@@ -0,0 +1,25 @@
+# FixMate - Test Runner
+#
+# Settings that hold for the whole test run. Batched side effects that would
+# otherwise be written later, from whichever test happens to be running
+# then or from another thread, are written as soon as their transaction
+# commits.
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+TEST_SETTINGS = {
+    'ACTIVITY_FLUSH_INTERVAL': 0,  # Activity events are written when queued, never by a later test's request
+    'FEATURED_LEADERBOARD_REFRESH_IN_BACKGROUND': False,  # No threads on their own database connections
+}
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_settings = override_settings(**TEST_SETTINGS)
+        self._test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_settings.disable()
+        super().teardown_test_environment(**kwargs)
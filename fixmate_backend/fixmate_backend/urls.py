@@ -5,36 +5,22 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.generic import TemplateView
-from django.http import HttpResponse
-import os
+from rest_framework.routers import DefaultRouter
+from frontend.views import serve_frontend
+from .admin_views import (
+    AdminDashboardViewSet, AdminUserViewSet, AdminProviderViewSet,
+    AdminJobViewSet, AdminReviewViewSet, AdminExportViewSet, AdminReviewQueueViewSet,
+)
 
-def serve_frontend(request, path=''):
-    """Serve the frontend HTML files"""
-    if not path:
-        path = 'index.html'
-    
-    # Path to the frontend files (one level up from backend)
-    frontend_root = os.path.join(os.path.dirname(settings.BASE_DIR))
-    file_path = os.path.join(frontend_root, path)
-    
-    if os.path.exists(file_path):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Set appropriate content type
-        if path.endswith('.html'):
-            content_type = 'text/html'
-        elif path.endswith('.css'):
-            content_type = 'text/css'
-        elif path.endswith('.js'):
-            content_type = 'application/javascript'
-        else:
-            content_type = 'text/plain'
-            
-        return HttpResponse(content, content_type=content_type)
-    else:
-        return HttpResponse('File not found', status=404)
+# Admin dashboard API used by js/admin.js
+admin_router = DefaultRouter()
+admin_router.register(r'dashboard', AdminDashboardViewSet, basename='admin-dashboard')
+admin_router.register(r'users', AdminUserViewSet, basename='admin-user')
+admin_router.register(r'providers', AdminProviderViewSet, basename='admin-provider')
+admin_router.register(r'jobs', AdminJobViewSet, basename='admin-job')
+admin_router.register(r'reviews', AdminReviewViewSet, basename='admin-review')
+admin_router.register(r'queue', AdminReviewQueueViewSet, basename='admin-queue')
+admin_router.register(r'exports', AdminExportViewSet, basename='admin-export')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -42,6 +28,8 @@ urlpatterns = [
     path('api/services/', include('services.urls')),
     path('api/jobs/', include('jobs.urls')),
     path('api/chat/', include('chat.urls')),
+    path('api/admin/', include(admin_router.urls)),
+    path('api/', include('analytics.urls')),
     path('<path:path>', serve_frontend, name='frontend'),
     path('', serve_frontend, name='home'),
 ]
@@ -0,0 +1,196 @@
+# FixMate - Frontend Asset Cache
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.json': 'application/json; charset=utf-8',
+    '.svg': 'image/svg+xml',
+}
+
+# Only text formats benefit from compression; images and fonts are already packed
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+
+# Variants smaller than this are not worth the Content-Encoding overhead
+MIN_COMPRESS_SIZE = 256
+
+
+def get_content_type(path):
+    """Return the Content-Type header for a frontend file"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or 'text/plain'
+
+
+class FrontendAsset:
+    """A single frontend file held in memory together with its compressed variants"""
+
+    def __init__(self, path, file_path, st, content=None):
+        self.path = path
+        self.file_path = file_path
+        self.mtime = st.st_mtime
+        self.size = st.st_size
+        self.content_type = get_content_type(path)
+        self.content = content
+        self.variants = {}
+
+        if content is not None:
+            self.etag = '"%s"' % hashlib.md5(content).hexdigest()
+            if self.is_compressible and len(content) >= MIN_COMPRESS_SIZE:
+                self._build_variants()
+        else:
+            # Large files are streamed from disk, so derive the validator from stat data
+            self.etag = '"%x-%x"' % (int(self.mtime * 1000000), self.size)
+
+    @property
+    def is_compressible(self):
+        return self.content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @property
+    def in_memory(self):
+        return self.content is not None
+
+    def _build_variants(self):
+        gzipped = gzip.compress(self.content, compresslevel=9, mtime=0)
+        if len(gzipped) < len(self.content):
+            self.variants['gzip'] = gzipped
+        if brotli is not None:
+            compressed = brotli.compress(self.content, quality=11)
+            if len(compressed) < len(self.content):
+                self.variants['br'] = compressed
+
+    def negotiate(self, accept_encoding):
+        """Pick the smallest body the client accepts, returning (encoding, body)"""
+        if accept_encoding and self.variants:
+            preferences = parse_accept_encoding(accept_encoding)
+            wildcard = preferences.get('*', 0.0)
+            best = None
+            for encoding in ('br', 'gzip'):  # Smallest first: the first of the highest q wins
+                q = preferences.get(encoding, wildcard)
+                if encoding in self.variants and q > 0 and (best is None or q > best[0]):
+                    best = (q, encoding)
+            if best is not None:
+                return best[1], self.variants[best[1]]
+        return None, self.content
+
+
+def parse_accept_encoding(header):
+    """
+    {coding: q} from an Accept-Encoding header (RFC 9110 12.5.3). Codings
+    are lowercased and q defaults to 1; an entry with a malformed q-value is
+    ignored rather than guessed at.
+    """
+    preferences = {}
+    for entry in header.split(','):
+        coding, *params = [part.strip() for part in entry.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value.strip())
+                except ValueError:
+                    q = None
+                if q is not None and not 0 <= q <= 1:
+                    q = None
+        if q is not None:
+            preferences[coding.lower()] = q
+    return preferences
+
+
+class FrontendAssetCache:
+    """
+    Process-local cache of the static frontend (HTML/JS/CSS at the repository root).
+
+    Files are read and compressed once, then only re-stat'ed at most every
+    ``check_interval`` seconds so edits on disk are picked up without a restart.
+    Files larger than ``max_size`` are not held in memory and are streamed
+    with ``FileResponse`` instead.
+    """
+
+    def __init__(self, root=None, max_size=None, check_interval=None):
+        self.root = str(root or getattr(settings, 'FRONTEND_ROOT', settings.BASE_DIR.parent))
+        self.max_size = max_size if max_size is not None else getattr(
+            settings, 'FRONTEND_CACHE_MAX_SIZE', 512 * 1024)
+        self.check_interval = check_interval if check_interval is not None else getattr(
+            settings, 'FRONTEND_CACHE_CHECK_INTERVAL', 1.0)
+        self._assets = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, path):
+        """Map a URL path onto a file under the frontend root, or None if it escapes it"""
+        try:
+            return safe_join(self.root, path)
+        except SuspiciousFileOperation:
+            return None
+
+    def get(self, path):
+        """Return the FrontendAsset for ``path`` or None if there is no such file"""
+        now = time.monotonic()
+        asset = self._assets.get(path)
+        if asset is not None and now - self._checked_at.get(path, 0) < self.check_interval:
+            return asset
+
+        file_path = self.resolve(path)
+        if file_path is None:
+            return None
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            self.invalidate(path)
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+
+        if asset is None or asset.mtime != st.st_mtime or asset.size != st.st_size:
+            asset = self._load(path, file_path, st)
+            with self._lock:
+                self._assets[path] = asset
+
+        self._checked_at[path] = now
+        return asset
+
+    def _load(self, path, file_path, st):
+        # Only the known page formats are pinned in memory; anything else is streamed
+        ext = os.path.splitext(path)[1].lower()
+        if st.st_size > self.max_size or ext not in CONTENT_TYPES:
+            return FrontendAsset(path, file_path, st)
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        return FrontendAsset(path, file_path, st, content)
+
+    def invalidate(self, path=None):
+        """Drop one cached asset, or the whole cache when no path is given"""
+        with self._lock:
+            if path is None:
+                self._assets.clear()
+                self._checked_at.clear()
+            else:
+                self._assets.pop(path, None)
+                self._checked_at.pop(path, None)
+
+
+asset_cache = FrontendAssetCache()
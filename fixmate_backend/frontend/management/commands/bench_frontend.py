@@ -0,0 +1,87 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from frontend.assets import asset_cache
+from frontend.views import serve_frontend
+
+
+def legacy_serve_frontend(request, path=''):
+    """The original uncached implementation, kept here as the benchmark baseline"""
+    if not path:
+        path = 'index.html'
+
+    frontend_root = os.path.join(os.path.dirname(settings.BASE_DIR))
+    file_path = os.path.join(frontend_root, path)
+
+    if os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        if path.endswith('.html'):
+            content_type = 'text/html'
+        elif path.endswith('.css'):
+            content_type = 'text/css'
+        elif path.endswith('.js'):
+            content_type = 'application/javascript'
+        else:
+            content_type = 'text/plain'
+
+        return HttpResponse(content, content_type=content_type)
+    else:
+        return HttpResponse('File not found', status=404)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark frontend file serving (requests/sec) before and after the asset cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000,
+                            help='Requests per scenario')
+        parser.add_argument('--paths', nargs='+',
+                            default=['dashboard/provider.html', 'js/provider-dashboard.js', 'css/style.css'],
+                            help='Frontend paths to request in rotation')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        count = options['requests']
+        paths = options['paths']
+        asset_cache.invalidate()
+
+        etags = {}
+        for path in paths:
+            response = serve_frontend(factory.get('/' + path), path)
+            etags[path] = response['ETag']
+
+        scenarios = [
+            ('legacy (read + decode per request)', legacy_serve_frontend, {}),
+            ('cached, identity', serve_frontend, {}),
+            ('cached, gzip', serve_frontend, {'HTTP_ACCEPT_ENCODING': 'gzip, deflate, br'}),
+            ('cached, 304 revalidation', serve_frontend, None),
+        ]
+
+        self.stdout.write(f'{count} requests per scenario over {", ".join(paths)}\n')
+        baseline = None
+        for label, view, headers in scenarios:
+            requests = []
+            for path in paths:
+                extra = headers if headers is not None else {'HTTP_IF_NONE_MATCH': etags[path]}
+                requests.append((factory.get('/' + path, **extra), path))
+
+            transferred = 0
+            started = time.perf_counter()
+            for i in range(count):
+                request, path = requests[i % len(requests)]
+                transferred += len(view(request, path).content)
+            elapsed = time.perf_counter() - started
+
+            rate = count / elapsed
+            baseline = baseline or rate
+            self.stdout.write(
+                f'{label:<38} {rate:>10.0f} req/s  {rate / baseline:>5.1f}x  '
+                f'{transferred / count / 1024:>8.1f} KiB/req'
+            )
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from frontend.minify import minify_css, minify_js
+
+
+SCRIPT_TAG = re.compile(r'<script\s+src="(?P<src>[^"]+)"\s*>\s*</script>')
+STYLE_TAG = re.compile(r'<link\s+rel="stylesheet"\s+href="(?P<src>[^"]+)"\s*/?>')
+
+# Contiguous runs of local tags (separated only by whitespace) become one bundle
+KINDS = {
+    'js': (SCRIPT_TAG, minify_js, ';\n', '<script src="{url}"></script>'),
+    'css': (STYLE_TAG, minify_css, '\n', '<link rel="stylesheet" href="{url}">'),
+}
+
+
+def is_local(src):
+    return not re.match(r'^([a-z]+:)?//', src, re.IGNORECASE)
+
+
+class Command(BaseCommand):
+    help = (
+        'Minify and concatenate the scripts and stylesheets of every frontend page '
+        'into content-hashed bundles, write a manifest and rewrite the page tags. '
+        'Run collectstatic afterwards so WhiteNoise serves the bundles as immutable.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--revert', action='store_true',
+                            help='Restore the original <script>/<link> tags and remove the bundles')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would be built without writing anything')
+
+    def handle(self, *args, **options):
+        self.root = Path(settings.FRONTEND_ROOT)
+        self.bundle_dir = Path(settings.FRONTEND_BUNDLE_DIR)
+        self.bundle_url = settings.STATIC_URL + 'bundles/'
+        self.manifest_path = self.bundle_dir / 'manifest.json'
+        self.dry_run = options['dry_run']
+
+        previous = self.load_manifest()
+        pages = self.find_pages()
+        manifest = {'pages': {}, 'bundles': {}}
+
+        for page in pages:
+            html = (self.root / page).read_text(encoding='utf-8')
+            original = self.restore(html, previous['pages'].get(page, []))
+            if options['revert']:
+                rewritten, entries = original, []
+            else:
+                rewritten, entries = self.bundle_page(page, original, manifest['bundles'])
+            if entries:
+                manifest['pages'][page] = entries
+            if rewritten != html:
+                self.stdout.write(f'{"Would rewrite" if self.dry_run else "Rewriting"} {page}')
+                if not self.dry_run:
+                    (self.root / page).write_text(rewritten, encoding='utf-8')
+
+        if self.dry_run:
+            return
+        self.write_bundles(manifest, previous)
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(manifest["bundles"])} bundles for {len(manifest["pages"])} pages'
+        ))
+
+    def load_manifest(self):
+        if not self.manifest_path.exists():
+            return {'pages': {}, 'bundles': {}}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def find_pages(self):
+        """All HTML pages under the frontend root, excluding the backend itself"""
+        backend = Path(settings.BASE_DIR).resolve()
+        pages = []
+        for path in sorted(self.root.rglob('*.html')):
+            resolved = path.resolve()
+            if backend in resolved.parents or any(part.startswith('.') for part in path.parts):
+                continue
+            pages.append(path.relative_to(self.root).as_posix())
+        return pages
+
+    def restore(self, html, entries):
+        """Put the original tags back in place of previously generated bundle tags"""
+        for entry in entries:
+            html = html.replace(entry['tag'], entry['original'])
+        return html
+
+    def bundle_page(self, page, html, bundles):
+        page_dir = (self.root / page).parent
+        entries = []
+
+        for kind, (pattern, minify, separator, template) in KINDS.items():
+            for run in self.find_runs(html, pattern):
+                sources = []
+                for match in run:
+                    source = (page_dir / match.group('src')).resolve()
+                    if not source.is_file() or self.root.resolve() not in source.parents:
+                        raise CommandError(f'{page}: cannot bundle missing file {match.group("src")}')
+                    sources.append(source)
+
+                content = separator.join(
+                    minify(source.read_text(encoding='utf-8')) for source in sources
+                )
+                # Named after the sources so pages sharing a stylesheet share the bundle
+                digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+                name = '{}.{}.{}'.format('-'.join(source.stem for source in sources), digest, kind)
+                bundles[name] = {
+                    'content': content,
+                    'sources': [source.relative_to(self.root.resolve()).as_posix() for source in sources],
+                }
+
+                start, end = run[0].start(), run[-1].end()
+                tag = template.format(url=self.bundle_url + name)
+                entries.append({'tag': tag, 'original': html[start:end], 'bundle': name})
+
+        for entry in entries:
+            html = html.replace(entry['original'], entry['tag'], 1)
+        return html, entries
+
+    def find_runs(self, html, pattern):
+        """Group local tags that are only separated by whitespace"""
+        runs, current = [], []
+        for match in pattern.finditer(html):
+            if not is_local(match.group('src')):
+                continue
+            if current and html[current[-1].end():match.start()].strip():
+                runs.append(current)
+                current = []
+            current.append(match)
+        if current:
+            runs.append(current)
+        return runs
+
+    def write_bundles(self, manifest, previous):
+        self.bundle_dir.mkdir(parents=True, exist_ok=True)
+        for name, bundle in manifest['bundles'].items():
+            path = self.bundle_dir / name
+            if not path.exists():
+                path.write_text(bundle.pop('content'), encoding='utf-8')
+                self.stdout.write(f'Wrote {name} ({path.stat().st_size} bytes)')
+            else:
+                bundle.pop('content')
+
+        for name in previous['bundles']:
+            if name not in manifest['bundles']:
+                (self.bundle_dir / name).unlink(missing_ok=True)
+
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
@@ -0,0 +1,186 @@
+# FixMate - Frontend Minifiers
+#
+# Conservative, dependency-free minifiers for the hand-written frontend.
+# They only drop comments and collapse whitespace outside of string, template
+# and regex literals, and always keep line breaks in JavaScript so automatic
+# semicolon insertion behaves exactly as in the source.
+
+# Characters after which a "/" starts a regex literal rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+    'void', 'throw', 'instanceof', 'yield', 'await',
+}
+
+
+def _skip_string(source, i, quote):
+    """Return the index just past the string literal starting at ``i``"""
+    n = len(source)
+    i += 1
+    while i < n:
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == quote or c == '\n':
+            return i + 1
+        i += 1
+    return n
+
+
+def _skip_regex(source, i):
+    """Return the index just past the regex literal starting at ``i``"""
+    n = len(source)
+    i += 1
+    in_class = False
+    while i < n:
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '\n':
+            return i
+        if in_class:
+            if c == ']':
+                in_class = False
+        elif c == '[':
+            in_class = True
+        elif c == '/':
+            return i + 1
+        i += 1
+    return n
+
+
+def _regex_allowed(out):
+    """Decide whether a "/" at this point of the output starts a regex literal"""
+    j = len(out) - 1
+    while j >= 0 and out[j] in ' \n':
+        j -= 1
+    if j < 0:
+        return True
+    if out[j] in REGEX_PRECEDERS:
+        return True
+    end = j + 1
+    while j >= 0 and (out[j].isalnum() or out[j] in '_$'):
+        j -= 1
+    return ''.join(out[j + 1:end]) in REGEX_KEYWORDS
+
+
+def minify_js(source):
+    """Strip comments and redundant whitespace from JavaScript source"""
+    out = []
+    n = len(source)
+    i = 0
+    # Each frame is either ['code', open_braces] or ['template', 0]
+    stack = [['code', 0]]
+
+    def emit_space(newline):
+        if not out or out[-1] == '\n':
+            return
+        if newline:
+            if out[-1] == ' ':
+                out[-1] = '\n'
+            else:
+                out.append('\n')
+        elif out[-1] != ' ':
+            out.append(' ')
+
+    while i < n:
+        frame = stack[-1]
+        c = source[i]
+
+        if frame[0] == 'template':
+            if c == '\\':
+                out.append(source[i:i + 2])
+                i += 2
+            elif c == '`':
+                out.append(c)
+                stack.pop()
+                i += 1
+            elif source.startswith('${', i):
+                out.append('${')
+                stack.append(['code', 0])
+                i += 2
+            else:
+                out.append(c)
+                i += 1
+            continue
+
+        if c in ' \t\r\n':
+            newline = False
+            while i < n and source[i] in ' \t\r\n':
+                newline = newline or source[i] == '\n'
+                i += 1
+            emit_space(newline)
+        elif c in '\'"':
+            end = _skip_string(source, i, c)
+            out.append(source[i:end])
+            i = end
+        elif c == '`':
+            out.append(c)
+            stack.append(['template', 0])
+            i += 1
+        elif source.startswith('//', i):
+            end = source.find('\n', i)
+            i = n if end == -1 else end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            comment = source[i:n if end == -1 else end]
+            i = n if end == -1 else end + 2
+            emit_space('\n' in comment)
+        elif c == '/' and _regex_allowed(out):
+            end = _skip_regex(source, i)
+            out.append(source[i:end])
+            i = end
+        elif c == '{':
+            frame[1] += 1
+            out.append(c)
+            i += 1
+        elif c == '}':
+            if frame[1] == 0 and len(stack) > 1:
+                # Closing brace of a ${...} substitution inside a template literal
+                stack.pop()
+            else:
+                frame[1] -= 1
+            out.append(c)
+            i += 1
+        else:
+            out.append(c)
+            i += 1
+
+    return ''.join(out).strip() + '\n'
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from a stylesheet"""
+    out = []
+    n = len(source)
+    i = 0
+    tight = set('{};,>')
+
+    while i < n:
+        c = source[i]
+        if c in '\'"':
+            end = _skip_string(source, i, c)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+        elif c in ' \t\r\n':
+            while i < n and source[i] in ' \t\r\n':
+                i += 1
+            if out and out[-1] not in tight and out[-1] != ' ' and i < n and source[i] not in tight:
+                out.append(' ')
+        elif c in tight:
+            if out and out[-1] == ' ':
+                out.pop()
+            if c == '}' and out and out[-1] == ';':
+                out.pop()
+            out.append(c)
+            i += 1
+        else:
+            out.append(c)
+            i += 1
+
+    return ''.join(out).strip() + '\n'
@@ -0,0 +1,215 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from .assets import FrontendAssetCache, asset_cache, parse_accept_encoding
+from .minify import minify_css, minify_js
+
+
+class AssetCacheTest(SimpleTestCase):
+    """In-memory frontend files, their compressed variants and encoding negotiation"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.cache = FrontendAssetCache(root=self.root, max_size=4096, check_interval=0)
+        self.write('page.html', '<p>' + 'hello ' * 200 + '</p>')
+
+    def write(self, name, text, mtime=None):
+        path = os.path.join(self.root, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_variants(self):
+        asset = self.cache.get('page.html')
+        self.assertTrue(asset.in_memory)
+        self.assertEqual(asset.content_type, 'text/html; charset=utf-8')
+        self.assertEqual(gzip.decompress(asset.variants['gzip']), asset.content)
+        self.write('tiny.css', 'a{}')
+        self.assertEqual(self.cache.get('tiny.css').variants, {})  # Below MIN_COMPRESS_SIZE
+
+    def test_reloads_changed_files(self):
+        first = self.cache.get('page.html')
+        self.assertIs(self.cache.get('page.html'), first)
+        self.write('page.html', '<p>changed</p>', mtime=first.mtime + 10)
+        second = self.cache.get('page.html')
+        self.assertEqual(second.content, b'<p>changed</p>')
+        self.assertNotEqual(second.etag, first.etag)
+        os.remove(os.path.join(self.root, 'page.html'))
+        self.assertIsNone(self.cache.get('page.html'))
+
+    def test_large_and_outside_files(self):
+        self.write('big.js', 'x' * 5000)
+        self.assertFalse(self.cache.get('big.js').in_memory)  # Streamed from disk instead
+        self.assertIsNone(self.cache.get('../etc/passwd'))
+        self.assertIsNone(self.cache.get('missing.html'))
+
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding('gzip, br;q=0.5'), {'gzip': 1.0, 'br': 0.5})
+        self.assertEqual(parse_accept_encoding('GZIP ; Q=0.0'), {'gzip': 0.0})
+        self.assertEqual(parse_accept_encoding('gzip;q=abc, br;q=2, deflate'), {'deflate': 1.0})
+
+    def test_negotiate(self):
+        asset = self.cache.get('page.html')
+        asset.variants['br'] = b'brotli'  # Whether or not brotli is installed here
+
+        def encoding(header):
+            return asset.negotiate(header)[0]
+
+        self.assertEqual(encoding('gzip, br'), 'br')
+        self.assertEqual(encoding('gzip'), 'gzip')
+        self.assertEqual(encoding('br;q=0, gzip'), 'gzip')
+        self.assertEqual(encoding('br;q=0.0, gzip'), 'gzip')
+        self.assertEqual(encoding('br; q=0, gzip'), 'gzip')
+        self.assertEqual(encoding('br;q=0.5, gzip'), 'gzip')  # Higher q wins over size
+        self.assertEqual(encoding('*'), 'br')
+        self.assertEqual(encoding('*;q=0.1, br;q=0'), 'gzip')
+        self.assertIsNone(encoding('gzip;q=0, br;q=0'))
+        self.assertIsNone(encoding('identity'))
+        self.assertEqual(asset.negotiate('')[1], asset.content)
+
+
+class ServeFrontendTest(SimpleTestCase):
+    """Conditional and compressed responses from the frontend view"""
+
+    def get(self, **headers):
+        return self.client.get('/index.html', secure=True, headers=headers)
+
+    def test_conditional_requests(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.get(if_none_match=f'W/{etag}').status_code, 304)
+        self.assertEqual(self.get(if_none_match='"other"').status_code, 200)
+
+        asset = asset_cache.get('index.html')
+        self.assertEqual(self.get(if_modified_since=http_date(asset.mtime + 60)).status_code, 304)
+        self.assertEqual(self.get(if_modified_since=http_date(asset.mtime - 60)).status_code, 200)
+
+    def test_compressed_body(self):
+        response = self.get(accept_encoding='gzip;q=1.0, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), asset_cache.get('index.html').content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+        response = self.get(accept_encoding='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_missing_file(self):
+        self.assertEqual(self.client.get('/no-such-page.html', secure=True).status_code, 404)
+
+
+class MinifyTest(SimpleTestCase):
+    """Comments and whitespace go; literals and line breaks stay"""
+
+    def test_js(self):
+        source = (
+            '// header\n'
+            'const a = "x  // y";  /* note */ let b = `t  ${ {k: 1}.k }  /* z */`;\n'
+            '\n\n'
+            'const re = /a\\/ b[/]/g; const half = a / 2 / b;\n'
+            'return /* gap */ /x  y/.test(s)\n'
+        )
+        self.assertEqual(minify_js(source), (
+            'const a = "x  // y"; let b = `t  ${ {k: 1}.k }  /* z */`;\n'
+            'const re = /a\\/ b[/]/g; const half = a / 2 / b;\n'
+            'return /x  y/.test(s)\n'
+        ))
+        # A multi-line comment keeps its line break, so automatic semicolon insertion is unchanged
+        self.assertEqual(minify_js('a = b /*\n*/ c()'), 'a = b\nc()\n')
+
+    def test_css(self):
+        source = '/* theme */\n.a  >  .b ,\n.c {\n  color : red ;\n  content: "a  /* b */";\n}\n'
+        self.assertEqual(minify_css(source), '.a>.b,.c{color : red;content: "a  /* b */"}\n')
+
+
+class BuildFrontendTest(SimpleTestCase):
+    """Content-hashed bundles for the frontend pages, and reverting them"""
+
+    page = (
+        '<html><head>\n'
+        '<link rel="stylesheet" href="css/site.css">\n'
+        '<script src="https://cdn.example.com/lib.js"></script>\n'
+        '<script src="js/a.js"></script>\n  <script src="js/b.js"></script>\n'
+        '</head></html>\n'
+    )
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        for name, text in {
+            'index.html': self.page,
+            'css/site.css': 'body {  margin : 0 ; }',
+            'js/a.js': '// a\nconst a = 1;',
+            'js/b.js': 'const b = 2; /* b */',
+        }.items():
+            (self.root / name).parent.mkdir(exist_ok=True)
+            (self.root / name).write_text(text)
+        self.bundles = self.root / 'static' / 'bundles'
+        settings = override_settings(FRONTEND_ROOT=str(self.root), FRONTEND_BUNDLE_DIR=str(self.bundles),
+                                     STATIC_URL='/static/')
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def build(self, *args):
+        out = StringIO()
+        call_command('build_frontend', *args, stdout=out)
+        return out.getvalue()
+
+    def test_build_and_revert(self):
+        self.build()
+        manifest = json.loads((self.bundles / 'manifest.json').read_text())
+        names = sorted(manifest['bundles'])
+        self.assertEqual(len(names), 2)
+        js, css = names
+        self.assertRegex(js, r'^a-b\.[0-9a-f]{12}\.js$')
+        self.assertEqual(manifest['bundles'][js]['sources'], ['js/a.js', 'js/b.js'])
+        self.assertEqual((self.bundles / js).read_text(), 'const a = 1;\n;\nconst b = 2;\n')
+        self.assertEqual((self.bundles / css).read_text(), 'body{margin : 0}\n')
+
+        html = (self.root / 'index.html').read_text()
+        self.assertIn(f'<script src="/static/bundles/{js}"></script>', html)
+        self.assertIn(f'<link rel="stylesheet" href="/static/bundles/{css}">', html)
+        self.assertIn('https://cdn.example.com/lib.js', html)  # Remote scripts are left alone
+        self.assertNotIn('js/a.js', html)
+
+        self.build()  # Rebuilding from the bundled pages gives the same result
+        self.assertEqual((self.root / 'index.html').read_text(), html)
+
+        (self.root / 'js/b.js').write_text('const b = 3;')
+        self.build()
+        self.assertFalse((self.bundles / js).exists())  # The stale bundle is removed
+        self.assertEqual(len(list(self.bundles.glob('a-b.*.js'))), 1)
+
+        self.build('--revert')
+        self.assertEqual((self.root / 'index.html').read_text(), self.page)
+        self.assertEqual([path.name for path in self.bundles.iterdir()], ['manifest.json'])
+
+    def test_dry_run(self):
+        self.assertIn('Would rewrite index.html', self.build('--dry-run'))
+        self.assertEqual((self.root / 'index.html').read_text(), self.page)
+        self.assertFalse(self.bundles.exists())
+
+    def test_missing_source(self):
+        (self.root / 'js/b.js').unlink()
+        with self.assertRaisesMessage(CommandError, 'cannot bundle missing file js/b.js'):
+            self.build()
+        self.assertEqual((self.root / 'index.html').read_text(), self.page)
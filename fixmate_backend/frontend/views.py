@@ -0,0 +1,55 @@
+from django.http import HttpResponse, HttpResponseNotModified, FileResponse
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from django.utils.cache import patch_vary_headers
+
+from .assets import asset_cache
+
+
+def _not_modified(request, asset):
+    """Evaluate If-None-Match / If-Modified-Since against a cached asset"""
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        # Weak comparison: a compressed variant shares the validator of its source
+        return '*' in etags or asset.etag in [tag.removeprefix('W/') for tag in etags]
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return if_modified_since is not None and int(asset.mtime) <= if_modified_since
+
+
+def _set_validators(response, asset):
+    response['ETag'] = asset.etag
+    response['Last-Modified'] = http_date(asset.mtime)
+    response['Cache-Control'] = 'no-cache'
+
+
+def serve_frontend(request, path=''):
+    """Serve the frontend HTML files"""
+    if not path:
+        path = 'index.html'
+
+    asset = asset_cache.get(path)
+    if asset is None:
+        return HttpResponse('File not found', status=404)
+
+    if _not_modified(request, asset):
+        response = HttpResponseNotModified()
+        _set_validators(response, asset)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    if not asset.in_memory:
+        # Large files go through wsgi.file_wrapper so the server can sendfile() them
+        response = FileResponse(open(asset.file_path, 'rb'), content_type=asset.content_type)
+        _set_validators(response, asset)
+        return response
+
+    encoding, body = asset.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    response = HttpResponse(body, content_type=asset.content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Content-Length'] = str(len(body))
+    _set_validators(response, asset)
+    if asset.variants:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,102 @@
+# FixMate - Dashboard Stats
+#
+# The customer and provider dashboards open with a row of counters and a
+# short job list. Each counter block is one query of conditional aggregates
+# (COUNT/SUM ... FILTER) over the user's jobs, plus one COUNT of pending
+# applications, instead of the client downloading every job. Results are
+# cached per customer (user id) or provider (provider id) for
+# DASHBOARD_CACHE_SECONDS; job and application writes delete the affected
+# entries once they commit (see jobs.signals), so the TTL only bounds how
+# stale a missed invalidation can get.
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Job, JobApplication
+from .serializers import JobSerializer
+
+KEY_PREFIX = 'fixmate:dashboard'
+OPEN_STATUSES = ('pending', 'accepted', 'in_progress')  # Counted as active for the customer
+ASSIGNED_STATUSES = ('accepted', 'in_progress')  # ... and for the provider
+RECENT_JOBS = 5
+UPCOMING_JOBS = 10
+
+CUSTOMER_ENTRIES = ('stats', 'recent')
+PROVIDER_ENTRIES = ('stats', 'upcoming')
+
+
+def cache_key(role, owner_id, name):
+    return f'{KEY_PREFIX}:{role}:{owner_id}:{name}'
+
+
+def cached(role, owner_id, name, build):
+    key = cache_key(role, owner_id, name)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, 'DASHBOARD_CACHE_SECONDS', 60))
+    return data
+
+
+def _money(field, condition):
+    return Coalesce(Sum(field, filter=condition), Value(Decimal('0.00')),
+                    output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _job_counts(jobs, active, earned):
+    stats = jobs.order_by().aggregate(
+        active_jobs=Count('pk', filter=Q(status__in=active)),
+        completed_jobs=Count('pk', filter=Q(status='completed')),
+        cancelled_jobs=Count('pk', filter=Q(status='cancelled')),
+        total_jobs=Count('pk'),
+        **{earned: _money('final_price', Q(status='completed'))},
+    )
+    stats[earned] = f'{stats[earned]:.2f}'  # Money as a string, as the serializers render it
+    return stats
+
+
+def customer_stats(user_id):
+    """Counters for a customer's jobs: one aggregate query plus one count of pending proposals"""
+    stats = _job_counts(Job.objects.filter(customer_id=user_id), OPEN_STATUSES, 'total_spent')
+    stats['pending_proposals'] = JobApplication.objects.filter(job__customer_id=user_id, status='pending').count()
+    return stats
+
+
+def provider_stats(provider_id):
+    """Counters for a provider's assigned jobs and their pending applications"""
+    stats = _job_counts(Job.objects.filter(provider_id=provider_id), ASSIGNED_STATUSES, 'total_earned')
+    stats['pending_proposals'] = JobApplication.objects.filter(provider_id=provider_id, status='pending').count()
+    return stats
+
+
+def customer_recent(user_id):
+    jobs = Job.objects.filter(customer_id=user_id).select_related('customer').order_by('-created_at', '-id')
+    return JobSerializer(jobs[:RECENT_JOBS], many=True).data
+
+
+def provider_upcoming(provider_id):
+    jobs = Job.objects.filter(
+        provider_id=provider_id, status__in=ASSIGNED_STATUSES, preferred_date__gte=timezone.localdate(),
+    ).select_related('customer').order_by('preferred_date', 'id')
+    return JobSerializer(jobs[:UPCOMING_JOBS], many=True).data
+
+
+def _invalidate(customer_ids, provider_ids):
+    keys = [cache_key('customer', pk, name) for pk in customer_ids for name in CUSTOMER_ENTRIES]
+    keys += [cache_key('provider', pk, name) for pk in provider_ids for name in PROVIDER_ENTRIES]
+    if keys:
+        cache.delete_many(keys)
+
+
+def invalidate_on_commit(customer_ids=(), provider_ids=()):
+    """Drop the cached dashboards of these customers (user ids) and providers once the transaction commits"""
+    customer_ids = {pk for pk in customer_ids if pk is not None}
+    provider_ids = {pk for pk in provider_ids if pk is not None}
+    if customer_ids or provider_ids:
+        transaction.on_commit(lambda: _invalidate(customer_ids, provider_ids))
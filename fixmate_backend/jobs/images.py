@@ -0,0 +1,276 @@
+# FixMate - Job Photo Derivatives
+#
+# Customers upload full-size phone photos (often 8-12 MB). Uploads are
+# streamed to a temporary file by Django's upload handlers and stored as-is;
+# once the row commits, the resized derivatives the pages actually show
+# (a thumbnail, a medium JPEG and a medium WebP) are rendered with Pillow in
+# a bounded process pool of IMAGE_PIPELINE_WORKERS processes, off the
+# request thread. Derivatives are re-encoded without EXIF (so without GPS
+# tags), after applying the EXIF orientation. Their names and dimensions are
+# recorded in the row's ``derivatives`` JSON:
+#
+#   {'status': 'ready', 'original': {'width', 'height'},
+#    'thumbnail': {'name', 'width', 'height'}, 'medium': {...}, 'webp': {...}}
+#
+# status is 'pending' until the worker finishes and 'failed' when the file
+# could not be decoded; manage.py build_image_derivatives (re)builds rows
+# that are not ready. With IMAGE_PIPELINE_WORKERS = 0 rendering runs inline.
+# The worker also re-encodes the stored original without its metadata, in
+# place, and the API serves no URL for a photo until then (see variant()).
+# A pool broken by a dying worker (say, killed for memory on a huge photo)
+# is replaced, and the photo's build is retried once on the new pool.
+
+import io
+import logging
+import multiprocessing
+import os
+import posixpath
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# No model imports at module level: pool workers import this module to run
+# render() without setting Django up.
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+READY = 'ready'
+FAILED = 'failed'
+
+# size name -> (longest side, format, extension, save options)
+SIZES = {
+    'thumbnail': (320, 'JPEG', 'jpg', {'quality': 80, 'optimize': True, 'progressive': True}),
+    'medium': (1280, 'JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'webp': (1280, 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+}
+LARGEST = max(side for side, _, _, _ in SIZES.values())
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)  # EXIF orientations that swap width and height
+
+
+def _flatten(image):
+    """RGB for JPEG/WebP output; transparency becomes white"""
+    if image.mode == 'RGB':
+        return image
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _open(source):
+    return Image.open(source if isinstance(source, str) else io.BytesIO(source))
+
+
+def clean_original(source):
+    """The full-size image upright and re-encoded in its own format, without EXIF (GPS) or other metadata"""
+    with _open(source) as image:
+        image_format = image.format if image.format in ('JPEG', 'PNG', 'WEBP') else 'JPEG'
+        icc_profile = image.info.get('icc_profile')
+        upright = ImageOps.exif_transpose(image)
+        if image_format == 'JPEG':
+            upright = _flatten(upright)
+        options = {'quality': 92} if image_format in ('JPEG', 'WEBP') else {}
+        if icc_profile:
+            options['icc_profile'] = icc_profile  # Colour, not metadata about the photo
+        buffer = io.BytesIO()
+        upright.save(buffer, image_format, **options)
+        return buffer.getvalue()
+
+
+def render(source):
+    """
+    Derivatives of the image at ``source`` (a path, or the file's bytes):
+    ({size: (data, width, height)}, (original width, original height), clean original).
+    Runs in a worker process, so it touches neither the database nor storage.
+    """
+    clean = clean_original(source)
+    with _open(source) as image:
+        width, height = image.size
+        if image.getexif().get(0x0112) in TRANSPOSED_ORIENTATIONS:
+            width, height = height, width
+        image.draft('RGB', (LARGEST, LARGEST))  # JPEG decodes straight to a reduced scale
+        image = _flatten(ImageOps.exif_transpose(image))
+
+    rendered = {}
+    resized = {}
+    for name, (side, image_format, _, options) in sorted(SIZES.items(), key=lambda item: -item[1][0]):
+        if side not in resized:
+            # Each size scales down from the smallest larger one already made
+            larger = [resized[larger_side] for larger_side in sorted(resized) if larger_side > side]
+            copy = (larger[0] if larger else image).copy()
+            copy.thumbnail((side, side), Image.Resampling.LANCZOS)
+            resized[side] = copy
+        buffer = io.BytesIO()
+        resized[side].save(buffer, image_format, **options)  # No exif= argument: metadata is dropped
+        rendered[name] = (buffer.getvalue(), *resized[side].size)
+    return rendered, (width, height), clean
+
+
+def derivative_name(name, size):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'derivatives', f'{stem}_{size}.{SIZES[size][2]}')
+
+
+def _source(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:  # Remote storage: ship the bytes to the worker
+        with storage.open(name, 'rb') as file:
+            return file.read()
+
+
+def delete_derivatives(storage, name):
+    """Remove the derivatives of image ``name``, built or not"""
+    for size in SIZES:
+        storage.delete(derivative_name(name, size))
+
+
+def _replace_original(storage, name, data):
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        storage.delete(name)
+        storage.save(name, ContentFile(data))
+        return
+    staged = f'{path}.clean'
+    with open(staged, 'wb') as file:
+        file.write(data)
+    os.replace(staged, path)  # Atomic: readers get the old file or the new one
+
+
+def _store(model, pk, name, result):
+    """Save rendered derivatives and record them on the row, unless its image has changed meanwhile"""
+    storage = model._meta.get_field('image').storage
+    try:
+        rendered, (width, height), clean = result()
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning('Could not render derivatives of %s %s (%s): %s', model.__name__, pk, name, e)
+        model.objects.filter(pk=pk, image=name).update(derivatives={'status': FAILED})
+        return False
+    if not model.objects.filter(pk=pk, image=name).exists():
+        return False  # Replaced or deleted while rendering
+    _replace_original(storage, name, clean)
+    derivatives = {'status': READY, 'original': {'width': width, 'height': height}}
+    for size, (data, size_width, size_height) in rendered.items():
+        target = derivative_name(name, size)
+        if storage.exists(target):
+            storage.delete(target)
+        derivatives[size] = {'name': storage.save(target, ContentFile(data)), 'width': size_width,
+                             'height': size_height}
+    if not model.objects.filter(pk=pk, image=name).update(derivatives=derivatives):
+        delete_derivatives(storage, name)  # Replaced or deleted while rendering
+    return True
+
+
+def _store_in_thread(model, pk, name, pool, retry, future):
+    # Done-callbacks run on the pool's management thread, which has its own connection
+    close_old_connections()
+    try:
+        _store(model, pk, name, future.result)
+    except BrokenProcessPool:
+        _discard(pool)
+        if retry:
+            logger.warning('Image worker pool broke while rendering %s %s; retrying', model.__name__, pk)
+            _submit(model, pk, name, retry=False)
+        else:
+            # Left pending for manage.py build_image_derivatives
+            logger.error('Image worker pool broke twice rendering %s %s (%s)', model.__name__, pk, name)
+    except Exception:
+        logger.exception('Storing derivatives of %s %s failed', model.__name__, pk)
+    finally:
+        connection.close()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a threaded server process would copy its locks and database connections
+            _executor = ProcessPoolExecutor(max_workers=getattr(settings, 'IMAGE_PIPELINE_WORKERS', 2),
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _discard(pool):
+    """Drop ``pool`` if it is still the current one, so the next build starts a fresh pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is pool:
+            _executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown():
+    """Wait for every queued photo, including storing its derivatives, then stop the pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def build(model, pk, name):
+    """Render the derivatives of ``name`` for row ``pk``: in the pool, or inline without workers"""
+    storage = model._meta.get_field('image').storage
+    if not getattr(settings, 'IMAGE_PIPELINE_WORKERS', 2):
+        return _store(model, pk, name, partial(render, _source(storage, name)))
+    return _submit(model, pk, name, retry=True)
+
+
+def _submit(model, pk, name, retry):
+    storage = model._meta.get_field('image').storage
+    source = _source(storage, name)
+    for attempt in (1, 2):
+        pool = executor()
+        try:
+            future = pool.submit(render, source)
+        except BrokenProcessPool:
+            _discard(pool)
+            if attempt == 2:
+                # Never raise here: builds run in on_commit, after the photo's row has committed
+                logger.error('Image worker pool unavailable; %s %s left pending', model.__name__, pk)
+                return None
+            continue
+        future.add_done_callback(partial(_store_in_thread, model, pk, name, pool, retry))
+        return future
+
+
+def build_on_commit(instance):
+    """Queue derivatives for ``instance``'s image once the current transaction commits"""
+    model, pk, name = type(instance), instance.pk, instance.image.name
+    transaction.on_commit(lambda: build(model, pk, name))
+
+
+def models_with_derivatives():
+    return [apps.get_model('jobs', 'JobImage'), apps.get_model('jobs', 'JobUpdate')]
+
+
+def variant(instance, size):
+    """
+    (url, width, height) of a derivative, or of the cleaned original for a
+    size not built; all None until the worker has stripped the original, so
+    a photo's EXIF (GPS) is never served
+    """
+    derivatives = instance.derivatives or {}
+    if not instance.image or derivatives.get('status') != READY:
+        return None, None, None
+    entry = derivatives.get(size)
+    if entry is None:
+        original = derivatives.get('original', {})
+        return instance.image.url, original.get('width'), original.get('height')
+    return instance.image.storage.url(entry['name']), entry['width'], entry['height']
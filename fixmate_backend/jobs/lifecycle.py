@@ -0,0 +1,129 @@
+# FixMate - Job Lifecycle
+#
+# A job moves pending -> accepted -> in_progress -> completed, and can be
+# cancelled at any step before completion; nothing else changes its status
+# (the serializers make status read-only). Each transition claims the job
+# row with UPDATE ... WHERE status = <the status the caller read>: of any
+# number of concurrent callers (say, providers taking the same job) exactly
+# one updates the row and the rest get a 409, on every database backend -
+# the status is the version column, as no transition leads back to an
+# earlier status. In the same transaction the transition stamps accepted_at
+# or completed_at, answers the job's applications in bulk UPDATEs (the
+# accepted one, and every other pending one rejected), appends a
+# JobTransition row and moves the analytics job-status counters; completing
+# a job also counts it in its provider's total_jobs. Only a validated,
+# active provider offering the job's category can be assigned.
+# manage.py bench_job_accept load-tests concurrent accepts.
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from analytics import activity, counters
+from services import leaderboard
+from services.models import ServiceProvider
+from . import dashboard, matching
+from .models import Job, JobApplication, JobTransition
+
+TRANSITIONS = {
+    'pending': ('accepted', 'cancelled'),
+    'accepted': ('in_progress', 'cancelled'),
+    'in_progress': ('completed', 'cancelled'),
+}
+STAMPED = {'accepted': 'accepted_at', 'completed': 'completed_at'}  # Set to the time of the transition
+
+
+class TransitionError(ValueError):
+    """A transition that can't happen; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _transition(job, to_status, actor, changes=None, answer=None):
+    """
+    Move ``job`` from the status it was read with to ``to_status``, applying
+    ``changes`` to the row; ``answer(now)`` runs after the row is claimed and
+    returns the ids of providers whose applications it answered. Returns
+    ``job``, updated.
+    """
+    from_status = job.status
+    if to_status not in TRANSITIONS.get(from_status, ()):
+        raise TransitionError(f'A {from_status} job cannot be {to_status.replace("_", " ")}', status_code=409)
+    now = timezone.now()
+    changes = {**(changes or {}), 'status': to_status, 'updated_at': now}
+    if to_status in STAMPED:
+        changes[STAMPED[to_status]] = now
+    previous_provider_id = job.provider_id
+    with transaction.atomic():
+        if not Job.objects.filter(pk=job.pk, status=from_status).update(**changes):
+            current = Job.objects.filter(pk=job.pk).values_list('status', flat=True).first()
+            raise TransitionError(f'The job is already {(current or "deleted").replace("_", " ")}', status_code=409)
+        answered = answer(now) if answer else ()
+        JobTransition.objects.create(job_id=job.pk, from_status=from_status, to_status=to_status, actor=actor)
+        for field, value in changes.items():
+            setattr(job, field, value)
+        # update() sends no post_save: do what the job signals would (jobs.signals, analytics.signals)
+        counters.adjust({counters.job_status(from_status): -1, counters.job_status(to_status): 1})
+        if to_status == 'completed':
+            ServiceProvider.objects.filter(pk=job.provider_id).update(total_jobs=F('total_jobs') + 1)
+            leaderboard.mark_dirty()
+            activity.record('job_completed', f'Job "{job.title}" completed', user=job.customer_id,
+                            provider=job.provider_id)
+        job._counted_status = to_status
+        matching.mark_dirty({previous_provider_id, job.provider_id})
+        dashboard.invalidate_on_commit([job.customer_id], {previous_provider_id, job.provider_id, *answered})
+    return job
+
+
+def _reject_pending(job, now):
+    pending = JobApplication.objects.filter(job_id=job.pk, status='pending')
+    provider_ids = list(pending.values_list('provider_id', flat=True))
+    pending.update(status='rejected', responded_at=now)
+    return provider_ids
+
+
+def can_take(job, provider):
+    return (provider.validation_status == 'validated' and provider.is_active
+            and provider.categories.filter(pk=job.category_id).exists())
+
+
+def accept(job, actor, provider, application=None):
+    """
+    Assign ``job`` to ``provider``. ``application`` (the customer accepting a
+    proposal) must still be pending; without one the provider's own pending
+    application, if any, is accepted. Every other pending application is rejected.
+    """
+    if not can_take(job, provider):
+        raise TransitionError('Only a validated, active provider of the job\'s category can take it',
+                              status_code=403)
+
+    def answer(now):
+        chosen = JobApplication.objects.filter(job_id=job.pk, provider_id=provider.pk, status='pending')
+        if application is not None:
+            chosen = chosen.filter(pk=application.pk)
+        if not chosen.update(status='accepted', responded_at=now) and application is not None:
+            raise TransitionError('The proposal is no longer pending', status_code=409)  # Rolls the claim back
+        return [provider.pk, *_reject_pending(job, now)]
+
+    return _transition(job, 'accepted', actor, {'provider_id': provider.pk}, answer)
+
+
+def start(job, actor):
+    return _transition(job, 'in_progress', actor)
+
+
+def complete(job, actor, final_price=None):
+    """Mark ``job`` done; the price defaults to the one already set, else the accepted proposal's"""
+    if final_price is None:
+        final_price = job.final_price
+    if final_price is None:
+        final_price = JobApplication.objects.filter(
+            job_id=job.pk, provider_id=job.provider_id, status='accepted',
+        ).values_list('proposed_price', flat=True).first()
+    return _transition(job, 'completed', actor, {'final_price': final_price})
+
+
+def cancel(job, actor):
+    return _transition(job, 'cancelled', actor, answer=lambda now: _reject_pending(job, now))
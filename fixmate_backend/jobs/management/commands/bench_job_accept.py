@@ -0,0 +1,119 @@
+import copy
+import datetime
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import Count
+
+from jobs import lifecycle
+from jobs.models import Job, JobApplication, JobTransition
+from services.models import ServiceCategory, ServiceProvider
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = ('Load-test jobs.lifecycle: N providers race to accept the same job from parallel connections. '
+            'Writes (and afterwards deletes) synthetic rows in the configured database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=200, help='Providers trying to accept each job')
+        parser.add_argument('--threads', type=int, default=50, help='Parallel database connections')
+        parser.add_argument('--rounds', type=int, default=5, help='Jobs raced for, one after another')
+
+    def handle(self, *args, **options):
+        attempts, threads = options['attempts'], min(options['threads'], options['attempts'])
+        tag = uuid.uuid4().hex[:8]
+        customer = User.objects.create_user(f'bench-{tag}', f'bench-{tag}@example.com', user_type='customer')
+        category = ServiceCategory.objects.create(name=f'Bench {tag}', description='')
+        # bulk_create: no geocoding or search indexing for the synthetic rows
+        users = User.objects.bulk_create([
+            User(username=f'bench-{tag}-{n}', email=f'bench-{tag}-{n}@example.com', user_type='provider')
+            for n in range(attempts)
+        ])
+        providers = ServiceProvider.objects.bulk_create([
+            ServiceProvider(user=user, business_name=user.username, description='', skills='', service_area='',
+                            validation_status='validated', is_active=True)
+            for user in users
+        ])
+        ServiceProvider.categories.through.objects.bulk_create([
+            ServiceProvider.categories.through(serviceprovider=provider, servicecategory=category)
+            for provider in providers
+        ])
+        try:
+            failed = False
+            for round_number in range(1, options['rounds'] + 1):
+                failed |= not self.race(round_number, customer, category, providers, threads)
+        finally:
+            Job.objects.filter(customer=customer).delete()
+            ServiceProvider.objects.filter(pk__in=[provider.pk for provider in providers]).delete()
+            User.objects.filter(pk__in=[user.pk for user in users] + [customer.pk]).delete()
+            category.delete()
+        if failed:
+            raise CommandError('A job was accepted by more or fewer than one provider')
+
+    def race(self, round_number, customer, category, providers, threads):
+        [job] = Job.objects.bulk_create([Job(
+            customer=customer, category=category, title='Bench', description='', address='',
+            preferred_date=datetime.date.today(), preferred_time='morning',
+        )])
+        applications = JobApplication.objects.bulk_create([
+            JobApplication(job=job, provider=provider) for provider in providers
+        ])
+        job = Job.objects.get(pk=job.pk)
+        barrier = threading.Barrier(threads)
+        counter = iter(range(len(providers)))
+        counter_lock = threading.Lock()
+        results = []
+
+        def worker():
+            close_old_connections()
+            try:
+                barrier.wait()
+                while True:
+                    with counter_lock:
+                        index = next(counter, None)
+                    if index is None:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        # Every attempt starts from the job as read before the race: all of them see it pending
+                        lifecycle.accept(copy.copy(job), providers[index].user, providers[index], applications[index])
+                        outcome = 'accepted'
+                    except lifecycle.TransitionError:
+                        outcome = 'conflict'
+                    except DatabaseError:
+                        outcome = 'error'
+                    results.append((outcome, time.perf_counter() - started))
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(worker) for _ in range(threads)]:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        outcomes = [outcome for outcome, _ in results]
+        latencies = sorted(seconds * 1000 for _, seconds in results)
+        job.refresh_from_db()
+        counts = dict(JobApplication.objects.filter(job=job).order_by().values_list('status').annotate(Count('pk')))
+        statuses = {status: counts.get(status, 0) for status in ('accepted', 'rejected', 'pending')}
+        logged = JobTransition.objects.filter(job=job).count()
+        ok = (outcomes.count('accepted') == 1 and statuses['accepted'] == 1 and logged == 1
+              and job.provider_id is not None and job.accepted_at is not None)
+        self.stdout.write(
+            f'round {round_number}: {len(results)} attempts over {threads} connections in {elapsed * 1000:.0f} ms; '
+            f'{outcomes.count("accepted")} accepted, {outcomes.count("conflict")} conflicts, '
+            f'{outcomes.count("error")} database errors; applications {statuses}; {logged} transition rows; '
+            f'p50 {statistics.median(latencies):.1f} ms, max {latencies[-1]:.1f} ms'
+        )
+        if ok:
+            self.stdout.write(self.style.SUCCESS(f'round {round_number}: exactly one provider won'))
+        else:
+            self.stdout.write(self.style.ERROR(f'round {round_number}: expected exactly one winner'))
+        return ok
@@ -0,0 +1,97 @@
+import datetime
+import statistics
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from jobs import matching
+from jobs.models import Job
+from services import availability
+
+# Rough population centres providers and jobs cluster around (lat, lon, spread in degrees)
+CENTRES = np.array([
+    (51.507, -0.128, 0.35), (53.483, -2.244, 0.25), (52.486, -1.890, 0.25), (53.800, -1.549, 0.2),
+    (55.864, -4.252, 0.2), (53.408, -2.991, 0.15), (51.454, -2.588, 0.15), (55.953, -3.188, 0.15),
+])
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ranking providers for a job over an in-memory snapshot of N synthetic providers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100_000, help='Synthetic providers')
+        parser.add_argument('--categories', type=int, default=20, help='Categories providers are spread over')
+        parser.add_argument('--queries', type=int, default=200, help='Jobs ranked per scenario')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        count, categories = options['count'], options['categories']
+        started = time.perf_counter()
+        snapshot = self.snapshot(rng, count, categories)
+        self.stdout.write(f'Built a {count} provider snapshot in {time.perf_counter() - started:.2f}s')
+
+        jobs = [self.job(rng, categories) for _ in range(options['queries'])]
+        self.report(f'{categories} categories', [lambda job=job: matching.rank(job, options['limit'], snapshot)
+                                                 for job in jobs])
+        # Worst case: every provider offers the job's category
+        for job in jobs:
+            job.category_id = 0
+        self.report('all providers', [lambda job=job: matching.rank(job, options['limit'], snapshot) for job in jobs])
+        started = time.perf_counter()
+        matching.rematch(jobs, options['limit'], snapshot)
+        self.stdout.write(f'{"batch":>24}: {len(jobs)} jobs in {(time.perf_counter() - started) * 1000:.1f} ms')
+
+    def snapshot(self, rng, count, categories):
+        centres = CENTRES[rng.integers(len(CENTRES), size=count)]
+        hourly_rate = rng.uniform(15, 90, count)
+        hourly_rate[rng.random(count) < 0.1] = np.nan
+        rating_count = rng.poisson(8, count).astype(np.float64)
+        columns = {
+            'ids': np.arange(1, count + 1, dtype=np.int64),
+            'eligible': rng.random(count) < 0.9,
+            'latitude': rng.normal(centres[:, 0], centres[:, 2]),
+            'longitude': rng.normal(centres[:, 1], centres[:, 2] * 1.6),
+            'rating_sum': rating_count * rng.uniform(2.5, 5, count).round(),
+            'rating_count': rating_count,
+            'hourly_rate': hourly_rate,
+            'experience': rng.integers(0, 30, count).astype(np.float64),
+            'workload': rng.poisson(1, count).astype(np.float64),
+            'slots': rng.integers(0, availability.FULL_DAY + 1, (count, len(availability.DAYS)),
+                                  dtype=np.int64).astype(np.uint64),
+        }
+        # One to three categories each, plus category 0 held by everyone for the worst case
+        per_provider = rng.integers(1, 4, count)
+        link_rows = np.repeat(np.arange(count), per_provider)
+        link_categories = rng.integers(1, categories + 1, len(link_rows))
+        return matching.Snapshot(
+            columns,
+            np.concatenate([link_rows, np.arange(count)]),
+            np.concatenate([link_categories, np.zeros(count, dtype=np.int64)]),
+        )
+
+    def job(self, rng, categories):
+        lat, lon, spread = CENTRES[rng.integers(len(CENTRES))]
+        return Job(
+            pk=0, category_id=int(rng.integers(1, categories + 1)),
+            latitude=float(rng.normal(lat, spread)), longitude=float(rng.normal(lon, spread * 1.6)),
+            estimated_price=Decimal(int(rng.integers(40, 400))),
+            preferred_date=datetime.date(2026, 10, 19) + datetime.timedelta(days=int(rng.integers(7))),
+            preferred_time=str(rng.choice(['morning', 'afternoon', 'evening'])),
+        )
+
+    def report(self, label, queries):
+        timings, results = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            results += len(query())
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f'{label:>24}: p50 {statistics.median(timings):.2f} ms, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, max {timings[-1]:.2f} ms, '
+            f'avg {results / len(queries):.0f} results'
+        )
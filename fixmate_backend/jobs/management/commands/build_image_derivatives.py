@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import images
+
+
+class Command(BaseCommand):
+    help = 'Build the resized derivatives of job photos that have none yet (or of every photo with --all)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild photos whose derivatives are ready too')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = 0
+        for model in images.models_with_derivatives():
+            rows = model.objects.exclude(image='').exclude(image__isnull=True).order_by('pk')
+            if not options['all']:
+                rows = rows.exclude(derivatives__status=images.READY)
+            for pk, name in rows.values_list('pk', 'image').iterator():
+                images.build(model, pk, name)
+                count += 1
+        images.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Built derivatives of {count} photos in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked photo uploads that were never finalized, with their temporary files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=None,
+                            help='Age in hours of the uploads to delete (default: UPLOAD_SESSION_HOURS)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = uploads.purge(options['hours'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {count} unfinished uploads in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,30 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs import matching
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Rank candidate providers for many jobs in one pass (all pending jobs by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Jobs to rematch; default every job with --status')
+        parser.add_argument('--status', default='pending', help='Job status to rematch when no ids are given')
+        parser.add_argument('--limit', type=int, default=20, help='Providers kept per job')
+        parser.add_argument('--json', action='store_true', help='Write {job id: [[provider id, score]]} to stdout')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.order_by('pk').only(
+            'pk', 'category_id', 'latitude', 'longitude', 'estimated_price', 'preferred_date', 'preferred_time'
+        )
+        jobs = jobs.filter(pk__in=options['job_ids']) if options['job_ids'] else jobs.filter(status=options['status'])
+        started = time.perf_counter()
+        results = matching.rematch(jobs.iterator(chunk_size=2000), options['limit'])
+        elapsed = time.perf_counter() - started
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Matched {len(results)} jobs in {elapsed:.2f}s'))
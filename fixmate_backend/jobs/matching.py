@@ -0,0 +1,302 @@
+# FixMate - Job / Provider Matching
+#
+# Ranks the providers who could take a job. Each worker keeps a columnar
+# NumPy snapshot of the features every provider is scored on (location,
+# rating aggregates, hourly rate, experience, weekly slot masks, open job
+# count, eligibility) plus the provider/category links as two parallel
+# arrays. Scoring a job is then a handful of vectorized operations over the
+# providers linked to its category, with no queries: about a millisecond
+# per 10k candidates (manage.py bench_matching).
+#
+# The snapshot is refreshed incrementally: the signals in jobs.signals mark
+# providers dirty once a write that changes their features commits, and the
+# next read reloads just those rows into a copy of the columns. Writes made
+# by other workers (and bulk writes that send no signals) are picked up by a
+# full reload at most MATCHING_SNAPSHOT_MAX_AGE seconds later.
+#
+# Snapshots are never mutated once built, so readers need no lock.
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from services import availability, geo
+from services.models import ServiceProvider
+from services.serializers import ServiceProviderSummarySerializer
+from .models import Job
+
+ACTIVE_STATUSES = ('accepted', 'in_progress')  # Jobs that count towards a provider's workload
+
+# Score weights; each component is scaled to 0..1 first. The category is a filter, not a component.
+WEIGHTS = {'distance': 0.25, 'rating': 0.25, 'price': 0.15, 'experience': 0.1, 'availability': 0.15, 'workload': 0.1}
+PRIOR_REVIEWS = 5  # Ratings are shrunk towards the site mean as if each provider had this many average reviews
+DISTANCE_SCALE_KM = 15  # e-folding distance of the distance component
+EXPECTED_HOURS = 2  # Hours of work an estimated_price is compared against hourly_rate for
+EXPERIENCE_SATURATE = 10
+UNKNOWN = 0.3  # Distance and price component when either side is missing the data
+PARTIAL = 0.5  # Availability component when free for only part of the preferred period
+
+COLUMNS = ('ids', 'eligible', 'latitude', 'longitude', 'rating_sum', 'rating_count',
+           'hourly_rate', 'experience', 'workload', 'slots')
+_PROVIDER_FIELDS = ('pk', 'validation_status', 'is_active', 'is_available', 'latitude', 'longitude',
+                    'rating_sum', 'rating_count', 'hourly_rate', 'experience_years', *availability.FIELDS)
+
+
+def _empty_columns():
+    columns = {name: np.zeros(0, dtype=np.float64) for name in COLUMNS}
+    columns.update(ids=np.zeros(0, dtype=np.int64), eligible=np.zeros(0, dtype=bool),
+                   slots=np.zeros((0, len(availability.DAYS)), dtype=np.uint64))
+    return columns
+
+
+def load_columns(provider_ids=None):
+    """(columns, links) for ``provider_ids`` (every provider when None); links are (provider id, category id) arrays"""
+    providers = ServiceProvider.objects.order_by('pk')
+    jobs = Job.objects.filter(provider__isnull=False, status__in=ACTIVE_STATUSES).order_by()
+    links = ServiceProvider.categories.through.objects.order_by()
+    if provider_ids is not None:
+        provider_ids = list(provider_ids)
+        providers = providers.filter(pk__in=provider_ids)
+        jobs = jobs.filter(provider_id__in=provider_ids)
+        links = links.filter(serviceprovider_id__in=provider_ids)
+
+    rows = list(providers.values_list(*_PROVIDER_FIELDS))
+    workload = dict(jobs.values('provider_id').annotate(n=Count('pk')).values_list('provider_id', 'n'))
+    pairs = list(links.values_list('serviceprovider_id', 'servicecategory_id'))
+    link_columns = (np.array([pair[0] for pair in pairs], dtype=np.int64),
+                    np.array([pair[1] for pair in pairs], dtype=np.int64))
+    if not rows:
+        return _empty_columns(), link_columns
+
+    ids = [row[0] for row in rows]
+    columns = {
+        'ids': np.array(ids, dtype=np.int64),
+        'eligible': np.array([row[1] == 'validated' and row[2] and row[3] for row in rows], dtype=bool),
+        # None becomes NaN in float columns
+        'latitude': np.array([row[4] for row in rows], dtype=np.float64),
+        'longitude': np.array([row[5] for row in rows], dtype=np.float64),
+        'rating_sum': np.array([row[6] for row in rows], dtype=np.float64),
+        'rating_count': np.array([row[7] for row in rows], dtype=np.float64),
+        'hourly_rate': np.array([row[8] for row in rows], dtype=np.float64),
+        'experience': np.array([row[9] for row in rows], dtype=np.float64),
+        'workload': np.array([workload.get(pk, 0) for pk in ids], dtype=np.float64),
+        'slots': np.array([row[10:] for row in rows], dtype=np.int64).astype(np.uint64),
+    }
+    return columns, link_columns
+
+
+class Snapshot:
+    """Provider feature columns; row i of every column describes provider ids[i]"""
+
+    def __init__(self, columns, link_rows, link_categories, rows=None, built_at=None):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.rows = rows if rows is not None else {pk: row for row, pk in enumerate(self.ids.tolist())}
+        self.link_rows = link_rows  # Category links as (snapshot row, category id) pairs
+        self.link_categories = link_categories
+        self.built_at = time.monotonic() if built_at is None else built_at
+        counted = self.rating_count[self.eligible].sum()
+        self.mean_rating = self.rating_sum[self.eligible].sum() / counted if counted else 0.0
+
+    def positions(self, provider_ids, rows=None):
+        """Snapshot rows of an array of ``provider_ids``, -1 for providers not in it"""
+        rows = self.rows if rows is None else rows
+        return np.array([rows.get(pk, -1) for pk in provider_ids.tolist()], dtype=np.int64)
+
+    @classmethod
+    def load(cls):
+        columns, (link_providers, link_categories) = load_columns()
+        snapshot = cls(columns, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        link_rows = snapshot.positions(link_providers)
+        known = link_rows >= 0  # Links added after the providers were read
+        snapshot.link_rows, snapshot.link_categories = link_rows[known], link_categories[known]
+        return snapshot
+
+    def __len__(self):
+        return len(self.ids)
+
+    def refreshed(self, provider_ids):
+        """A new snapshot with the rows of ``provider_ids`` reloaded; deleted providers become ineligible"""
+        provider_ids = set(provider_ids)
+        fresh, (link_providers, link_categories) = load_columns(provider_ids)
+        columns = {name: getattr(self, name).copy() for name in COLUMNS}
+
+        positions = self.positions(fresh['ids'])
+        known = positions >= 0
+        for name in COLUMNS:
+            columns[name][positions[known]] = fresh[name][known]
+        gone = [self.rows[pk] for pk in provider_ids - set(fresh['ids'].tolist()) if pk in self.rows]
+        columns['eligible'][gone] = False
+
+        rows = self.rows
+        if not known.all():
+            rows = dict(rows)
+            for pk in fresh['ids'][~known].tolist():
+                rows[pk] = len(rows)
+            for name in COLUMNS:
+                columns[name] = np.concatenate([columns[name], fresh[name][~known]])
+
+        # Replace the reloaded providers' links
+        keep = ~np.isin(self.link_rows, positions[known]) & ~np.isin(self.link_rows, gone)
+        link_rows = self.positions(link_providers, rows)
+        added = link_rows >= 0
+        return Snapshot(
+            columns,
+            np.concatenate([self.link_rows[keep], link_rows[added]]),
+            np.concatenate([self.link_categories[keep], link_categories[added]]),
+            rows=rows, built_at=self.built_at,
+        )
+
+    def candidates(self, category_id):
+        """Rows of the eligible providers offering ``category_id``"""
+        rows = self.link_rows[self.link_categories == category_id]
+        return rows[self.eligible[rows]]
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """Vectorized services.geo.haversine_km from one point to arrays of points"""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * geo.EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def score(snapshot, job, rows):
+    """
+    (rows, scores, distances, components) for the candidate ``rows`` of
+    ``snapshot`` against ``job``. Providers further than
+    MATCHING_MAX_DISTANCE_KM are dropped; distances are NaN where unknown.
+    """
+    if job.latitude is not None and job.longitude is not None:
+        distance = haversine_km(job.latitude, job.longitude, snapshot.latitude[rows], snapshot.longitude[rows])
+        within = ~(distance > getattr(settings, 'MATCHING_MAX_DISTANCE_KM', 50))  # NaN compares False: kept
+        rows, distance = rows[within], distance[within]
+    else:
+        distance = np.full(len(rows), np.nan)
+
+    components = {'distance': np.where(np.isnan(distance), UNKNOWN, np.exp(-distance / DISTANCE_SCALE_KM))}
+    components['rating'] = (
+        (snapshot.rating_sum[rows] + PRIOR_REVIEWS * snapshot.mean_rating)
+        / (snapshot.rating_count[rows] + PRIOR_REVIEWS) / 5
+    )
+    if job.estimated_price:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 1 when the estimate covers EXPECTED_HOURS at the provider's rate, less the more it falls short
+            fit = np.clip(float(job.estimated_price) / (snapshot.hourly_rate[rows] * EXPECTED_HOURS), 0, 1)
+        components['price'] = np.where(np.isnan(fit), UNKNOWN, fit)
+    else:
+        components['price'] = np.full(len(rows), UNKNOWN)
+    components['experience'] = np.minimum(snapshot.experience[rows] / EXPERIENCE_SATURATE, 1.0)
+    mask = availability.PERIODS.get(job.preferred_time)
+    if mask and job.preferred_date:
+        free = snapshot.slots[rows, job.preferred_date.weekday()] & np.uint64(mask)
+        components['availability'] = np.where(free == np.uint64(mask), 1.0, np.where(free != 0, PARTIAL, 0.0))
+    else:
+        components['availability'] = np.full(len(rows), PARTIAL)
+    components['workload'] = 1 / (1 + snapshot.workload[rows])
+
+    total = sum(WEIGHTS[name] * value for name, value in components.items())
+    return rows, total, distance, components
+
+
+def top(snapshot, rows, scores, limit):
+    """Positions into ``rows`` of the best ``limit`` scores, best first, ties to the older provider"""
+    if limit < len(scores):
+        positions = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.lexsort((snapshot.ids[rows[positions]], -scores[positions]))]
+
+
+def rank(job, limit=20, snapshot=None):
+    """[{provider_id, score, distance_km, components}] of the best providers for ``job``, best first"""
+    if snapshot is None:
+        snapshot = matching_index.snapshot()
+    rows, scores, distance, components = score(snapshot, job, snapshot.candidates(job.category_id))
+    ranked = []
+    for position in top(snapshot, rows, scores, limit).tolist():
+        ranked.append({
+            'provider_id': int(snapshot.ids[rows[position]]),
+            'score': round(float(scores[position]), 4),
+            'distance_km': None if np.isnan(distance[position]) else round(float(distance[position]), 2),
+            'components': {name: round(float(value[position]), 4) for name, value in components.items()},
+        })
+    return ranked
+
+
+def matches(job, limit=20):
+    """rank() entries with the provider summary attached, for the API"""
+    ranked = rank(job, limit)
+    providers = ServiceProvider.objects.filter(pk__in=[entry['provider_id'] for entry in ranked]).select_related('user')
+    summaries = {provider.pk: ServiceProviderSummarySerializer(provider).data for provider in providers}
+    return [dict(entry, provider=summaries[entry['provider_id']])
+            for entry in ranked if entry['provider_id'] in summaries]
+
+
+def rematch(jobs, limit=20, snapshot=None):
+    """
+    Batch mode: {job id: [(provider id, score)]} for every job in ``jobs``,
+    all scored against one snapshot, with candidate rows looked up once per
+    category.
+    """
+    if snapshot is None:
+        snapshot = matching_index.snapshot()
+    candidates = {}
+    results = {}
+    for job in jobs:
+        if job.category_id not in candidates:
+            candidates[job.category_id] = snapshot.candidates(job.category_id)
+        rows, scores, _, _ = score(snapshot, job, candidates[job.category_id])
+        results[job.pk] = [(int(snapshot.ids[rows[position]]), round(float(scores[position]), 4))
+                           for position in top(snapshot, rows, scores, limit).tolist()]
+    return results
+
+
+class MatchingIndex:
+    """This process's current Snapshot plus the providers written since it was built"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'MATCHING_SNAPSHOT_MAX_AGE', 300)
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and not self._dirty and time.monotonic() - snapshot.built_at < self.max_age:
+            return snapshot
+        with self._lock:
+            if self._snapshot is not snapshot:
+                return self._snapshot  # Another thread just refreshed
+            dirty, self._dirty = self._dirty, set()
+            if snapshot is None or time.monotonic() - snapshot.built_at >= self.max_age:
+                self._snapshot = Snapshot.load()
+            elif dirty:
+                self._snapshot = snapshot.refreshed(dirty)
+            return self._snapshot
+
+    def mark(self, provider_ids):
+        with self._lock:
+            self._dirty.update(provider_ids)
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._dirty = set()
+
+
+matching_index = MatchingIndex()
+
+
+def mark_dirty(provider_ids):
+    """Reload ``provider_ids`` into this process's snapshot once the current transaction commits"""
+    provider_ids = [pk for pk in provider_ids if pk is not None]
+    if provider_ids:
+        transaction.on_commit(lambda: matching_index.mark(provider_ids))
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_geolocation'),
+        ('services', '0013_review_provider_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'category', 'created_at', 'id'], name='job_status_cat_created_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+def backfill_total_jobs(apps, schema_editor):
+    ServiceProvider = apps.get_model('services', 'ServiceProvider')
+    Job = apps.get_model('jobs', 'Job')
+    totals = dict(
+        Job.objects.filter(status='completed', provider__isnull=False).order_by()
+        .values('provider_id').annotate(n=models.Count('pk')).values_list('provider_id', 'n')
+    )
+    providers = list(ServiceProvider.objects.filter(pk__in=list(totals)))
+    for provider in providers:
+        provider.total_jobs = totals[provider.pk]
+    ServiceProvider.objects.bulk_update(providers, ['total_jobs'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_jobtransition'),
+        ('services', '0013_review_provider_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_total_jobs, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from services.models import ServiceCategory, ServiceProvider
@@ -30,6 +32,8 @@ class Job(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     address = models.CharField(max_length=300)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     preferred_date = models.DateField()
     preferred_time = models.CharField(max_length=20, choices=TIME_PREFERENCES)
     urgency = models.CharField(max_length=20, choices=URGENCY_CHOICES, default='normal')
@@ -43,6 +47,12 @@ class Job(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='job_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='job_status_created_idx'),
+            # Provider job feed: open jobs of a category, newest first
+            models.Index(fields=['status', 'category', 'created_at', 'id'], name='job_status_cat_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.customer.username}"
@@ -50,12 +60,30 @@ class Job(models.Model):
 class JobImage(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='job_images/')
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)  # See jobs.images
     description = models.CharField(max_length=200, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Image for {self.job.title}"
 
+class ImageUpload(models.Model):
+    """A job photo being uploaded in chunks (see jobs.uploads); deleted once finalized into a JobImage"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    batch = models.UUIDField(db_index=True)  # Photos finalized together
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='image_uploads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    position = models.PositiveSmallIntegerField()  # Order within the batch
+    filename = models.CharField(max_length=255)
+    description = models.CharField(max_length=200, blank=True)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received = models.JSONField(default=list)  # Merged [start, end) byte ranges written so far
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Upload of {self.filename} for job {self.job_id}"
+
 class JobApplication(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -78,11 +106,26 @@ class JobApplication(models.Model):
     def __str__(self):
         return f"{self.provider.business_name} applied for {self.job.title}"
 
+class JobTransition(models.Model):
+    """One status change of a job, appended by jobs.lifecycle"""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='transitions')
+    from_status = models.CharField(max_length=20, choices=Job.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Job.STATUS_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+
+    def __str__(self):
+        return f"{self.job_id}: {self.from_status} -> {self.to_status}"
+
 class JobUpdate(models.Model):
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='updates')
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     message = models.TextField()
     image = models.ImageField(upload_to='job_updates/', blank=True, null=True)
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)  # See jobs.images
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
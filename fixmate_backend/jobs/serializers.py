@@ -1,20 +1,54 @@
 from rest_framework import serializers
-from .models import Job, JobImage, JobApplication, JobUpdate
+from .models import Job, JobImage, JobApplication, JobTransition, JobUpdate
 from services.models import ServiceCategory
+from services.serializers import CategoryNameField
+from . import images
 
 class JobSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.get_full_name', read_only=True)
-    category_name = serializers.CharField(source='category.name', read_only=True)
+    category_name = CategoryNameField(source='category_id')
     
     class Meta:
         model = Job
         fields = '__all__'
-        read_only_fields = ['customer', 'created_at', 'updated_at']
+        # Status and assignment change only through the lifecycle actions (jobs.lifecycle)
+        read_only_fields = ['customer', 'provider', 'status', 'accepted_at', 'completed_at', 'created_at',
+                            'updated_at']
+
+class ImagePreviewField(serializers.Field):
+    """
+    The size of a job photo a page should load instead of the upload: ``size``,
+    else the context's 'image_size' (views pick 'thumbnail' for lists), else
+    'medium' plus its WebP. The url is None until the derivatives are built
+    and the original's metadata stripped (jobs.images).
+    """
+
+    def __init__(self, size=None, **kwargs):
+        self.size = size
+        kwargs.update(source='*', read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        if not instance.image:
+            return None
+        size = self.size or self.context.get('image_size', 'medium')
+        request = self.context.get('request')
+        absolute = request.build_absolute_uri if request is not None else str
+        url, width, height = images.variant(instance, size)
+        preview = {'url': url and absolute(url), 'width': width, 'height': height, 'ready': url is not None}
+        if size == 'medium':
+            webp = images.variant(instance, 'webp')[0]
+            preview['webp'] = webp and absolute(webp)
+        return preview
+
 
 class JobImageSerializer(serializers.ModelSerializer):
+    preview = ImagePreviewField()
+
     class Meta:
         model = JobImage
-        fields = '__all__'
+        exclude = ['derivatives']
+        extra_kwargs = {'image': {'write_only': True}}  # Served through preview, once its metadata is stripped
 
 class JobApplicationSerializer(serializers.ModelSerializer):
     provider_name = serializers.CharField(source='provider.business_name', read_only=True)
@@ -22,12 +56,19 @@ class JobApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = JobApplication
         fields = '__all__'
-        read_only_fields = ['provider', 'applied_at']
+        read_only_fields = ['job', 'provider', 'status', 'applied_at', 'responded_at']
+
+class JobTransitionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = JobTransition
+        fields = ['from_status', 'to_status', 'actor', 'created_at']
 
 class JobUpdateSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
+    preview = ImagePreviewField()
     
     class Meta:
         model = JobUpdate
-        fields = '__all__'
+        exclude = ['derivatives']
         read_only_fields = ['user', 'created_at']
+        extra_kwargs = {'image': {'write_only': True}}
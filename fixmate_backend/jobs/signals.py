@@ -0,0 +1,134 @@
+# FixMate - Jobs Signal Handlers
+#
+# Jobs are located from their address like providers (services.signals).
+# Writes that change what the matching engine scores a provider on (the
+# provider row, its categories, reviews, weekly hours, and the jobs counted
+# as its workload) mark the provider for a reload into the matching
+# snapshot (jobs.matching) once they commit. Job and application writes
+# also drop the cached dashboard stats of the customer and providers
+# involved (jobs.dashboard). New job photos get their resized derivatives
+# built off the request once they commit (jobs.images).
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from services.models import ProviderAvailability, Review, ServiceProvider
+from services.signals import locate, remember_location
+from . import dashboard, images, matching
+from .models import Job, JobApplication, JobImage, JobUpdate
+
+
+@receiver(post_init, sender=Job)
+def remember_job_location(sender, instance, **kwargs):
+    remember_location(instance, 'address')
+    instance._assigned = (instance.__dict__.get('provider_id'), instance.__dict__.get('status'))
+
+
+@receiver(pre_save, sender=Job)
+def locate_job(sender, instance, update_fields=None, **kwargs):
+    locate(instance, 'address', update_fields)
+
+
+@receiver(post_save, sender=Job)
+def job_located(sender, instance, **kwargs):
+    remember_location(instance, 'address')
+
+
+@receiver(post_save, sender=Job)
+def job_assignment_saved(sender, instance, created, **kwargs):
+    assigned = (instance.provider_id, instance.status)
+    if created or assigned != instance._assigned:
+        matching.mark_dirty({instance._assigned[0], instance.provider_id})
+    dashboard.invalidate_on_commit([instance.customer_id], {instance._assigned[0], instance.provider_id})
+    instance._assigned = assigned
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    matching.mark_dirty([instance.provider_id])
+    dashboard.invalidate_on_commit([instance.customer_id], [instance.provider_id])
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def application_changed(sender, instance, **kwargs):
+    customer_id = Job.objects.filter(pk=instance.job_id).values_list('customer_id', flat=True).first()
+    dashboard.invalidate_on_commit([customer_id], [instance.provider_id])
+
+
+@receiver(post_save, sender=ServiceProvider)
+@receiver(post_delete, sender=ServiceProvider)
+def provider_changed(sender, instance, **kwargs):
+    matching.mark_dirty([instance.pk])
+
+
+@receiver(m2m_changed, sender=ServiceProvider.categories.through)
+def provider_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._unmatched_provider_ids = list(instance.providers.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            matching.mark_dirty([instance.pk])
+        elif action == 'post_clear':
+            matching.mark_dirty(instance._unmatched_provider_ids)
+        else:
+            matching.mark_dirty(pk_set or ())
+
+
+@receiver(post_init, sender=Review)
+def remember_reviewed_provider(sender, instance, **kwargs):
+    instance._matched_provider_id = instance.__dict__.get('provider_id')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    # Also the provider a re-assigned review was taken from
+    matching.mark_dirty({instance.provider_id, instance._matched_provider_id})
+    instance._matched_provider_id = instance.provider_id
+
+
+@receiver(post_save, sender=ProviderAvailability)
+@receiver(post_delete, sender=ProviderAvailability)
+def availability_changed(sender, instance, **kwargs):
+    matching.mark_dirty([instance.provider_id])
+
+
+@receiver(post_init, sender=JobImage)
+@receiver(post_init, sender=JobUpdate)
+def remember_image(sender, instance, **kwargs):
+    image = instance.__dict__.get('image')
+    instance._image_name = getattr(image, 'name', image)
+
+
+def _image_replaced(instance):
+    image = instance.image
+    return bool(image) and not image._committed or (image.name or None) != (instance._image_name or None)
+
+
+@receiver(pre_save, sender=JobImage)
+@receiver(pre_save, sender=JobUpdate)
+def reset_derivatives(sender, instance, **kwargs):
+    if instance._state.adding or _image_replaced(instance):
+        instance.derivatives = {'status': images.PENDING} if instance.image else {}
+
+
+@receiver(post_save, sender=JobImage)
+@receiver(post_save, sender=JobUpdate)
+def image_saved(sender, instance, created, **kwargs):
+    if created or _image_replaced(instance):
+        storage, old = instance.image.storage, instance._image_name
+        if not created and old:
+            transaction.on_commit(lambda: images.delete_derivatives(storage, old))
+        if instance.image:
+            images.build_on_commit(instance)
+    remember_image(sender, instance)
+
+
+@receiver(post_delete, sender=JobImage)
+@receiver(post_delete, sender=JobUpdate)
+def image_deleted(sender, instance, **kwargs):
+    storage, name = instance.image.storage, instance.image.name
+    if name:
+        transaction.on_commit(lambda: images.delete_derivatives(storage, name))
@@ -1,3 +1,681 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from analytics import counters
+from analytics.models import ActivityEvent
+from services import reference
+from services.models import GeocodedPlace, ProviderAvailability, ServiceCategory, ServiceProvider
+from users.models import User
+from . import images, lifecycle, matching, uploads
+from .models import ImageUpload, Job, JobApplication, JobImage, JobTransition, JobUpdate
+
+# In-process cache for tests that count queries: the database cache's own queries would be counted too
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class MatchingTest(TestCase):
+    """Vectorized provider ranking over the in-process snapshot, refreshed by committed writes"""
+
+    places = {
+        'leeds': (53.8008, -1.5491),
+        'bradford': (53.7960, -1.7594),
+        'london': (51.5072, -0.1276),
+    }
+
+    def setUp(self):
+        matching.matching_index.invalidate()
+        for name, (lat, lon) in self.places.items():
+            GeocodedPlace.objects.create(name=name, latitude=lat, longitude=lon)
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.electrical = ServiceCategory.objects.create(name='Electrical', description='Wiring')
+        self.providers = {}
+        for key, area, category, rate, validated in [
+            ('near', 'Leeds', self.plumbing, '30.00', True),
+            ('nearby', 'Bradford', self.plumbing, '30.00', True),
+            ('far', 'London', self.plumbing, '30.00', True),
+            ('sparky', 'Leeds', self.electrical, '30.00', True),
+            ('pending', 'Leeds', self.plumbing, '30.00', False),
+        ]:
+            provider = ServiceProvider.objects.create(
+                user=User.objects.create_user(key, f'{key}@example.com', user_type='provider'),
+                business_name=key, description='', skills='', service_area=area, hourly_rate=Decimal(rate),
+                validation_status='validated' if validated else 'pending', is_active=validated,
+            )
+            provider.categories.add(category)
+            self.providers[key] = provider
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        self.job = Job.objects.create(
+            customer=self.customer, category=self.plumbing, title='Leak', description='Kitchen sink',
+            address='Leeds', preferred_date=datetime.date(2026, 10, 20), preferred_time='morning',
+            estimated_price=Decimal('80.00'),
+        )
+
+    def ranked(self, job=None):
+        return [entry['provider_id'] for entry in matching.rank(job or self.job)]
+
+    def test_ranking(self):
+        # Category, eligibility and MATCHING_MAX_DISTANCE_KM filter; the nearer provider wins otherwise
+        self.assertEqual(self.ranked(), [self.providers['near'].pk, self.providers['nearby'].pk])
+        best = matching.rank(self.job)[0]
+        self.assertEqual(best['distance_km'], 0.0)
+        self.assertEqual(set(best['components']), set(matching.WEIGHTS))
+        self.assertAlmostEqual(best['score'], sum(
+            matching.WEIGHTS[name] * value for name, value in best['components'].items()
+        ), places=3)
+
+    def test_incremental_refresh(self):
+        self.ranked()  # Load the snapshot
+        near, nearby = self.providers['near'], self.providers['nearby']
+        with self.captureOnCommitCallbacks(execute=True):
+            ProviderAvailability.objects.create(
+                provider=nearby, day_of_week='tuesday',
+                start_time=datetime.time(8), end_time=datetime.time(12),
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(
+                customer=self.customer, provider=near, category=self.plumbing, title='Boiler', description='',
+                address='Leeds', preferred_date=datetime.date(2026, 10, 21), preferred_time='evening',
+                status='in_progress',
+            )
+        snapshot = matching.matching_index.snapshot()
+        self.assertEqual(snapshot.workload[snapshot.rows[near.pk]], 1)
+        self.assertEqual(self.ranked(), [nearby.pk, near.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            near.is_available = False
+            near.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.providers['sparky'].categories.add(self.plumbing)
+        self.assertCountEqual(self.ranked(), [self.providers['sparky'].pk, nearby.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nearby.delete()
+        self.assertEqual(self.ranked(), [self.providers['sparky'].pk])
+        # Incremental reloads keep the snapshot's age: only MATCHING_SNAPSHOT_MAX_AGE forces a full reload
+        self.assertEqual(matching.matching_index.snapshot().built_at, snapshot.built_at)
+
+    def test_full_reload_matches_incremental(self):
+        self.ranked()
+        with self.captureOnCommitCallbacks(execute=True):
+            provider = ServiceProvider.objects.create(
+                user=User.objects.create_user('newbie', 'newbie@example.com', user_type='provider'),
+                business_name='newbie', description='', skills='', service_area='Leeds',
+                validation_status='validated', is_active=True,
+            )
+            provider.categories.add(self.plumbing)
+        incremental = matching.rank(self.job)
+        self.assertIn(provider.pk, [entry['provider_id'] for entry in incremental])
+        self.assertEqual(matching.rank(self.job, snapshot=matching.Snapshot.load()), incremental)
+
+    def test_batch(self):
+        other = Job.objects.create(
+            customer=self.customer, category=self.electrical, title='Lights', description='',
+            address='Leeds', preferred_date=datetime.date(2026, 10, 20), preferred_time='evening',
+        )
+        results = matching.rematch(Job.objects.all(), limit=1)
+        self.assertEqual([pk for pk, _ in results[self.job.pk]], [self.providers['near'].pk])
+        self.assertEqual([pk for pk, _ in results[other.pk]], [self.providers['sparky'].pk])
+
+    def test_api(self):
+        client = APIClient()
+        url = f'/api/jobs/jobs/{self.job.pk}/matches/'
+        client.force_authenticate(self.customer)
+        response = client.get(url, {'limit': 1}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([entry['provider']['business_name'] for entry in results], ['near'])
+        self.assertEqual(client.get(url, {'limit': 'x'}, secure=True).status_code, 400)
+
+        client.force_authenticate(self.providers['near'].user)
+        self.assertEqual(client.get(url, secure=True).status_code, 403)
+
+
+class JobFeedTest(TestCase):
+    """Provider job feed: open jobs in the provider's categories, area and date window"""
+
+    places = MatchingTest.places
+
+    def setUp(self):
+        for name, (lat, lon) in self.places.items():
+            GeocodedPlace.objects.create(name=name, latitude=lat, longitude=lon)
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.electrical = ServiceCategory.objects.create(name='Electrical', description='Wiring')
+        self.provider = ServiceProvider.objects.create(
+            user=User.objects.create_user('pro', 'pro@example.com', user_type='provider'),
+            business_name='Pro', description='', skills='', service_area='Leeds',
+        )
+        self.provider.categories.add(self.plumbing)
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        today = timezone.localdate()
+        self.jobs = {}
+        for key, category, address, days, extra in [
+            ('first', self.plumbing, 'Leeds', 1, {}),
+            ('bradford', self.plumbing, 'Bradford', 2, {}),
+            ('unlocated', self.plumbing, 'Somewhere', 3, {}),
+            ('wiring', self.electrical, 'Leeds', 1, {}),
+            ('london', self.plumbing, 'London', 1, {}),
+            ('past', self.plumbing, 'Leeds', -1, {}),
+            ('taken', self.plumbing, 'Leeds', 1, {'status': 'accepted', 'provider': self.provider}),
+        ]:
+            self.jobs[key] = Job.objects.create(
+                customer=self.customer, category=category, title=key, description='', address=address,
+                preferred_date=today + datetime.timedelta(days=days), preferred_time='morning', **extra,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.provider.user)
+        reference.get_categories()  # category_name is served from the reference snapshot
+
+    def titles(self, page):
+        return [job['title'] for job in page['results']]
+
+    def test_feed(self):
+        with self.assertNumQueries(2):  # Provider, then one page of jobs joined to their customers
+            page = self.client.get('/api/jobs/available/', {'limit': 2}, secure=True).json()
+        self.assertEqual(self.titles(page), ['unlocated', 'bradford'])
+        page = self.client.get(page['next'], secure=True).json()
+        self.assertEqual(self.titles(page), ['first'])
+        self.assertIsNone(page['next'])
+
+        narrow = {'radius_km': 5, 'date_to': (timezone.localdate() + datetime.timedelta(days=2)).isoformat()}
+        page = self.client.get('/api/jobs/available/', narrow, secure=True).json()
+        self.assertEqual(self.titles(page), ['first'])
+        page = self.client.get('/api/jobs/available/', {'category': self.electrical.pk}, secure=True).json()
+        self.assertEqual(self.titles(page), [])
+
+    def test_since(self):
+        newest = self.client.get('/api/jobs/available/', secure=True).json()['results'][0]['created_at']
+        Job.objects.create(
+            customer=self.customer, category=self.plumbing, title='new', description='', address='Leeds',
+            preferred_date=timezone.localdate(), preferred_time='evening',
+        )
+        page = self.client.get('/api/jobs/available/', {'since': newest}, secure=True).json()
+        self.assertEqual(self.titles(page), ['new'])
+        response = self.client.get('/api/jobs/available/', {'since': 'yesterday'}, secure=True)
+        self.assertEqual(response.status_code, 400)
+
+    def test_since_lists_closed_jobs(self):
+        as_of = self.client.get('/api/jobs/available/', secure=True).json()['as_of']
+        Job.objects.filter(pk=self.jobs['first'].pk).update(status='cancelled', updated_at=timezone.now())
+        page = self.client.get('/api/jobs/available/', {'since': as_of}, secure=True).json()
+        self.assertEqual(self.titles(page), [])
+        self.assertEqual(page['closed'], [self.jobs['first'].pk])
+        # Earlier changes were reported by earlier polls
+        page = self.client.get('/api/jobs/available/', {'since': page['as_of']}, secure=True).json()
+        self.assertEqual(page['closed'], [])
+
+    def test_filters(self):
+        Job.objects.filter(pk=self.jobs['first'].pk).update(estimated_price=Decimal('80.00'),
+                                                           description='Leaking tap')
+        Job.objects.filter(pk=self.jobs['bradford'].pk).update(estimated_price=Decimal('600.00'))
+
+        def titles(**params):
+            response = self.client.get('/api/jobs/available/', params, secure=True)
+            self.assertEqual(response.status_code, 200, response.data)
+            return self.titles(response.json())
+
+        self.assertEqual(titles(search='tap'), ['first'])
+        self.assertEqual(titles(search='BRADFORD'), ['bradford'])  # Titles match too
+        self.assertEqual(titles(location='somewhere'), ['unlocated'])
+        self.assertEqual(titles(budget_range='0-100'), ['first'])
+        self.assertEqual(titles(budget_range='500+'), ['bradford'])
+        self.assertEqual(titles(category='plumbing'), ['unlocated', 'bradford', 'first'])
+        for bad in ('cheap', '500-100', '-5'):
+            response = self.client.get('/api/jobs/available/', {'budget_range': bad}, secure=True)
+            self.assertEqual(response.status_code, 400)
+
+    def test_providers_only(self):
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get('/api/jobs/available/', secure=True).status_code, 403)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class DashboardStatsTest(TestCase):
+    """Dashboard counters from conditional aggregates, cached per user until their jobs change"""
+
+    def setUp(self):
+        cache.clear()
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.provider = ServiceProvider.objects.create(
+            user=User.objects.create_user('pro', 'pro@example.com', user_type='provider'),
+            business_name='Pro', description='', skills='', service_area='Leeds',
+        )
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        today = timezone.localdate()
+        for title, status, price, days in [
+            ('open', 'pending', None, 3),
+            ('booked', 'accepted', None, 2),
+            ('started', 'in_progress', None, -1),
+            ('done', 'completed', '120.00', -5),
+            ('done again', 'completed', '30.50', -3),
+            ('called off', 'cancelled', None, 1),
+        ]:
+            job = Job.objects.create(
+                customer=self.customer, category=self.plumbing, title=title, description='', address='Leeds',
+                preferred_date=today + datetime.timedelta(days=days), preferred_time='morning', status=status,
+                provider=None if status == 'pending' else self.provider,
+                final_price=Decimal(price) if price else None,
+            )
+            if status == 'pending':
+                self.open_job = job
+        JobApplication.objects.create(job=self.open_job, provider=self.provider)
+        reference.get_categories()  # category_name is served from the reference snapshot
+        self.client = APIClient()
+
+    def test_customer(self):
+        self.client.force_authenticate(self.customer)
+        with self.assertNumQueries(2):  # Job aggregates, pending applications
+            stats = self.client.get('/api/jobs/jobs/customer_stats/', secure=True).json()
+        self.assertEqual(stats, {
+            'active_jobs': 3, 'completed_jobs': 2, 'cancelled_jobs': 1, 'total_jobs': 6,
+            'total_spent': '150.50', 'pending_proposals': 1,
+        })
+        with self.assertNumQueries(0):
+            self.client.get('/api/jobs/jobs/customer_stats/', secure=True)
+        recent = self.client.get('/api/jobs/jobs/customer_recent/', secure=True).json()
+        self.assertEqual(len(recent), 5)
+        self.assertEqual(recent[0]['title'], 'called off')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.open_job.status = 'cancelled'
+            self.open_job.save()
+        stats = self.client.get('/api/jobs/jobs/customer_stats/', secure=True).json()
+        self.assertEqual((stats['active_jobs'], stats['cancelled_jobs']), (2, 2))
+
+    def test_provider(self):
+        self.client.force_authenticate(self.provider.user)
+        with self.assertNumQueries(3):  # Provider id, job aggregates, pending applications
+            stats = self.client.get('/api/jobs/provider/stats/', secure=True).json()
+        self.assertEqual(stats, {
+            'active_jobs': 2, 'completed_jobs': 2, 'cancelled_jobs': 1, 'total_jobs': 5,
+            'total_earned': '150.50', 'pending_proposals': 1,
+        })
+        upcoming = self.client.get('/api/jobs/provider/upcoming/', secure=True).json()
+        self.assertEqual([job['title'] for job in upcoming], ['booked'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            JobApplication.objects.filter(job=self.open_job).get().delete()
+        self.assertEqual(self.client.get('/api/jobs/provider/stats/', secure=True).json()['pending_proposals'], 0)
+
+        self.client.force_authenticate(self.customer)
+        self.assertEqual(self.client.get('/api/jobs/provider/stats/', secure=True).status_code, 403)
+
+
+def photo(width=2000, height=1500, orientation=6, format='JPEG'):
+    """An upload like a phone photo: EXIF orientation and a GPS tag"""
+    image = Image.new('RGB', (width, height), (200, 80, 40))
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x8825] = {2: (53.0, 48.0, 3.0)}  # GPSInfo: latitude
+    buffer = io.BytesIO()
+    image.save(buffer, format, exif=exif)
+    return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(IMAGE_PIPELINE_WORKERS=0)
+class ImageDerivativeTest(TestCase):
+    """Job photos get EXIF-free resized derivatives once they commit"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        self.job = Job.objects.create(
+            customer=self.customer, category=ServiceCategory.objects.create(name='Plumbing', description=''),
+            title='Leak', description='', address='Leeds', preferred_date=datetime.date(2026, 10, 20),
+            preferred_time='morning',
+        )
+
+    def test_render(self):
+        rendered, original, clean = images.render(photo().read())
+        self.assertEqual(original, (1500, 2000))  # Portrait once the orientation is applied
+        with Image.open(io.BytesIO(clean)) as image:
+            self.assertEqual((image.format, image.size, len(image.getexif())), ('JPEG', (1500, 2000), 0))
+        self.assertEqual({size: dims for size, (_, *dims) in rendered.items()},
+                         {'thumbnail': [240, 320], 'medium': [960, 1280], 'webp': [960, 1280]})
+        for data, _, _ in rendered.values():
+            with Image.open(io.BytesIO(data)) as image:
+                self.assertEqual(len(image.getexif()), 0)
+        self.assertLess(len(rendered['thumbnail'][0]), len(rendered['medium'][0]))
+
+    def test_built_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            upload = JobImage.objects.create(job=self.job, image=photo())
+            self.assertEqual(upload.derivatives, {'status': images.PENDING})
+        upload.refresh_from_db()
+        self.assertEqual(upload.derivatives['status'], images.READY)
+        self.assertEqual(upload.derivatives['thumbnail']['width'], 240)
+        self.assertTrue(upload.image.storage.exists(upload.derivatives['webp']['name']))
+        with upload.image.open('rb'), Image.open(upload.image) as stored:
+            self.assertEqual((stored.size, len(stored.getexif())), ((1500, 2000), 0))  # GPS tag gone
+
+        old = upload.derivatives['medium']['name']
+        with self.captureOnCommitCallbacks(execute=True):
+            upload.image = photo(orientation=1)
+            upload.save()
+        upload.refresh_from_db()
+        self.assertEqual(upload.derivatives['medium']['width'], 1280)
+        self.assertFalse(upload.image.storage.exists(old))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            upload.delete()
+        self.assertFalse(upload.image.storage.exists(upload.derivatives['medium']['name']))
+
+    def test_unreadable_upload(self):
+        with self.assertLogs('jobs.images', 'WARNING'), self.captureOnCommitCallbacks(execute=True):
+            update = JobUpdate.objects.create(
+                job=self.job, user=self.customer, message='',
+                image=SimpleUploadedFile('photo.jpg', b'not an image', content_type='image/jpeg'),
+            )
+        update.refresh_from_db()
+        self.assertEqual(update.derivatives, {'status': images.FAILED})
+
+    def test_backfill_and_api(self):
+        update = JobUpdate.objects.create(job=self.job, user=self.customer, message='Fixed', image=photo())
+        JobUpdate.objects.create(job=self.job, user=self.customer, message='No photo')
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        pending = client.get(f'/api/jobs/updates/{update.pk}/', secure=True).json()
+        self.assertEqual(pending['preview'], {'url': None, 'width': None, 'height': None, 'ready': False,
+                                              'webp': None})  # The original still carries its EXIF
+        self.assertNotIn('image', pending)
+
+        call_command('build_image_derivatives', stdout=io.StringIO())
+        update.refresh_from_db()
+        self.assertEqual(update.derivatives['status'], images.READY)
+
+        listed = client.get('/api/jobs/updates/', secure=True).json()
+        previews = {row['message']: row['preview'] for row in listed}
+        self.assertIsNone(previews['No photo'])
+        self.assertEqual((previews['Fixed']['width'], previews['Fixed']['height']), (240, 320))
+        self.assertTrue(previews['Fixed']['url'].endswith('_thumbnail.jpg'))
+        detail = client.get(f'/api/jobs/updates/{update.pk}/', secure=True).json()
+        self.assertTrue(detail['preview']['webp'].endswith('_webp.webp'))
+        self.assertNotIn('derivatives', detail)
+
+
+@override_settings(IMAGE_PIPELINE_WORKERS=1)
+class ImagePoolRecoveryTest(TransactionTestCase):
+    """A pool broken by a dead worker is replaced instead of failing every later photo"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(images.shutdown)
+
+    def test_broken_pool_is_replaced(self):
+        broken = images.executor()
+        with self.assertRaises(BrokenProcessPool):
+            broken.submit(os._exit, 1).result()  # The worker dies, as when killed for memory
+
+        customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        job = Job.objects.create(
+            customer=customer, category=ServiceCategory.objects.create(name='Plumbing', description=''),
+            title='Leak', description='', address='Leeds', preferred_date=datetime.date(2026, 10, 20),
+            preferred_time='morning',
+        )
+        upload = JobImage.objects.create(job=job, image=photo())  # Autocommit: the build is queued right away
+        self.assertIsNot(images.executor(), broken)
+        images.shutdown()
+        upload.refresh_from_db()
+        self.assertEqual(upload.derivatives['status'], images.READY)
+
+
+@override_settings(IMAGE_PIPELINE_WORKERS=0, UPLOAD_CHUNK_BYTES=1024)
+class ChunkedUploadTest(TestCase):
+    """Photos uploaded in resumable, out-of-order chunks and added to the job in one go"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        override = override_settings(MEDIA_ROOT=self.media, UPLOAD_TEMP_DIR=f'{self.media}/uploads')
+        override.enable()
+        self.addCleanup(override.disable)
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        self.job = Job.objects.create(
+            customer=self.customer, category=ServiceCategory.objects.create(name='Plumbing', description=''),
+            title='Leak', description='', address='Leeds', preferred_date=datetime.date(2026, 10, 20),
+            preferred_time='morning',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+        self.url = f'/api/jobs/{self.job.pk}/upload-images/'
+        self.photos = [photo(400, 300).read(), photo(300, 400, orientation=1).read()]
+
+    def initiate(self, photos, **entry):
+        files = [{'name': f'photo{n}.jpg', 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest(),
+                  'description': f'Photo {n}', **entry} for n, data in enumerate(photos)]
+        return self.client.post(self.url, {'files': files}, format='json', secure=True)
+
+    def put(self, upload_id, data, start, **headers):
+        return self.client.generic(
+            'PUT', f'{self.url}{upload_id}/', data[start:start + 1024], 'application/octet-stream', secure=True,
+            **{'HTTP_CONTENT_RANGE': f'bytes {start}-{min(start + 1024, len(data)) - 1}/{len(data)}', **headers},
+        )
+
+    def test_upload_and_finalize(self):
+        started = self.initiate(self.photos)
+        self.assertEqual(started.status_code, 201)
+        body = started.json()
+        self.assertEqual(body['chunk_size'], 1024)
+        for upload, data in zip(body['uploads'], self.photos):
+            # Last chunk first: chunks land at their offsets whatever the order
+            for start in reversed(range(0, len(data), 1024)):
+                response = self.put(upload['id'], data, start)
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['received'], [[0, len(data)]])
+            self.assertTrue(response.json()['complete'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            finished = self.client.post(f'{self.url}{body["batch"]}/finalize/', secure=True)
+        self.assertEqual(finished.status_code, 201)
+        self.assertEqual([row['description'] for row in finished.json()['results']], ['Photo 0', 'Photo 1'])
+        rows = list(self.job.images.order_by('pk'))
+        self.assertEqual(len(rows), 2)
+        for row, size in zip(rows, [(300, 400), (300, 400)]):  # The first one turned upright
+            row.refresh_from_db()
+            self.assertEqual(row.derivatives['status'], images.READY)
+            with row.image.open('rb'), Image.open(row.image) as stored:
+                self.assertEqual((stored.size, len(stored.getexif())), (size, 0))
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertEqual(os.listdir(f'{self.media}/uploads'), [])
+        # A retried finalize finds the batch already claimed and leaves the photos alone
+        self.assertEqual(self.client.post(f'{self.url}{body["batch"]}/finalize/', secure=True).status_code, 404)
+        self.assertEqual(self.job.images.count(), 2)
+        self.assertTrue(all(row.image.storage.exists(row.image.name) for row in rows))
+        self.assertEqual(self.put(body['uploads'][0]['id'], self.photos[0], 0).status_code, 404)
+
+    def test_resume_and_integrity(self):
+        data = self.photos[0]
+        upload = self.initiate([data]).json()['uploads'][0]
+        self.put(upload['id'], data, 0)
+        self.assertEqual(self.put(upload['id'], data, 1024, HTTP_X_CHUNK_SHA256='0' * 64).status_code, 422)
+        status = self.client.get(f'{self.url}{upload["id"]}/', secure=True).json()
+        self.assertEqual(status['received'], [[0, 1024]])  # The corrupt chunk is not counted
+        batch = ImageUpload.objects.get().batch
+        self.assertEqual(self.client.post(f'{self.url}{batch}/finalize/', secure=True).status_code, 409)
+
+        for start in range(1024, len(data), 1024):
+            self.put(upload['id'], data, start)
+        with open(uploads.temp_path(upload['id']), 'r+b') as file:
+            file.write(b'X')  # Corrupted on disk after arriving
+        response = self.client.post(f'{self.url}{batch}/finalize/', secure=True)
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('sha256', response.json()['error'])
+        self.assertEqual(ImageUpload.objects.get().received, [])  # Sent again from scratch
+        self.assertFalse(self.job.images.exists())
+
+    def test_rejected_requests(self):
+        self.assertEqual(self.initiate(self.photos, name='notes.txt').status_code, 400)
+        self.assertEqual(self.initiate(self.photos, size=0).status_code, 400)
+        with override_settings(UPLOAD_MAX_FILES=1):
+            self.assertEqual(self.initiate(self.photos).status_code, 400)
+        upload = self.initiate(self.photos[:1]).json()['uploads'][0]
+        data = self.photos[0]
+        self.assertEqual(self.put(upload['id'], data, 0, HTTP_CONTENT_RANGE='bytes 0-9/1').status_code, 400)
+        self.assertEqual(self.put(upload['id'], data * 2, len(data)).status_code, 400)  # Past the end
+
+        other = User.objects.create_user('other', 'other@example.com', user_type='customer')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.initiate(self.photos).status_code, 404)
+        self.assertEqual(self.put(upload['id'], data, 0).status_code, 404)
+
+    def test_purge(self):
+        upload = self.initiate(self.photos[:1]).json()['uploads'][0]
+        self.put(upload['id'], self.photos[0], 0)
+        call_command('purge_image_uploads', stdout=io.StringIO())
+        self.assertTrue(ImageUpload.objects.exists())
+        ImageUpload.objects.update(created_at=timezone.now() - datetime.timedelta(days=2))
+        call_command('purge_image_uploads', stdout=io.StringIO())
+        self.assertFalse(ImageUpload.objects.exists())
+        self.assertFalse(os.path.exists(uploads.temp_path(upload['id'])))
+
+
+class JobLifecycleTest(TestCase):
+    """Status changes only through the transition engine, one winner per job"""
+
+    def setUp(self):
+        self.customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        self.job = Job.objects.create(
+            customer=self.customer, category=ServiceCategory.objects.create(name='Plumbing', description=''),
+            title='Leak', description='', address='Leeds', preferred_date=datetime.date(2026, 10, 20),
+            preferred_time='morning',
+        )
+        self.providers = [
+            ServiceProvider.objects.create(
+                user=User.objects.create_user(f'pro{n}', f'pro{n}@example.com', user_type='provider'),
+                business_name=f'Pro {n}', description='', skills='', service_area='Leeds',
+                validation_status='validated', is_active=True,
+            )
+            for n in range(3)
+        ]
+        for provider in self.providers:
+            provider.categories.add(self.job.category)
+        self.client = APIClient()
+        self.url = f'/api/jobs/jobs/{self.job.pk}/'
+
+    def as_user(self, user):
+        self.client.force_authenticate(user)
+        return self.client
+
+    def test_apply_accept_and_finish(self):
+        for provider, price in zip(self.providers, ('80.00', '95.00', '120.00')):
+            response = self.as_user(provider.user).post(
+                f'{self.url}apply/', {'message': 'Can do', 'proposed_price': price}, secure=True,
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.client.post(f'{self.url}apply/', {}, secure=True).status_code, 400)
+        chosen = JobApplication.objects.get(provider=self.providers[1])
+
+        client = self.as_user(self.customer)
+        self.assertEqual(client.patch(self.url, {'status': 'completed'}, format='json', secure=True).status_code, 200)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'pending')  # Not writable through the generic update
+        self.assertEqual(client.post(f'{self.url}accept/', {'application': 'x'}, secure=True).status_code, 400)
+        response = client.post(f'{self.url}accept/', {'application': chosen.pk}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'accepted')
+        self.assertIsNotNone(response.json()['accepted_at'])
+        self.assertEqual(dict(JobApplication.objects.values_list('provider', 'status')), {
+            self.providers[0].pk: 'rejected', self.providers[1].pk: 'accepted', self.providers[2].pk: 'rejected',
+        })
+        self.assertEqual(client.post(f'{self.url}start/', secure=True).status_code, 403)
+
+        provider_client = self.as_user(self.providers[1].user)
+        self.assertEqual(provider_client.post(f'{self.url}complete/', secure=True).status_code, 409)
+        self.assertEqual(provider_client.post(f'{self.url}start/', secure=True).status_code, 200)
+        response = provider_client.post(f'{self.url}complete/', secure=True)
+        self.assertEqual(response.json()['final_price'], '95.00')  # The accepted proposal's
+        self.assertIsNotNone(response.json()['completed_at'])
+        history = provider_client.get(f'{self.url}transitions/', secure=True).json()
+        self.assertEqual([(row['from_status'], row['to_status']) for row in history],
+                         [('pending', 'accepted'), ('accepted', 'in_progress'), ('in_progress', 'completed')])
+        self.assertEqual(self.as_user(self.customer).post(f'/api/jobs/{self.job.pk}/cancel/', secure=True).status_code,
+                         409)
+
+    def test_concurrent_accepts(self):
+        # Every provider read the job while it was pending; only the first claim lands
+        stale = [Job.objects.get(pk=self.job.pk) for _ in self.providers]
+        lifecycle.accept(stale[0], self.providers[0].user, self.providers[0])
+        for job, provider in zip(stale[1:], self.providers[1:]):
+            with self.assertRaises(lifecycle.TransitionError) as raised:
+                lifecycle.accept(job, provider.user, provider)
+            self.assertEqual(raised.exception.status_code, 409)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.provider, self.providers[0])
+        self.assertEqual(JobTransition.objects.filter(job=self.job).count(), 1)
+
+        # A proposal answered meanwhile rolls the claim back
+        other = Job.objects.create(
+            customer=self.customer, category=self.job.category, title='Tap', description='', address='Leeds',
+            preferred_date=datetime.date(2026, 10, 20), preferred_time='morning',
+        )
+        application = JobApplication.objects.create(job=other, provider=self.providers[1], status='rejected')
+        with self.assertRaises(lifecycle.TransitionError):
+            lifecycle.accept(other, self.customer, self.providers[1], application)
+        other.refresh_from_db()
+        self.assertEqual((other.status, other.provider, other.transitions.count()), ('pending', None, 0))
+
+    def test_cancel_rejects_proposals(self):
+        JobApplication.objects.create(job=self.job, provider=self.providers[0])
+        self.assertEqual(self.as_user(self.providers[0].user).post(f'/api/jobs/{self.job.pk}/cancel/',
+                                                                   secure=True).status_code, 403)
+        response = self.as_user(self.customer).post(f'/api/jobs/{self.job.pk}/cancel/', secure=True)
+        self.assertEqual(response.json()['status'], 'cancelled')
+        self.assertEqual(JobApplication.objects.get().status, 'rejected')
+        self.assertEqual(self.as_user(self.providers[1].user).post(f'{self.url}accept/', secure=True).status_code, 404)
+
+    def test_only_the_customer_edits_or_deletes(self):
+        intruder = self.as_user(self.providers[0].user)
+        self.assertEqual(intruder.patch(self.url, {'title': 'hijacked'}, format='json', secure=True).status_code, 404)
+        self.assertEqual(intruder.delete(self.url, secure=True).status_code, 404)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.title, 'Leak')
+        self.assertEqual(self.as_user(self.customer).patch(self.url, {'title': 'Big leak'}, format='json',
+                                                           secure=True).status_code, 200)
+
+    def test_only_eligible_providers_are_assigned(self):
+        unvalidated, inactive, other_trade = self.providers
+        ServiceProvider.objects.filter(pk=unvalidated.pk).update(validation_status='pending')
+        ServiceProvider.objects.filter(pk=inactive.pk).update(is_active=False)
+        other_trade.categories.clear()
+        for provider in self.providers:
+            self.assertEqual(self.as_user(provider.user).post(f'{self.url}accept/', secure=True).status_code, 403)
+        application = JobApplication.objects.create(job=self.job, provider=unvalidated)
+        response = self.as_user(self.customer).post(f'{self.url}accept/', {'application': application.pk},
+                                                    secure=True)
+        self.assertEqual(response.status_code, 403)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'pending')
+
+    def test_counters_and_activity(self):
+        counters.get_counts()  # Creates the counters from the tables
+        client = self.as_user(self.providers[0].user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for step in ('accept', 'start', 'complete'):
+                self.assertEqual(client.post(f'{self.url}{step}/', secure=True).status_code, 200)
+        self.assertEqual(counters.get_counts(), counters.exact_counts())
+        self.assertEqual(counters.get_counts()[counters.job_status('completed')], 1)
+        self.assertTrue(ActivityEvent.objects.filter(event_type='job_completed',
+                                                     provider=self.providers[0].pk).exists())
+        self.providers[0].refresh_from_db()
+        self.assertEqual(self.providers[0].total_jobs, 1)  # Counted for the leaderboard's jobs component
@@ -0,0 +1,284 @@
+# FixMate - Chunked Job Photo Uploads
+#
+# Phone photos are large and mobile connections drop, so photos are uploaded
+# to /api/jobs/{id}/upload-images/ in resumable chunks instead of one
+# multipart request:
+#
+#   POST upload-images/                   {"files": [{"name", "size", "sha256", "description"}]}
+#                                         -> a batch id and one upload id per photo
+#   PUT  upload-images/{upload}/          raw bytes, Content-Range: bytes start-end/size
+#   GET  upload-images/{upload}/          the byte ranges received so far, to resume
+#   POST upload-images/{batch}/finalize/  -> the created JobImage rows
+#
+# Each chunk is streamed from the request in BLOCK_BYTES reads and written
+# at its offset in the photo's temporary file with pwrite, so a worker holds
+# one block per request whatever the chunk size, and chunks of a photo can
+# arrive in any order and in parallel. Only the bookkeeping of the received
+# ranges is serialized, on the upload's row. Finalize locks the batch's
+# rows, checks every photo's SHA-256 and that Pillow can read it, claims the
+# batch by deleting its rows, moves the files into storage and creates the
+# batch's JobImage rows, all in one transaction; derivatives are then
+# built as for any new photo (jobs.images). Uploads left unfinished for
+# UPLOAD_SESSION_HOURS are removed by manage.py purge_image_uploads.
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.validators import get_available_image_extensions
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from . import images
+from .models import ImageUpload, JobImage
+
+BLOCK_BYTES = 64 * 1024
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+class UploadError(ValueError):
+    """A request the upload protocol rejects; status_code is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StagedFile(File):
+    """An assembled upload on disk; FileSystemStorage moves it into place instead of copying it"""
+
+    def __init__(self, path, name):
+        super().__init__(open(path, 'rb'), name)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def temp_dir():
+    directory = getattr(settings, 'UPLOAD_TEMP_DIR', None) or os.path.join(tempfile.gettempdir(), 'fixmate-uploads')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def temp_path(upload_id):
+    return os.path.join(temp_dir(), f'{upload_id}.part')
+
+
+def merge(ranges, start, end):
+    """Sorted, non-overlapping [start, end) ranges with [start, end) added; touching ranges are joined"""
+    merged = []
+    for low, high in sorted([*ranges, [start, end]]):
+        if merged and low <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return merged
+
+
+def is_complete(upload):
+    return upload.received == [[0, upload.size]]
+
+
+def describe(upload):
+    return {
+        'id': str(upload.pk),
+        'filename': upload.filename,
+        'size': upload.size,
+        'received': upload.received,
+        'complete': is_complete(upload),
+    }
+
+
+def _file_entry(entry):
+    if not isinstance(entry, dict):
+        raise UploadError('Each file must be an object with name, size and sha256')
+    name = os.path.basename(str(entry.get('name') or '').replace('\\', '/')).strip()
+    extension = os.path.splitext(name)[1][1:].lower()
+    if not name or extension not in get_available_image_extensions():
+        raise UploadError(f'{name or "A file"} is not an image file name')
+    size = entry.get('size')
+    max_bytes = getattr(settings, 'UPLOAD_MAX_FILE_BYTES', 25 * 1024 * 1024)
+    if not isinstance(size, int) or isinstance(size, bool) or not 0 < size <= max_bytes:
+        raise UploadError(f'{name}: size must be between 1 and {max_bytes} bytes')
+    sha256 = str(entry.get('sha256') or '').lower()
+    if not SHA256.match(sha256):
+        raise UploadError(f'{name}: sha256 must be the hex SHA-256 of the file')
+    return name[-255:], size, sha256, str(entry.get('description') or '')[:200]
+
+
+def initiate(job, user, files):
+    """Open a batch of uploads, one per photo described in ``files``; returns the batch id and the uploads"""
+    max_files = getattr(settings, 'UPLOAD_MAX_FILES', 10)
+    if not isinstance(files, list) or not files:
+        raise UploadError('files must be a non-empty list')
+    if len(files) > max_files:
+        raise UploadError(f'At most {max_files} photos can be uploaded at once')
+    batch = uuid.uuid4()
+    uploads = [
+        ImageUpload(batch=batch, job=job, user=user, position=position, filename=name, size=size, sha256=sha256,
+                    description=description)
+        for position, (name, size, sha256, description) in enumerate(map(_file_entry, files))
+    ]
+    return batch, ImageUpload.objects.bulk_create(uploads)
+
+
+def parse_content_range(header, size):
+    """(start, end) of a chunk, end exclusive, from a Content-Range header for a file of ``size`` bytes"""
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range must be "bytes start-end/size"')
+    start, last, total = match.groups()
+    start, end = int(start), int(last) + 1
+    if total != '*' and int(total) != size:
+        raise UploadError(f'Content-Range size {total} does not match the declared size {size}')
+    if start >= end or end > size:
+        raise UploadError(f'Content-Range {start}-{last} is outside the file\'s {size} bytes')
+    return start, end
+
+
+def write_chunk(upload, start, end, stream, chunk_sha256=None):
+    """
+    Stream ``end - start`` bytes from ``stream`` into the upload's temporary
+    file at ``start`` and record the range; returns the upload, updated.
+    A chunk that is cut short or fails ``chunk_sha256`` is not recorded.
+    """
+    if end - start > getattr(settings, 'UPLOAD_CHUNK_BYTES', 4 * 1024 * 1024):
+        raise UploadError('Chunk is larger than the chunk size', status_code=413)
+    digest = hashlib.sha256()
+    fd = os.open(temp_path(upload.pk), os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        offset = start
+        while offset < end:
+            block = stream.read(min(BLOCK_BYTES, end - offset))
+            if not block:
+                raise UploadError(f'Chunk ended at byte {offset} of {start}-{end - 1}')
+            os.pwrite(fd, block, offset)
+            digest.update(block)
+            offset += len(block)
+    finally:
+        os.close(fd)
+    if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+        raise UploadError('Chunk does not match its X-Chunk-SHA256', status_code=422)
+
+    with transaction.atomic():
+        upload = ImageUpload.objects.select_for_update().filter(pk=upload.pk).first()
+        if upload is None:
+            raise UploadError('Unknown upload', status_code=404)  # Finalized or purged meanwhile
+        upload.received = merge(upload.received, start, end)
+        upload.save(update_fields=['received'])
+    return upload
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _verify(upload):
+    """Reasons the assembled upload can't become a JobImage, or None"""
+    path = temp_path(upload.pk)
+    if not os.path.exists(path) or os.path.getsize(path) != upload.size:
+        return 'is missing data'
+    if _sha256(path) != upload.sha256:
+        return 'does not match its sha256'
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return 'is not a readable image'
+    return None
+
+
+def _restart(uploads):
+    """Forget what was received, so the client sends these photos again"""
+    ImageUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).update(received=[])
+    for upload in uploads:
+        discard(upload.pk)
+
+
+def discard(upload_id):
+    try:
+        os.remove(temp_path(upload_id))
+    except FileNotFoundError:
+        pass
+
+
+def finalize(job, batch):
+    """
+    Turn a fully received batch into JobImage rows, atomically; returns the
+    rows in upload order. The batch's rows are locked and deleted before any
+    file moves, so a retried finalize racing this one either waits and then
+    finds no batch, or fails to claim it; it never touches this call's files.
+    """
+    storage = JobImage._meta.get_field('image').storage
+    stored = []
+    claimed = None
+    rejected = []
+    try:
+        with transaction.atomic():
+            uploads = list(ImageUpload.objects.select_for_update().filter(job=job, batch=batch).order_by('position'))
+            if not uploads:
+                raise UploadError('Unknown upload batch', status_code=404)
+            incomplete = [upload.filename for upload in uploads if not is_complete(upload)]
+            if incomplete:
+                raise UploadError(f'Not every chunk has arrived for: {", ".join(incomplete)}', status_code=409)
+            rejected = [(upload, reason) for upload in uploads if (reason := _verify(upload))]
+            if rejected:
+                # Committed with the transaction; the client sends these photos again
+                ImageUpload.objects.filter(pk__in=[upload.pk for upload, _ in rejected]).update(received=[])
+            else:
+                if ImageUpload.objects.filter(pk__in=[upload.pk for upload in uploads]).delete()[0] != len(uploads):
+                    raise UploadError('The batch is already being finalized', status_code=409)
+                claimed = uploads
+                rows = []
+                for upload in uploads:
+                    # bulk_create sends no signals: mark derivatives pending and queue them here
+                    row = JobImage(job=job, description=upload.description, derivatives={'status': images.PENDING})
+                    with StagedFile(temp_path(upload.pk), upload.filename) as staged:
+                        row.image.save(upload.filename, staged, save=False)
+                    stored.append(row.image.name)
+                    rows.append(row)
+                rows = JobImage.objects.bulk_create(rows)
+                for row in rows:
+                    images.build_on_commit(row)
+    except Exception:
+        for name in stored:
+            storage.delete(name)
+        if claimed:
+            _restart(claimed)  # The rollback restored their rows, but their files may have moved already
+        raise
+    if rejected:
+        for upload, _ in rejected:
+            discard(upload.pk)
+        raise UploadError('; '.join(f'{upload.filename} {reason}' for upload, reason in rejected),
+                          status_code=422)
+    for upload in claimed:
+        discard(upload.pk)  # Left behind when storage copied rather than moved
+    return rows
+
+
+def purge(hours=None):
+    """Delete uploads older than ``hours`` (UPLOAD_SESSION_HOURS) and stray temporary files; returns the count"""
+    hours = getattr(settings, 'UPLOAD_SESSION_HOURS', 24) if hours is None else hours
+    stale = ImageUpload.objects.filter(created_at__lt=timezone.now() - timedelta(hours=hours))
+    ids = list(stale.values_list('pk', flat=True))
+    stale.delete()
+    for upload_id in ids:
+        discard(upload_id)
+    cutoff = time.time() - hours * 3600
+    for entry in os.scandir(temp_dir()):
+        if entry.name.endswith('.part') and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+    return len(ids)
@@ -7,6 +7,16 @@ router.register(r'jobs', JobViewSet, basename='job')
 router.register(r'applications', JobApplicationViewSet, basename='jobapplication')
 router.register(r'updates', JobUpdateViewSet, basename='jobupdate')
 
+# Paths the dashboards call directly under /api/jobs/, outside the router's prefixes
 urlpatterns = [
+    path('available/', JobViewSet.as_view({'get': 'available'}), name='job-feed'),
+    path('provider/stats/', JobViewSet.as_view({'get': 'provider_stats'}), name='provider-job-stats'),
+    path('provider/upcoming/', JobViewSet.as_view({'get': 'provider_upcoming'}), name='provider-upcoming-jobs'),
+    path('<int:pk>/upload-images/', JobViewSet.as_view({'post': 'upload_images'}), name='job-upload-images'),
+    path('<int:pk>/upload-images/<uuid:upload_id>/', JobViewSet.as_view({'get': 'upload_chunk', 'put': 'upload_chunk'}),
+         name='job-upload-chunk'),
+    path('<int:pk>/upload-images/<uuid:batch_id>/finalize/', JobViewSet.as_view({'post': 'finalize_images'}),
+         name='job-finalize-images'),
+    path('<int:pk>/cancel/', JobViewSet.as_view({'post': 'cancel'}), name='job-cancel'),
     path('', include(router.urls)),
 ]
@@ -1,18 +1,43 @@
+import re
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Job, JobImage, JobApplication, JobUpdate
-from .serializers import JobSerializer, JobImageSerializer, JobApplicationSerializer, JobUpdateSerializer
+from fixmate_backend.pagination import KeysetPagination
+from services import geo
+from services.models import ServiceProvider
+from services.views import nearby_providers_response
+from . import dashboard, lifecycle, matching, uploads
+from .models import Job, ImageUpload, JobImage, JobApplication, JobUpdate
+from .serializers import (
+    JobSerializer, JobImageSerializer, JobApplicationSerializer, JobTransitionSerializer, JobUpdateSerializer,
+)
+
+BUDGET_RANGE = re.compile(r'^(\d+(?:\.\d+)?)(?:-(\d+(?:\.\d+)?)|\+)$')
+
 
 class JobViewSet(viewsets.ModelViewSet):
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
+    feed_page_size = 20
+    feed_closed_limit = 500  # Most ids of closed jobs returned to a ?since= poll
 
     def get_queryset(self):
+        if self.action in ('update', 'partial_update', 'destroy'):
+            # Only the customer who posted a job edits or deletes it
+            return Job.objects.filter(customer=self.request.user)
         if self.request.user.user_type == 'customer':
             return Job.objects.filter(customer=self.request.user)
         elif self.request.user.user_type == 'provider':
-            return Job.objects.filter(status__in=['open', 'in_progress'])
+            # Jobs still taking proposals, and the provider's own
+            return Job.objects.filter(Q(status='pending') | Q(provider__user=self.request.user))
         return Job.objects.all()
 
     def perform_create(self, serializer):
@@ -20,24 +45,290 @@ class JobViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['post'])
     def apply(self, request, pk=None):
+        """Send a proposal for a pending job: {message, proposed_price, estimated_duration}"""
         job = self.get_object()
-        if request.user.user_type != 'provider':
+        provider = ServiceProvider.objects.filter(user=request.user).first()
+        if request.user.user_type != 'provider' or provider is None:
             return Response({'error': 'Only providers can apply to jobs'}, 
                           status=status.HTTP_403_FORBIDDEN)
-        
-        application, created = JobApplication.objects.get_or_create(
-            job=job, 
-            provider=request.user,
-            defaults={'proposal': request.data.get('proposal', '')}
-        )
-        
-        if not created:
+        if job.status != 'pending':
+            return Response({'error': 'The job is no longer taking proposals'}, status=status.HTTP_409_CONFLICT)
+        if JobApplication.objects.filter(job=job, provider=provider).exists():
             return Response({'error': 'Already applied to this job'}, 
                           status=status.HTTP_400_BAD_REQUEST)
-        
-        serializer = JobApplicationSerializer(application)
+
+        serializer = JobApplicationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(job=job, provider=provider)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def _transition(self, job, change, *args, **kwargs):
+        try:
+            job = change(job, self.request.user, *args, **kwargs)
+        except lifecycle.TransitionError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True, methods=['post'])
+    def accept(self, request, pk=None):
+        """Assign the job: the customer accepts a proposal ({"application": id}), or a provider takes it"""
+        job = self.get_object()
+        if request.user.user_type == 'provider':
+            provider = ServiceProvider.objects.filter(user=request.user).first()
+            if provider is None:
+                return Response({'error': 'Not a service provider'}, status=status.HTTP_403_FORBIDDEN)
+            return self._transition(job, lifecycle.accept, provider)
+        if job.customer_id != request.user.pk:
+            return Response({'error': 'Only the customer can accept a proposal'}, status=status.HTTP_403_FORBIDDEN)
+        application = None
+        if str(request.data.get('application', '')).isdigit():
+            application = JobApplication.objects.filter(
+                job=job, pk=request.data['application'],
+            ).select_related('provider').first()
+        if application is None:
+            return Response({'error': 'Unknown proposal'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._transition(job, lifecycle.accept, application.provider, application)
+
+    @action(detail=True, methods=['post'])
+    def start(self, request, pk=None):
+        job = self.get_object()
+        if job.provider is None or job.provider.user_id != request.user.pk:
+            return Response({'error': 'Only the assigned provider can start the job'},
+                            status=status.HTTP_403_FORBIDDEN)
+        return self._transition(job, lifecycle.start)
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Mark the job done (customer or assigned provider); optional {"final_price": ...}"""
+        job = self.get_object()
+        if job.customer_id != request.user.pk and (job.provider is None or job.provider.user_id != request.user.pk):
+            return Response({'error': 'Only the customer or the assigned provider can complete the job'},
+                            status=status.HTTP_403_FORBIDDEN)
+        final_price = request.data.get('final_price')
+        if final_price in (None, ''):
+            final_price = None
+        else:
+            try:
+                final_price = Job._meta.get_field('final_price').clean(final_price, job)
+            except ValidationError:
+                return Response({'error': 'final_price must be an amount'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._transition(job, lifecycle.complete, final_price)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        if job.customer_id != request.user.pk:
+            return Response({'error': 'Only the customer can cancel the job'}, status=status.HTTP_403_FORBIDDEN)
+        return self._transition(job, lifecycle.cancel)
+
+    @action(detail=True, methods=['get'])
+    def transitions(self, request, pk=None):
+        """The job's status history, oldest first"""
+        job = self.get_object()
+        return Response(JobTransitionSerializer(job.transitions.all(), many=True).data)
+
+    @action(detail=True, methods=['get'])
+    def nearby_providers(self, request, pk=None):
+        """Providers around the job's location, nearest first (see services.views.nearby_providers_response)"""
+        job = self.get_object()
+        if job.latitude is None or job.longitude is None:
+            return Response({'error': 'Job location is unknown'}, status=status.HTTP_400_BAD_REQUEST)
+        return nearby_providers_response(request, job.latitude, job.longitude)
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """
+        The provider's job feed: open jobs in their categories (or ?category=,
+        one of them, by id or name), preferred between ?date_from= (default
+        today) and ?date_to=, within ?radius_km= of their service area when
+        both sides are located. ?search= matches the title or description,
+        ?location= the address and ?budget_range= ("100-500" or "1000+") the
+        estimated price. Keyset-paginated newest first off the (status,
+        category, created_at, id) index.
+
+        ?since= (ISO timestamp, normally the as_of of the previous poll) keeps
+        only jobs posted after it, so a polling client transfers just the new
+        ones; the first page then also lists in ``closed`` the ids of jobs
+        in the provider's categories that stopped being open after it, for
+        the client to drop.
+        """
+        provider = ServiceProvider.objects.filter(user=request.user).only('pk', 'latitude', 'longitude').first()
+        if provider is None:
+            return Response({'error': 'Only providers have a job feed'}, status=status.HTTP_403_FORBIDDEN)
+        as_of = timezone.now()
+        params = request.query_params
+        try:
+            category = params.get('category', '').strip() or None
+            radius_km = min(float(params.get('radius_km', getattr(settings, 'JOB_FEED_RADIUS_KM', 50))), 500.0)
+            date_from = date.fromisoformat(params['date_from']) if params.get('date_from') else timezone.localdate()
+            date_to = date.fromisoformat(params['date_to']) if params.get('date_to') else None
+            since = parse_datetime(params['since']) if params.get('since') else None
+            if params.get('since') and since is None:
+                raise ValueError
+            budget = self._budget_range(params.get('budget_range', '').strip())
+        except ValueError:
+            return Response({'error': 'radius_km must be a number, date_from/date_to YYYY-MM-DD, since an ISO '
+                                      'timestamp and budget_range "min-max" or "min+"'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        categories = ServiceProvider.categories.through.objects.filter(
+            serviceprovider_id=provider.pk
+        ).values('servicecategory_id')
+        queryset = Job.objects.filter(
+            status='pending', provider__isnull=True, category_id__in=categories, preferred_date__gte=date_from,
+        ).select_related('customer')
+        if category is not None and category.isdigit():
+            queryset = queryset.filter(category_id=int(category))
+        elif category is not None:
+            queryset = queryset.filter(category__name__iexact=category)
+        if date_to is not None:
+            queryset = queryset.filter(preferred_date__lte=date_to)
+        search = ' '.join(params.get('search', '').split())
+        if search:
+            queryset = queryset.filter(Q(title__icontains=search) | Q(description__icontains=search))
+        location = ' '.join(params.get('location', '').split())
+        if location:
+            queryset = queryset.filter(address__icontains=location)
+        if budget is not None:
+            low, high = budget
+            queryset = queryset.filter(estimated_price__gte=low)
+            if high is not None:
+                queryset = queryset.filter(estimated_price__lte=high)
+        if since is not None and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        if since is not None:
+            queryset = queryset.filter(created_at__gt=since)
+        if provider.latitude is not None and provider.longitude is not None:
+            # Jobs that could not be located stay in the feed
+            min_lat, max_lat, min_lon, max_lon = geo.bounding_box(provider.latitude, provider.longitude, radius_km)
+            queryset = queryset.exclude(latitude__lt=min_lat).exclude(latitude__gt=max_lat)
+            if min_lon >= -180 and max_lon <= 180:
+                queryset = queryset.exclude(longitude__lt=min_lon).exclude(longitude__gt=max_lon)
+
+        paginator = KeysetPagination(ordering=('-created_at', '-id'), page_size=self.feed_page_size)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        response = paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['as_of'] = as_of
+        if since is not None and not params.get(paginator.cursor_query_param):
+            closed = Job.objects.filter(category_id__in=categories, updated_at__gt=since).exclude(
+                status='pending', provider__isnull=True,
+            ).order_by('-updated_at').values_list('pk', flat=True)
+            response.data['closed'] = list(closed[:self.feed_closed_limit])
+        return response
+
+    @staticmethod
+    def _budget_range(value):
+        """(low, high) from "low-high", (low, None) from "low+", None from ""; ValueError otherwise"""
+        if not value:
+            return None
+        match = BUDGET_RANGE.match(value)
+        if not match:
+            raise ValueError(value)
+        low, high = Decimal(match.group(1)), match.group(2)
+        if high is not None and Decimal(high) < low:
+            raise ValueError(value)
+        return low, None if high is None else Decimal(high)
+
+    @action(detail=False, methods=['get'])
+    def customer_stats(self, request):
+        """Dashboard counters over the customer's jobs (jobs.dashboard)"""
+        user_id = request.user.pk
+        return Response(dashboard.cached('customer', user_id, 'stats', lambda: dashboard.customer_stats(user_id)))
+
+    @action(detail=False, methods=['get'])
+    def customer_recent(self, request):
+        user_id = request.user.pk
+        return Response(dashboard.cached('customer', user_id, 'recent', lambda: dashboard.customer_recent(user_id)))
+
+    def _provider_id(self, request):
+        return ServiceProvider.objects.filter(user=request.user).values_list('pk', flat=True).first()
+
+    @action(detail=False, methods=['get'], url_path='provider/stats')
+    def provider_stats(self, request):
+        """Dashboard counters over the provider's assigned jobs and applications (jobs.dashboard)"""
+        provider_id = self._provider_id(request)
+        if provider_id is None:
+            return Response({'error': 'Not a service provider'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(dashboard.cached('provider', provider_id, 'stats',
+                                         lambda: dashboard.provider_stats(provider_id)))
+
+    @action(detail=False, methods=['get'], url_path='provider/upcoming')
+    def provider_upcoming(self, request):
+        """The provider's accepted and in-progress jobs from today on, soonest first"""
+        provider_id = self._provider_id(request)
+        if provider_id is None:
+            return Response({'error': 'Not a service provider'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(dashboard.cached('provider', provider_id, 'upcoming',
+                                         lambda: dashboard.provider_upcoming(provider_id)))
+
+    @action(detail=True, methods=['get'])
+    def matches(self, request, pk=None):
+        """Best candidate providers for the job, scored by jobs.matching; ?limit= (default 20, max 100)"""
+        if request.user.user_type == 'provider':
+            return Response({'error': 'Only the customer can see matches for a job'},
+                            status=status.HTTP_403_FORBIDDEN)
+        job = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': matching.matches(job, limit)})
+
+    def _customer_job(self, request):
+        job = self.get_object()
+        if job.customer_id != request.user.pk:
+            return None
+        return job
+
+    @action(detail=True, methods=['post'], url_path='upload-images')
+    def upload_images(self, request, pk=None):
+        """Start a chunked upload of job photos (see jobs.uploads): {"files": [{name, size, sha256, description}]}"""
+        job = self._customer_job(request)
+        if job is None:
+            return Response({'error': 'Only the customer can add photos to a job'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            batch, created = uploads.initiate(job, request.user, request.data.get('files'))
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response({
+            'batch': str(batch),
+            'chunk_size': getattr(settings, 'UPLOAD_CHUNK_BYTES', 4 * 1024 * 1024),
+            'uploads': [uploads.describe(upload) for upload in created],
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get', 'put'], url_path=r'upload-images/(?P<upload_id>[0-9a-f-]{36})')
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        """PUT one chunk of a photo (raw bytes with Content-Range); GET the ranges received so far"""
+        job = self._customer_job(request)
+        upload = job and ImageUpload.objects.filter(job=job, pk=upload_id).first()
+        if upload is None:
+            return Response({'error': 'Unknown upload'}, status=status.HTTP_404_NOT_FOUND)
+        if request.method == 'PUT':
+            try:
+                start, end = uploads.parse_content_range(request.headers.get('Content-Range'), upload.size)
+                if int(request.headers.get('Content-Length') or 0) != end - start:
+                    raise uploads.UploadError('Content-Length does not match Content-Range')
+                # Read from the raw stream: request.data would buffer the whole body
+                upload = uploads.write_chunk(upload, start, end, request.stream,
+                                             request.headers.get('X-Chunk-SHA256'))
+            except uploads.UploadError as e:
+                return Response({'error': str(e)}, status=e.status_code)
+        return Response(uploads.describe(upload))
+
+    @action(detail=True, methods=['post'], url_path=r'upload-images/(?P<batch_id>[0-9a-f-]{36})/finalize')
+    def finalize_images(self, request, pk=None, batch_id=None):
+        """Check the batch's photos and add them to the job, all or none"""
+        job = self._customer_job(request)
+        if job is None:
+            return Response({'error': 'Only the customer can add photos to a job'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            created = uploads.finalize(job, batch_id)
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        serializer = JobImageSerializer(created, many=True, context={**self.get_serializer_context(),
+                                                                     'image_size': 'thumbnail'})
+        return Response({'results': serializer.data}, status=status.HTTP_201_CREATED)
+
 class JobApplicationViewSet(viewsets.ModelViewSet):
     serializer_class = JobApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -52,5 +343,9 @@ class JobUpdateViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return JobUpdate.objects.filter(job__customer=self.request.user)
 
+    def get_serializer_context(self):
+        # Lists show thumbnails; a single update shows the medium photo
+        return {**super().get_serializer_context(), 'image_size': 'thumbnail' if self.action == 'list' else 'medium'}
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
\ No newline at end of file
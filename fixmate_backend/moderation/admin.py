@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import ReviewClaim
+
+@admin.register(ReviewClaim)
+class ReviewClaimAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'reviewer', 'claimed_at', 'expires_at')
+    list_filter = ('kind',)
+    ordering = ('expires_at',)
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('verification', 'User Verification'), ('provider', 'Provider Validation')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('claimed_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('reviewer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_claims', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reviewer', 'kind', 'expires_at'], name='review_claim_reviewer_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reviewclaim',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='review_claim_unique'),
+        ),
+    ]
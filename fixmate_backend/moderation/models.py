@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.db import models
+
+
+class ReviewClaim(models.Model):
+    """
+    A reviewer's lease on one pending item of the review queue (see moderation.queue).
+
+    A claim whose lease has expired no longer hides its item from other
+    reviewers; the row is simply taken over by the next claim.
+    """
+    KIND_CHOICES = [
+        ('verification', 'User Verification'),
+        ('provider', 'Provider Validation'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    reviewer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='review_claims')
+    claimed_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='review_claim_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['reviewer', 'kind', 'expires_at'], name='review_claim_reviewer_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} claimed by {self.reviewer_id}"
@@ -0,0 +1,128 @@
+# FixMate - Reviewer Work Queue
+#
+# Pending user verifications and provider validations are handed out to
+# reviewers a few at a time instead of every admin loading the full backlog.
+# claim() picks the oldest pending items nobody holds a live lease on with
+# SELECT ... FOR UPDATE SKIP LOCKED, so concurrent reviewers never wait on
+# or receive each other's rows, and records a ReviewClaim lease per item.
+# Reviewers extend their leases with heartbeat(); items whose lease lapses
+# return to the queue. ack() applies a batch of decisions set-based and
+# drops the claims.
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from fixmate_backend import bulk
+from services.models import ServiceProvider
+from users.models import UserVerification
+from .models import ReviewClaim
+
+NOT_CLAIMED = 'not_claimed'
+
+QUEUES = {
+    # kind: (pending queryset factory, queue order, decision function)
+    'verification': (
+        lambda: UserVerification.objects.filter(verification_status='pending'),
+        ('submitted_at', 'id'),
+        bulk.review_verifications,
+    ),
+    'provider': (
+        lambda: ServiceProvider.objects.filter(validation_status='pending'),
+        ('created_at', 'id'),
+        bulk.validate_providers,
+    ),
+}
+
+
+def lease_seconds():
+    return getattr(settings, 'REVIEW_QUEUE_LEASE_SECONDS', 300)
+
+
+def pending(kind):
+    return QUEUES[kind][0]()
+
+
+def held(reviewer, kind, now=None):
+    """Live claims of ``reviewer`` on ``kind`` items"""
+    return ReviewClaim.objects.filter(reviewer=reviewer, kind=kind, expires_at__gt=now or timezone.now())
+
+
+def claim(reviewer, kind, limit):
+    """
+    Lease up to ``limit`` items to ``reviewer``, renewing the ones it already holds.
+
+    Returns (object ids in queue order, lease expiry).
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=lease_seconds())
+    queue_order = QUEUES[kind][1]
+
+    with transaction.atomic():
+        mine = list(held(reviewer, kind, now).order_by('claimed_at', 'object_id')
+                    .values_list('object_id', flat=True)[:limit])
+        held(reviewer, kind, now).filter(object_id__in=mine).update(expires_at=expires_at)
+
+        wanted = limit - len(mine)
+        if wanted > 0:
+            live = ReviewClaim.objects.filter(kind=kind, object_id=OuterRef('pk'), expires_at__gt=now)
+            candidates = list(
+                pending(kind).exclude(Exists(live)).order_by(*queue_order)
+                .select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:wanted]
+            )
+            if candidates:
+                # Expired leases are taken over; a claim committed by a concurrent
+                # reviewer since our snapshot wins over ours
+                ReviewClaim.objects.filter(kind=kind, object_id__in=candidates, expires_at__lte=now).delete()
+                ReviewClaim.objects.bulk_create([
+                    ReviewClaim(kind=kind, object_id=pk, reviewer=reviewer, claimed_at=now, expires_at=expires_at)
+                    for pk in candidates
+                ], ignore_conflicts=True)
+                won = set(ReviewClaim.objects.filter(
+                    kind=kind, object_id__in=candidates, reviewer=reviewer, claimed_at=now,
+                ).values_list('object_id', flat=True))
+                mine += [pk for pk in candidates if pk in won]
+    return mine, expires_at
+
+
+def heartbeat(reviewer, kind, ids=None):
+    """Extend the reviewer's live leases (all of them, or just ``ids``); returns (count, new expiry)"""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=lease_seconds())
+    claims = held(reviewer, kind, now)
+    if ids is not None:
+        claims = claims.filter(object_id__in=ids)
+    return claims.update(expires_at=expires_at), expires_at
+
+
+def release(reviewer, kind, ids=None):
+    """Give items back to the queue without deciding them"""
+    claims = ReviewClaim.objects.filter(reviewer=reviewer, kind=kind)
+    if ids is not None:
+        claims = claims.filter(object_id__in=ids)
+    return claims.delete()[0]
+
+
+def ack(reviewer, kind, approve=(), reject=()):
+    """
+    Apply a batch of decisions on items the reviewer holds a live lease on.
+
+    Returns per-ID results; items not (or no longer) claimed by the reviewer
+    are reported as ``not_claimed`` and left untouched.
+    """
+    decide = QUEUES[kind][2]
+    ids = list(dict.fromkeys([*approve, *reject]))
+    with transaction.atomic():
+        owned = set(held(reviewer, kind).filter(object_id__in=ids).select_for_update()
+                    .values_list('object_id', flat=True))
+        results = {pk: {'id': pk, 'result': NOT_CLAIMED} for pk in ids if pk not in owned}
+        for approved, decided in ((True, approve), (False, reject)):
+            decided = [pk for pk in decided if pk in owned and pk not in results]
+            if decided:
+                results.update((row['id'], row) for row in decide(decided, approved))
+        ReviewClaim.objects.filter(kind=kind, object_id__in=owned).delete()
+    return [results[pk] for pk in ids]
@@ -0,0 +1,123 @@
+# FixMate - Provider Availability Bitmaps
+#
+# A provider's weekly hours (ProviderAvailability rows) are also kept as one
+# 48-bit mask per weekday on the provider row, bit i standing for the
+# 30-minute slot starting at i * 30 minutes past midnight; a slot is set when
+# the provider's window covers all of it. Job.preferred_time maps onto a
+# fixed slot mask and Job.preferred_date onto a weekday column, so "which
+# plumbers are free Tuesday afternoon" is a bitwise test on columns of the
+# rows an ordinary (category, validation) scan already reads: no join to the
+# availability table and no time comparisons. The same masks load into a
+# NumPy matrix for bulk matching in memory.
+#
+# The masks are rebuilt from ProviderAvailability by the signals in
+# services.signals whenever a provider's rows change.
+
+import numpy as np
+from django.db.models import F
+from django.db.models.lookups import Exact, GreaterThan
+
+from .models import ProviderAvailability, ServiceProvider
+
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+DAYS = [day for day, _ in ProviderAvailability.DAYS_OF_WEEK]  # date.weekday() order
+FIELDS = [f'slots_{day}' for day in DAYS]
+
+
+def window_mask(start_time, end_time):
+    """Slots fully inside [start_time, end_time); an end at or before the start runs to midnight"""
+    start = -(-(start_time.hour * 60 + start_time.minute) // SLOT_MINUTES)  # Round up to a slot boundary
+    end_minutes = end_time.hour * 60 + end_time.minute
+    end = SLOTS_PER_DAY if end_minutes <= start_time.hour * 60 + start_time.minute else end_minutes // SLOT_MINUTES
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+
+def _hours_mask(start_hour, end_hour):
+    start, end = start_hour * 60 // SLOT_MINUTES, end_hour * 60 // SLOT_MINUTES
+    return ((1 << (end - start)) - 1) << start
+
+
+# Job.TIME_PREFERENCES windows
+PERIODS = {
+    'morning': _hours_mask(8, 12),
+    'afternoon': _hours_mask(12, 17),
+    'evening': _hours_mask(17, 21),
+}
+
+
+def day_field(day):
+    """Mask column for a weekday name or a date"""
+    if not isinstance(day, str):
+        day = DAYS[day.weekday()]
+    return f'slots_{day}'
+
+
+def masks_from_rows(rows):
+    """{provider id: [mask per weekday]} from (provider id, day, start, end) rows of available windows"""
+    masks = {}
+    for provider_id, day, start_time, end_time in rows:
+        week = masks.setdefault(provider_id, [0] * len(DAYS))
+        week[DAYS.index(day)] |= window_mask(start_time, end_time)
+    return masks
+
+
+def rebuild(provider_ids=None, batch_size=2000):
+    """Recompute the masks of ``provider_ids`` (all providers when None); returns providers updated"""
+    providers = ServiceProvider.objects.order_by('pk')
+    rows = ProviderAvailability.objects.filter(is_available=True).order_by()
+    if provider_ids is not None:
+        provider_ids = list(provider_ids)
+        providers = providers.filter(pk__in=provider_ids)
+        rows = rows.filter(provider_id__in=provider_ids)
+    masks = masks_from_rows(rows.values_list('provider_id', 'day_of_week', 'start_time', 'end_time').iterator())
+
+    stale = []
+    for provider in providers.only('pk', *FIELDS).iterator(chunk_size=batch_size):
+        week = masks.get(provider.pk, [0] * len(DAYS))
+        if [getattr(provider, field) for field in FIELDS] != week:
+            for field, mask in zip(FIELDS, week):
+                setattr(provider, field, mask)
+            stale.append(provider)
+    ServiceProvider.objects.bulk_update(stale, FIELDS, batch_size=batch_size)
+    return len(stale)
+
+
+def free_filter(day, mask, whole=True):
+    """
+    Condition on providers free on ``day`` (weekday name or date) for the slots
+    in ``mask``: all of them when ``whole``, otherwise any of them.
+    """
+    free = F(day_field(day)).bitand(mask)
+    return Exact(free, mask) if whole else GreaterThan(free, 0)
+
+
+def free_providers(queryset, day, period, whole=True):
+    """Providers of ``queryset`` free on ``day`` in a Job.TIME_PREFERENCES ``period``"""
+    return queryset.filter(free_filter(day, PERIODS[period], whole))
+
+
+def free_for_job(queryset, job, whole=True):
+    return free_providers(queryset, job.preferred_date, job.preferred_time, whole)
+
+
+# In-memory matching
+
+def load_matrix(queryset):
+    """(provider ids, uint64 matrix of shape (n, 7)) for vectorized matching"""
+    rows = list(queryset.order_by('pk').values_list('pk', *FIELDS))
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(DAYS)), dtype=np.uint64)
+    data = np.array(rows, dtype=np.int64)
+    return data[:, 0], data[:, 1:].astype(np.uint64)
+
+
+def match(matrix, day, mask, whole=True):
+    """Boolean vector: which rows of ``matrix`` are free on ``day`` for ``mask``"""
+    column = matrix[:, DAYS.index(day if isinstance(day, str) else DAYS[day.weekday()])]
+    free = column & np.uint64(mask)
+    return free == np.uint64(mask) if whole else free != 0
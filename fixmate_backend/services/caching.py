@@ -0,0 +1,70 @@
+# FixMate - Provider Listing Cache
+#
+# Read-through cache for the public provider listing, the most requested
+# anonymous endpoint. Entries are keyed by the listing version plus the
+# normalized query parameters; writes that change what the listing shows
+# (providers, their category links, category names, reviews) bump the
+# version once their transaction commits (see services.signals), which
+# orphans every cached page at once. Orphans simply expire after
+# PROVIDER_LIST_CACHE_SECONDS. Bumps reach every worker through the shared
+# cache configured in settings.CACHES (services.checks refuses a
+# per-process cache outside DEBUG).
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'fixmate:providers:version'
+KEY_PREFIX = 'fixmate:providers:list'
+
+# Query parameters that change the listing; anything else is ignored for caching
+LIST_PARAMS = ('search', 'category', 'limit', 'cursor')
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def bump_on_commit():
+    """Invalidate the cached listing once the current transaction commits"""
+    transaction.on_commit(bump_version)
+
+
+def normalize_params(params):
+    normalized = {}
+    for name in LIST_PARAMS:
+        value = ' '.join(params.get(name, '').split())
+        if value:
+            normalized[name] = value.lower() if name == 'search' else value
+    return normalized
+
+
+def cache_key(params, origin=''):
+    """``origin`` (scheme and host) is part of the key because pages embed absolute next links"""
+    raw = json.dumps([origin, normalize_params(params)], sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:{get_version()}:{digest}'
+
+
+def get_or_build(params, build, origin=''):
+    """The cached listing data for ``params``, calling ``build()`` on a miss"""
+    key = cache_key(params, origin)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, getattr(settings, 'PROVIDER_LIST_CACHE_SECONDS', 300))
+    return data
@@ -0,0 +1,26 @@
+# FixMate - System Checks
+#
+# Cached data is invalidated by deleting keys or bumping versions
+# (services.caching, jobs.dashboard, services.leaderboard). With a
+# per-process cache such as LocMemCache those writes only reach the worker
+# that made them and every other worker keeps serving stale pages, so it is
+# refused outside DEBUG.
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PER_PROCESS_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG:
+        return []
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in PER_PROCESS_BACKENDS:
+        return [Error(
+            f'The default cache ({backend}) is not shared between worker processes',
+            hint='Set REDIS_URL, or use the database cache (manage.py createcachetable)',
+            id='services.E001',
+        )]
+    return []
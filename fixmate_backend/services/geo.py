@@ -0,0 +1,182 @@
+# FixMate - Geospatial Helpers
+#
+# Providers and jobs carry a latitude/longitude looked up from the offline
+# GeocodedPlace table (manage.py load_geocodes). Providers also store a
+# 50-bit geohash as an integer: interleaved longitude/latitude bits, so every
+# geohash prefix is a contiguous integer range and a plain B-tree index
+# answers "which points fall in these cells" on any database.
+#
+# A radius query covers the search circle's bounding box with at most
+# MAX_COVER_CELLS cells of a suitable size, scans those index ranges (the
+# index also holds the coordinates, so this is an index-only scan), drops
+# rows outside the bounding box and orders the rest by exact haversine
+# distance. k-nearest queries, and radius queries with a limit, start small
+# and double the radius until k points are inside it.
+
+import math
+import re
+
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_BITS = 50
+MAX_COVER_CELLS = 32
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180
+START_KM = 1.0  # First radius tried by nearest(); doubled until enough rows are found
+
+
+def _cell_index(value, low, high, bits):
+    return min(int((value - low) / (high - low) * (1 << bits)), (1 << bits) - 1)
+
+
+def _interleave(lon_index, lat_index, bits):
+    """Geohash bit order: longitude first, then alternating"""
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    code = 0
+    for i in range(bits):
+        if i % 2 == 0:
+            lon_bits -= 1
+            bit = (lon_index >> lon_bits) & 1
+        else:
+            lat_bits -= 1
+            bit = (lat_index >> lat_bits) & 1
+        code = (code << 1) | bit
+    return code
+
+
+def encode(latitude, longitude, bits=GEOHASH_BITS):
+    """Integer geohash of a point with ``bits`` bits of precision"""
+    lon_index = _cell_index(longitude, -180.0, 180.0, (bits + 1) // 2)
+    lat_index = _cell_index(latitude, -90.0, 90.0, bits // 2)
+    return _interleave(lon_index, lat_index, bits)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle; spans all longitudes near the poles"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(-90.0, latitude - dlat), min(90.0, latitude + dlat)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if dlon >= 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, longitude - dlon, longitude + dlon
+
+
+def cover(box, max_cells=MAX_COVER_CELLS):
+    """
+    Merged [low, high) ranges of 50-bit geohashes covering ``box``, using the
+    finest cell size that needs at most ``max_cells`` cells.
+    """
+    min_lat, max_lat, min_lon, max_lon = box
+    # A box crossing the antimeridian is split in two
+    if min_lon < -180:
+        return cover((min_lat, max_lat, min_lon + 360, 180.0), max_cells // 2) + \
+            cover((min_lat, max_lat, -180.0, max_lon), max_cells // 2)
+    if max_lon > 180:
+        return cover((min_lat, max_lat, min_lon, 180.0), max_cells // 2) + \
+            cover((min_lat, max_lat, -180.0, max_lon - 360), max_cells // 2)
+
+    for bits in range(GEOHASH_BITS, 0, -1):
+        lon_bits, lat_bits = (bits + 1) // 2, bits // 2
+        lon_range = range(_cell_index(min_lon, -180.0, 180.0, lon_bits),
+                          _cell_index(max_lon, -180.0, 180.0, lon_bits) + 1)
+        lat_range = range(_cell_index(min_lat, -90.0, 90.0, lat_bits),
+                          _cell_index(max_lat, -90.0, 90.0, lat_bits) + 1)
+        if len(lon_range) * len(lat_range) <= max(max_cells, 1):
+            break
+
+    shift = GEOHASH_BITS - bits
+    codes = sorted(_interleave(x, y, bits) for x in lon_range for y in lat_range)
+    ranges = []
+    for code in codes:
+        low, high = code << shift, (code + 1) << shift
+        if ranges and ranges[-1][1] == low:
+            ranges[-1][1] = high
+        else:
+            ranges.append([low, high])
+    return [tuple(r) for r in ranges]
+
+
+def within_q(latitude, longitude, radius_km, field='geohash'):
+    """Filter for the rows whose cell and coordinates fall in the circle's bounding box"""
+    box = bounding_box(latitude, longitude, radius_km)
+    cells = Q()
+    for low, high in cover(box):
+        cells |= Q(**{f'{field}__gte': low, f'{field}__lt': high})
+    min_lat, max_lat, min_lon, max_lon = box
+    if min_lon < -180 or max_lon > 180:
+        lon_q = Q(longitude__gte=(min_lon + 360) if min_lon < -180 else min_lon) | \
+            Q(longitude__lte=(max_lon - 360) if max_lon > 180 else max_lon)
+    else:
+        lon_q = Q(longitude__range=(min_lon, max_lon))
+    return cells & Q(latitude__range=(min_lat, max_lat)) & lon_q
+
+
+def nearby(queryset, latitude, longitude, radius_km, limit=None):
+    """[(pk, distance km)] of the rows within ``radius_km``, nearest first"""
+    if limit is not None:
+        # Only the nearest ``limit`` are wanted: grow the search circle from small instead of
+        # reading every row of a dense radius
+        return nearest(queryset, latitude, longitude, limit, start_km=min(START_KM, radius_km), max_km=radius_km)
+    rows = queryset.filter(within_q(latitude, longitude, radius_km)).values_list('pk', 'latitude', 'longitude')
+    found = []
+    for pk, lat, lon in rows.iterator(chunk_size=5000):
+        distance = haversine_km(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            found.append((distance, pk))
+    found.sort()
+    return [(pk, distance) for distance, pk in found]
+
+
+def nearest(queryset, latitude, longitude, k, start_km=None, max_km=500.0):
+    """The ``k`` nearest rows within ``max_km`` as [(pk, distance km)], widening the search radius as needed"""
+    radius = min(start_km or START_KM, max_km)
+    while True:
+        found = nearby(queryset, latitude, longitude, radius)
+        if len(found) >= k or radius >= max_km:
+            return found[:k]
+        radius = min(radius * 2, max_km)
+
+
+# Offline geocoding
+
+def normalize_place(text):
+    return ' '.join(re.findall(r'[a-z0-9]+', (text or '').lower()))
+
+
+def place_candidates(text):
+    """Lookup keys for a free-text location, most specific first: the whole string, then comma parts from the end"""
+    candidates = [normalize_place(text)]
+    parts = [normalize_place(part) for part in (text or '').split(',')]
+    candidates += [part for part in reversed(parts) if part]
+    # Postcode-style trailing tokens, e.g. "Leeds LS1" -> "leeds"
+    candidates += [' '.join(part.split()[:-1]) for part in reversed(parts) if len(part.split()) > 1]
+    return [c for c in dict.fromkeys(candidates) if c]
+
+
+def geocode(text):
+    """(latitude, longitude) of a free-text location from the GeocodedPlace table, or None"""
+    from .models import GeocodedPlace
+
+    candidates = place_candidates(text)
+    if not candidates:
+        return None
+    found = dict(
+        (name, (lat, lon)) for name, lat, lon in
+        GeocodedPlace.objects.filter(name__in=candidates).values_list('name', 'latitude', 'longitude')
+    )
+    for candidate in candidates:
+        if candidate in found:
+            return found[candidate]
+    return None
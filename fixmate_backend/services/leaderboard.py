@@ -0,0 +1,196 @@
+# FixMate - Featured Provider Leaderboard
+#
+# The homepage and browse page show the best providers, site-wide and per
+# category. Instead of sorting every provider per page view, refresh()
+# scores all validated, active providers in one pass and materializes the
+# top FEATURED_LEADERBOARD_SIZE of each board, already serialized, into the
+# FeaturedLeaderboard table; a page view is then one primary-key lookup.
+#
+# Boards are refreshed on a schedule (manage.py refresh_leaderboard) and
+# after relevant writes. Once a write commits the signals bump a write
+# counter in the shared cache and claim the refresh there - one claim per
+# FEATURED_LEADERBOARD_REFRESH_INTERVAL across all workers - and the
+# claiming worker rebuilds the boards on a background thread, never in the
+# request. A worker that finds the refresh claimed looks again when the
+# claim expires, so the last writes of a burst are not left out; manage.py
+# refresh_leaderboard --if-dirty catches up from cron after a restart.
+
+import heapq
+import logging
+import math
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .models import FeaturedLeaderboard, Service, ServiceProvider
+from .serializers import ServiceProviderSummarySerializer
+
+logger = logging.getLogger(__name__)
+
+SITE_KEY = 'all'
+
+# Score weights; each component is scaled to 0..1 first
+WEIGHTS = {'rating': 0.5, 'reviews': 0.15, 'jobs': 0.15, 'recency': 0.1, 'featured': 0.1}
+PRIOR_REVIEWS = 5  # Ratings are shrunk towards the site mean as if each provider had this many average reviews
+REVIEWS_SATURATE = 100
+JOBS_SATURATE = 200
+RECENCY_DAYS = 30  # e-folding time of the recency component
+
+
+def board_key(category=None):
+    return SITE_KEY if category is None else f'category:{category}'
+
+
+def score(provider, mean_rating, now):
+    """Blend of shrunk rating, review volume, completed jobs, recent reviews and featured services"""
+    rating = (provider['rating_sum'] + PRIOR_REVIEWS * mean_rating) / (provider['rating_count'] + PRIOR_REVIEWS)
+    last_active = provider['last_review'] or provider['created_at']
+    age_days = max((now - last_active).total_seconds(), 0) / 86400
+    components = {
+        'rating': rating / 5,
+        'reviews': min(math.log1p(provider['rating_count']) / math.log1p(REVIEWS_SATURATE), 1.0),
+        'jobs': min(math.log1p(provider['total_jobs']) / math.log1p(JOBS_SATURATE), 1.0),
+        'recency': math.exp(-age_days / RECENCY_DAYS),
+        'featured': 1.0 if provider['has_featured'] else 0.0,
+    }
+    return sum(WEIGHTS[name] * value for name, value in components.items())
+
+
+def _entries(ranked, rows):
+    """Board rows from [(-score, provider id)] best first"""
+    entries = []
+    for rank, (negative_score, provider_id) in enumerate(ranked, 1):
+        entry = dict(rows[provider_id])
+        entry.update(rank=rank, score=round(-negative_score, 4))
+        entries.append(entry)
+    return entries
+
+
+def refresh():
+    """Recompute every board; returns the number of boards written"""
+    size = getattr(settings, 'FEATURED_LEADERBOARD_SIZE', 12)
+    written = cache.get(WRITES_KEY)  # Writes counted after this are picked up by the next refresh
+    now = timezone.now()
+    providers = list(
+        ServiceProvider.objects.filter(validation_status='validated', is_active=True).order_by()
+        .annotate(
+            last_review=Max('reviews__created_at'),
+            has_featured=Exists(Service.objects.filter(provider=OuterRef('pk'), status='active', is_featured=True)),
+        )
+        .values('pk', 'rating_sum', 'rating_count', 'total_jobs', 'created_at', 'last_review', 'has_featured')
+    )
+    total_sum = sum(provider['rating_sum'] for provider in providers)
+    total_count = sum(provider['rating_count'] for provider in providers)
+    mean_rating = total_sum / total_count if total_count else 0.0
+    scores = {provider['pk']: score(provider, mean_rating, now) for provider in providers}
+
+    # Best first, ties to the older provider
+    def top(provider_ids):
+        return heapq.nsmallest(size, ((-scores[pk], pk) for pk in provider_ids))
+
+    boards = {board_key(): top(scores)}
+    members = defaultdict(list)
+    links = ServiceProvider.categories.through.objects.filter(serviceprovider_id__in=list(scores)).order_by()
+    for provider_id, category_id in links.values_list('serviceprovider_id', 'servicecategory_id').iterator():
+        members[category_id].append(provider_id)
+    for category_id, provider_ids in members.items():
+        boards[board_key(category_id)] = top(provider_ids)
+
+    shown = {pk for ranked in boards.values() for _, pk in ranked}
+    rows = {
+        provider.pk: dict(ServiceProviderSummarySerializer(provider).data, total_jobs=provider.total_jobs)
+        for provider in ServiceProvider.objects.filter(pk__in=shown).select_related('user')
+    }
+    with transaction.atomic():
+        FeaturedLeaderboard.objects.all().delete()
+        FeaturedLeaderboard.objects.bulk_create([
+            FeaturedLeaderboard(key=key, computed_at=now, entries=_entries(ranked, rows))
+            for key, ranked in boards.items()
+        ])
+    cache.set(REFRESHED_KEY, written, None)
+    return len(boards)
+
+
+def get_board(category=None):
+    """(entries, computed_at) of a board; empty for a category without eligible providers"""
+    board = FeaturedLeaderboard.objects.filter(key=board_key(category)).first()
+    if board is None and not FeaturedLeaderboard.objects.exists():
+        # Never computed (fresh install): build once now rather than show nothing
+        refresh()
+        board = FeaturedLeaderboard.objects.filter(key=board_key(category)).first()
+    if board is None:
+        return [], None
+    return board.entries, board.computed_at
+
+
+# Write-triggered refreshes
+
+WRITES_KEY = 'fixmate:leaderboard:writes'  # Bumped by every relevant committed write
+REFRESHED_KEY = 'fixmate:leaderboard:refreshed'  # WRITES_KEY as read by the last refresh
+CLAIM_KEY = 'fixmate:leaderboard:claim'  # Held for the refresh interval by the worker that refreshes
+
+_retry_timer = None
+_retry_lock = threading.Lock()
+
+
+def is_dirty():
+    """Whether a write has committed since the boards were last computed, in any worker"""
+    counts = cache.get_many([WRITES_KEY, REFRESHED_KEY])
+    return counts.get(WRITES_KEY) != counts.get(REFRESHED_KEY)
+
+
+def _refresh_in_background():
+    try:
+        refresh()
+    except Exception:
+        logger.exception('Featured leaderboard refresh failed')
+        cache.delete(CLAIM_KEY)  # Let the next write retry rather than wait out the interval
+    finally:
+        connection.close()  # The thread's own connection
+
+
+def _retry():
+    global _retry_timer
+    with _retry_lock:
+        _retry_timer = None
+    try:
+        if is_dirty():
+            _refresh_when_claimed()
+    finally:
+        connection.close()
+
+
+def _refresh_when_claimed():
+    interval = getattr(settings, 'FEATURED_LEADERBOARD_REFRESH_INTERVAL', 60)
+    background = getattr(settings, 'FEATURED_LEADERBOARD_REFRESH_IN_BACKGROUND', True)
+    if cache.add(CLAIM_KEY, True, interval):
+        if background:
+            threading.Thread(target=_refresh_in_background, name='leaderboard-refresh', daemon=True).start()
+        else:
+            refresh()
+    elif background:
+        # Refreshed (or refreshing) within the interval: look again once the claim has expired
+        global _retry_timer
+        with _retry_lock:
+            if _retry_timer is None:
+                _retry_timer = threading.Timer(interval, _retry)
+                _retry_timer.daemon = True
+                _retry_timer.start()
+
+
+def _mark_dirty():
+    try:
+        cache.incr(WRITES_KEY)
+    except ValueError:
+        cache.set(WRITES_KEY, 1, None)
+    _refresh_when_claimed()
+
+
+def mark_dirty():
+    """Schedule a refresh once the current transaction commits"""
+    transaction.on_commit(_mark_dirty)
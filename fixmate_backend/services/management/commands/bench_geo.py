@@ -0,0 +1,97 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, models
+
+from services import geo
+
+
+class GeoBenchPoint(models.Model):
+    """Scratch table with the provider location columns and index, created and dropped by the benchmark"""
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    geohash = models.BigIntegerField()
+
+    class Meta:
+        app_label = 'services'
+        managed = False
+        db_table = 'services_geo_bench'
+        indexes = [models.Index(fields=['geohash', 'latitude', 'longitude', 'id'], name='geo_bench_geohash_idx')]
+
+
+# Rough population centres the synthetic points cluster around (lat, lon, spread in degrees)
+CENTRES = [
+    (51.507, -0.128, 0.35), (53.483, -2.244, 0.25), (52.486, -1.890, 0.25), (53.800, -1.549, 0.2),
+    (55.864, -4.252, 0.2), (53.408, -2.991, 0.15), (51.454, -2.588, 0.15), (55.953, -3.188, 0.15),
+]
+REGION = (50.0, 58.6, -6.0, 1.8)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark radius and k-nearest provider queries over a synthetic table of N points'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000, help='Synthetic points to insert')
+        parser.add_argument('--queries', type=int, default=200, help='Queries per scenario')
+        parser.add_argument('--radius', type=float, default=10.0, help='Radius in km for the radius scenario')
+        parser.add_argument('--k', type=int, default=20, help='k for the nearest scenario, and the radius limit')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with connection.schema_editor() as editor:
+            editor.create_model(GeoBenchPoint)
+            # Indexes of unmanaged models are not created with the table
+            for index in GeoBenchPoint._meta.indexes:
+                editor.add_index(GeoBenchPoint, index)
+        try:
+            self.populate(rng, options['count'])
+            queryset = GeoBenchPoint.objects.all()
+            centres = [self.random_point(rng) for _ in range(options['queries'])]
+            self.report(f'radius {options["radius"]} km, all',
+                        [lambda c=c: geo.nearby(queryset, *c, options['radius']) for c in centres])
+            self.report(f'radius {options["radius"]} km, limit {options["k"]}',
+                        [lambda c=c: geo.nearby(queryset, *c, options['radius'], limit=options['k'])
+                         for c in centres])
+            self.report(f'{options["k"]} nearest',
+                        [lambda c=c: geo.nearest(queryset, *c, options['k']) for c in centres])
+        finally:
+            with connection.schema_editor() as editor:
+                editor.delete_model(GeoBenchPoint)
+
+    def random_point(self, rng):
+        if rng.random() < 0.7:
+            lat, lon, spread = rng.choice(CENTRES)
+            return rng.gauss(lat, spread), rng.gauss(lon, spread * 1.6)
+        min_lat, max_lat, min_lon, max_lon = REGION
+        return rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)
+
+    def populate(self, rng, count):
+        started = time.perf_counter()
+        batch = []
+        for _ in range(count):
+            lat, lon = self.random_point(rng)
+            batch.append(GeoBenchPoint(latitude=lat, longitude=lon, geohash=geo.encode(lat, lon)))
+            if len(batch) == 10000:
+                GeoBenchPoint.objects.bulk_create(batch)
+                batch = []
+        GeoBenchPoint.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE services_geo_bench')
+        self.stdout.write(f'Inserted {count} points in {time.perf_counter() - started:.1f}s')
+
+    def report(self, label, queries):
+        timings, results = [], 0
+        for query in queries:
+            started = time.perf_counter()
+            results += len(query())
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        self.stdout.write(
+            f'{label:>24}: p50 {statistics.median(timings):.2f} ms, '
+            f'p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms, max {timings[-1]:.2f} ms, '
+            f'avg {results / len(queries):.0f} results'
+        )
@@ -0,0 +1,63 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from jobs.models import Job
+from services import geo
+from services.models import GeocodedPlace, ServiceProvider
+
+
+class Command(BaseCommand):
+    help = 'Load the offline geocoding table from a CSV of name,latitude,longitude and locate providers and jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', nargs='?', help='CSV file with name,latitude,longitude columns')
+        parser.add_argument('--no-backfill', action='store_true',
+                            help='Only load the table, do not locate providers and jobs without coordinates')
+
+    def handle(self, *args, **options):
+        if options['csv_path']:
+            self.load(options['csv_path'])
+        if not options['no_backfill']:
+            self.backfill()
+
+    def load(self, path):
+        places = {}
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    if len(row) < 3 or row[0].strip().lower() == 'name':
+                        continue
+                    try:
+                        places[geo.normalize_place(row[0])] = (float(row[1]), float(row[2]))
+                    except ValueError:
+                        raise CommandError(f'Bad coordinates for {row[0]!r}')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        GeocodedPlace.objects.bulk_create(
+            [GeocodedPlace(name=name, latitude=lat, longitude=lon) for name, (lat, lon) in places.items() if name],
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['latitude', 'longitude'],
+        )
+        self.stdout.write(f'Loaded {len(places)} places')
+
+    def backfill(self):
+        # One UPDATE per distinct place text rather than a save() per row
+        for model, field in ((ServiceProvider, 'service_area'), (Job, 'address')):
+            missing = model.objects.filter(latitude__isnull=True).order_by().values_list(field, flat=True).distinct()
+            located = 0
+            with transaction.atomic():
+                for place in missing.iterator():
+                    point = geo.geocode(place)
+                    if point is None:
+                        continue
+                    values = {'latitude': point[0], 'longitude': point[1]}
+                    if model is ServiceProvider:
+                        values['geohash'] = geo.encode(*point)
+                    located += model.objects.filter(latitude__isnull=True, **{field: place}).update(**values)
+            self.stdout.write(f'Located {located} {model._meta.verbose_name_plural}')
+        self.stdout.write(self.style.SUCCESS('Geocoding done'))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services import availability
+
+
+class Command(BaseCommand):
+    help = 'Recompute the provider availability slot bitmaps from ProviderAvailability'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = availability.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt availability bitmaps in {time.perf_counter() - started:.2f}s ({updated} providers changed)'
+        ))
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the provider full-text search documents from scratch'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        search.reindex()
+        backend = 'tsvector column' if search.use_postgres() else 'in-process index'
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt provider search ({backend}) in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from services import ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute the provider rating aggregates (sum, count, star histogram) from the reviews table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Providers per grouped query')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Batches reconciled in parallel (default 4 on Postgres, 1 elsewhere)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        workers = options['workers'] or (4 if connection.vendor == 'postgresql' else 1)
+        fixed = ratings.reconcile(batch_size=options['batch_size'], workers=workers)
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled provider ratings in {time.perf_counter() - started:.2f}s ({fixed} providers corrected)'
+        ))
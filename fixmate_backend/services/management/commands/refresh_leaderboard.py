@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from services import leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Recompute the featured provider leaderboards (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--if-dirty', action='store_true',
+                            help='Only refresh when a relevant write has committed since the last refresh')
+
+    def handle(self, *args, **options):
+        if options['if_dirty'] and not leaderboard.is_dirty():
+            self.stdout.write('Leaderboards are up to date')
+            return
+        started = time.perf_counter()
+        boards = leaderboard.refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed {boards} leaderboards in {time.perf_counter() - started:.2f}s'
+        ))
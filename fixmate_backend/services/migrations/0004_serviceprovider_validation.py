@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-17 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_merge_0002_initial_0002_service'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='is_active',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='validation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('validated', 'Validated'), ('rejected', 'Rejected')], db_index=True, default='pending', max_length=20),
+        ),
+    ]
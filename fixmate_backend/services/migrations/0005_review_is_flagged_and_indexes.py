@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-17 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_serviceprovider_validation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='is_flagged',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at', 'id'], name='review_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceprovider',
+            index=models.Index(fields=['created_at', 'id'], name='provider_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceprovider',
+            index=models.Index(fields=['validation_status', 'created_at', 'id'], name='provider_validation_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Postgres only: the tsvector document behind services.search. Other databases
+# use the in-process inverted index and need no schema change.
+
+ADD_VECTOR = """
+    ALTER TABLE services_serviceprovider ADD COLUMN search_vector tsvector;
+    CREATE INDEX provider_search_idx ON services_serviceprovider USING GIN (search_vector);
+    UPDATE services_serviceprovider AS p SET search_vector =
+        setweight(to_tsvector('english', coalesce(p.business_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(p.skills, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(c.name, ' ')
+            FROM services_serviceprovider_categories pc
+            JOIN services_servicecategory c ON c.id = pc.servicecategory_id
+            WHERE pc.serviceprovider_id = p.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(p.description, '')), 'C');
+"""
+
+DROP_VECTOR = """
+    DROP INDEX IF EXISTS provider_search_idx;
+    ALTER TABLE services_serviceprovider DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADD_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0005_review_is_flagged_and_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, drop_search_vector),
+    ]
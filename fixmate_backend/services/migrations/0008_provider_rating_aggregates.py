@@ -0,0 +1,74 @@
+# Generated by Django 5.0.6 on 2026-10-17 07:40
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_ratings(apps, schema_editor):
+    ServiceProvider = apps.get_model('services', 'ServiceProvider')
+    Review = apps.get_model('services', 'Review')
+    histograms = {}
+    for provider_id, rating, count in (
+        Review.objects.order_by().values('provider_id', 'rating')
+        .annotate(n=models.Count('pk')).values_list('provider_id', 'rating', 'n')
+    ):
+        histograms.setdefault(provider_id, {})[rating] = count
+    providers = list(ServiceProvider.objects.filter(pk__in=list(histograms)))
+    for provider in providers:
+        histogram = histograms[provider.pk]
+        for stars in range(1, 6):
+            setattr(provider, f'stars_{stars}', histogram.get(stars, 0))
+        provider.rating_count = sum(histogram.values())
+        provider.rating_sum = sum(stars * count for stars, count in histogram.items())
+        provider.rating = round(Decimal(provider.rating_sum) / provider.rating_count, 2)
+    ServiceProvider.objects.bulk_update(
+        providers, ['rating', 'rating_sum', 'rating_count'] + [f'stars_{stars}' for stars in range(1, 6)],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_geolocation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='stars_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='stars_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='stars_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='stars_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='stars_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
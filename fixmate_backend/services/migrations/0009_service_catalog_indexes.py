@@ -0,0 +1,51 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:24
+
+from django.db import migrations, models
+
+
+def copy_provider_ratings(apps, schema_editor):
+    Service = apps.get_model('services', 'Service')
+    ServiceProvider = apps.get_model('services', 'ServiceProvider')
+    Service.objects.update(provider_rating=models.Subquery(
+        ServiceProvider.objects.filter(pk=models.OuterRef('provider_id')).values('rating')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0008_provider_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='provider_rating',
+            field=models.DecimalField(decimal_places=2, default=0.0, editable=False, max_digits=3),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='service_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'price', 'id'], name='service_status_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'provider_rating', 'id'], name='service_status_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'category', 'created_at', 'id'], name='service_cat_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'category', 'price', 'id'], name='service_cat_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'category', 'provider_rating', 'id'], name='service_cat_rating_idx'),
+        ),
+        migrations.RunPython(copy_provider_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0009_service_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeaturedLeaderboard',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('entries', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
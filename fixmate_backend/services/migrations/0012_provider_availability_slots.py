@@ -0,0 +1,75 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+
+def window_mask(start_time, end_time):
+    # Same rule as services.availability.window_mask
+    start_minutes = start_time.hour * 60 + start_time.minute
+    end_minutes = end_time.hour * 60 + end_time.minute
+    start = -(-start_minutes // 30)
+    end = 48 if end_minutes <= start_minutes else end_minutes // 30
+    return ((1 << (end - start)) - 1) << start if end > start else 0
+
+
+def build_masks(apps, schema_editor):
+    ServiceProvider = apps.get_model('services', 'ServiceProvider')
+    ProviderAvailability = apps.get_model('services', 'ProviderAvailability')
+    masks = {}
+    for provider_id, day, start_time, end_time in ProviderAvailability.objects.filter(is_available=True).values_list(
+            'provider_id', 'day_of_week', 'start_time', 'end_time'):
+        masks.setdefault(provider_id, {})
+        masks[provider_id][day] = masks[provider_id].get(day, 0) | window_mask(start_time, end_time)
+    providers = list(ServiceProvider.objects.filter(pk__in=list(masks)))
+    for provider in providers:
+        for day, mask in masks[provider.pk].items():
+            setattr(provider, f'slots_{day}', mask)
+    ServiceProvider.objects.bulk_update(providers, [f'slots_{day}' for day in DAYS], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0011_referencedataversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_friday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_monday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_saturday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_sunday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_thursday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_tuesday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprovider',
+            name='slots_wednesday',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(build_masks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-17 06:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_geolocation'),
+        ('services', '0012_provider_availability_slots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['provider', 'created_at', 'id'], name='review_provider_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['provider', 'rating', 'created_at', 'id'], name='review_provider_rating_idx'),
+        ),
+    ]
@@ -15,7 +15,30 @@ class ServiceCategory(models.Model):
     def __str__(self):
         return self.name
 
+class ReferenceDataVersion(models.Model):
+    """Version counter of a reference table, bumped by every write to it (see services.reference)"""
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+class GeocodedPlace(models.Model):
+    """Offline geocoding table: a normalized place name and its coordinates (see services.geo)"""
+    name = models.CharField(max_length=200, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    def __str__(self):
+        return f"{self.name} ({self.latitude}, {self.longitude})"
+
 class ServiceProvider(models.Model):
+    VALIDATION_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('validated', 'Validated'),
+        ('rejected', 'Rejected'),
+    ]
+
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='service_provider')
     categories = models.ManyToManyField(ServiceCategory, related_name='providers')
     business_name = models.CharField(max_length=200, blank=True)
@@ -24,24 +47,57 @@ class ServiceProvider(models.Model):
     experience_years = models.PositiveIntegerField(default=0)
     hourly_rate = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     service_area = models.CharField(max_length=200)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.BigIntegerField(null=True, blank=True, editable=False)  # See services.geo
     license_number = models.CharField(max_length=100, blank=True)
     insurance_verified = models.BooleanField(default=False)
     is_available = models.BooleanField(default=True)
-    rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)  # rating_sum / rating_count
+    # Review aggregates kept current by services.ratings
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    stars_1 = models.PositiveIntegerField(default=0, editable=False)
+    stars_2 = models.PositiveIntegerField(default=0, editable=False)
+    stars_3 = models.PositiveIntegerField(default=0, editable=False)
+    stars_4 = models.PositiveIntegerField(default=0, editable=False)
+    stars_5 = models.PositiveIntegerField(default=0, editable=False)
+    # Weekly availability as one 48-bit mask of 30-minute slots per day (services.availability)
+    slots_monday = models.BigIntegerField(default=0, editable=False)
+    slots_tuesday = models.BigIntegerField(default=0, editable=False)
+    slots_wednesday = models.BigIntegerField(default=0, editable=False)
+    slots_thursday = models.BigIntegerField(default=0, editable=False)
+    slots_friday = models.BigIntegerField(default=0, editable=False)
+    slots_saturday = models.BigIntegerField(default=0, editable=False)
+    slots_sunday = models.BigIntegerField(default=0, editable=False)
     total_jobs = models.PositiveIntegerField(default=0)
+    validation_status = models.CharField(max_length=20, choices=VALIDATION_STATUS_CHOICES, default='pending', db_index=True)
+    is_active = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='provider_created_idx'),
+            models.Index(fields=['validation_status', 'created_at', 'id'], name='provider_validation_idx'),
+            models.Index(fields=['geohash', 'latitude', 'longitude', 'id'], name='provider_geohash_idx'),
+        ]
+
     def __str__(self):
         return f"{self.business_name or self.user.get_full_name()} - {self.user.username}"
 
+    @property
+    def rating_histogram(self):
+        """Review count per star rating, {1: n, ..., 5: n}"""
+        return {stars: getattr(self, f'stars_{stars}') for stars in range(1, 6)}
+
     def update_rating(self):
-        """Update provider rating based on reviews"""
-        reviews = self.reviews.all()
-        if reviews.exists():
-            avg_rating = reviews.aggregate(models.Avg('rating'))['rating__avg']
-            self.rating = round(avg_rating, 2)
-            self.save()
+        """Recompute the rating aggregates from the reviews table"""
+        from .ratings import reconcile_batch
+
+        reconcile_batch([self.pk])
+        self.refresh_from_db(fields=['rating', 'rating_sum', 'rating_count',
+                                     'stars_1', 'stars_2', 'stars_3', 'stars_4', 'stars_5'])
 
 class Review(models.Model):
     RATING_CHOICES = [(i, i) for i in range(1, 6)]
@@ -51,17 +107,71 @@ class Review(models.Model):
     job = models.OneToOneField('jobs.Job', on_delete=models.CASCADE, related_name='review', null=True, blank=True)
     rating = models.PositiveIntegerField(choices=RATING_CHOICES)
     comment = models.TextField(blank=True)
+    is_flagged = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ['provider', 'customer', 'job']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='review_created_idx'),
+            # A provider's reviews page by recency or by rating
+            models.Index(fields=['provider', 'created_at', 'id'], name='review_provider_created_idx'),
+            models.Index(fields=['provider', 'rating', 'created_at', 'id'], name='review_provider_rating_idx'),
+        ]
 
     def __str__(self):
         return f"Review for {self.provider.business_name} - {self.rating} stars"
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.provider.update_rating()
+class Service(models.Model):
+    PRICE_TYPE_CHOICES = [
+        ('hourly', 'Hourly'),
+        ('fixed', 'Fixed Price'),
+        ('daily', 'Daily'),
+    ]
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('inactive', 'Inactive'),
+        ('pending', 'Pending'),
+    ]
+
+    provider = models.ForeignKey(ServiceProvider, on_delete=models.CASCADE, related_name='services')
+    category = models.ForeignKey(ServiceCategory, on_delete=models.CASCADE, related_name='services')
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    price_type = models.CharField(max_length=20, choices=PRICE_TYPE_CHOICES, default='hourly')
+    estimated_duration = models.CharField(max_length=100, blank=True, help_text="e.g., '2 hours', '1 day', '3-5 days'")
+    requirements = models.TextField(blank=True, help_text='What the customer needs to provide')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    is_featured = models.BooleanField(default=False)
+    # Copy of provider.rating so rating ordering can use an index (kept in step by services.ratings)
+    provider_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        # Catalog browsing: status, optionally category, then the sort column; id last for keyset pagination
+        indexes = [
+            models.Index(fields=['status', 'created_at', 'id'], name='service_status_created_idx'),
+            models.Index(fields=['status', 'price', 'id'], name='service_status_price_idx'),
+            models.Index(fields=['status', 'provider_rating', 'id'], name='service_status_rating_idx'),
+            models.Index(fields=['status', 'category', 'created_at', 'id'], name='service_cat_created_idx'),
+            models.Index(fields=['status', 'category', 'price', 'id'], name='service_cat_price_idx'),
+            models.Index(fields=['status', 'category', 'provider_rating', 'id'], name='service_cat_rating_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - {self.provider.business_name}"
+
+class FeaturedLeaderboard(models.Model):
+    """Materialized top providers, site-wide (key 'all') or per category ('category:<id>'); see services.leaderboard"""
+    key = models.CharField(max_length=40, primary_key=True)
+    entries = models.JSONField(default=list)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key} ({len(self.entries)} providers)"
 
 class ProviderAvailability(models.Model):
     DAYS_OF_WEEK = [
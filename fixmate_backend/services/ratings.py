@@ -0,0 +1,139 @@
+# FixMate - Provider Rating Aggregates
+#
+# Each provider carries rating_sum, rating_count and a per-star histogram
+# (stars_1 .. stars_5); ``rating`` is derived from them. Review writes apply
+# their delta with a single UPDATE of F() expressions (see services.signals),
+# so the cost of a review no longer grows with the provider's review count and
+# concurrent reviews cannot overwrite each other. reconcile() recomputes the
+# aggregates from the reviews table with one grouped query per batch of
+# providers, several batches in parallel (manage.py reconcile_ratings).
+# Catalog services keep a copy of their provider's rating for indexed
+# ordering, refreshed alongside.
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, F, FloatField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from . import caching, leaderboard
+from .models import Review, Service, ServiceProvider
+
+STARS = range(1, 6)
+
+
+def star_field(rating):
+    return f'stars_{rating}'
+
+
+def derived_rating(rating_sum, rating_count):
+    """Expression for the average rating, to two places, or 0 without reviews"""
+    return Coalesce(
+        Round(Cast(rating_sum, FloatField()) / NullIf(rating_count, 0), 2),
+        Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def apply(provider_id, add=None, remove=None):
+    """Add and/or remove one review rating from a provider's aggregates in a single UPDATE"""
+    deltas = {}
+    for rating, sign in ((add, 1), (remove, -1)):
+        if rating is not None:
+            deltas[star_field(rating)] = deltas.get(star_field(rating), 0) + sign
+    sum_delta = (add or 0) - (remove or 0)
+    count_delta = (add is not None) - (remove is not None)
+    if not any(deltas.values()):
+        return 0
+    # SET expressions all see the row's old values, so the new rating is worked out from sum + delta
+    new_sum = F('rating_sum') + sum_delta
+    new_count = F('rating_count') + count_delta
+    updated = ServiceProvider.objects.filter(pk=provider_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=derived_rating(new_sum, new_count),
+        **{field: F(field) + delta for field, delta in deltas.items() if delta},
+    )
+    sync_services([provider_id])
+    return updated
+
+
+def sync_services(provider_ids):
+    """Copy the providers' ratings onto their catalog services (Service.provider_rating)"""
+    return Service.objects.filter(provider_id__in=provider_ids).update(provider_rating=Subquery(
+        ServiceProvider.objects.filter(pk=OuterRef('provider_id')).values('rating')[:1]
+    ))
+
+
+def rating_value(rating_sum, rating_count):
+    if not rating_count:
+        return Decimal('0.00')
+    # Halves round up, as SQL ROUND does in derived_rating(); round() would round them to even
+    return (Decimal(rating_sum) / rating_count).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
+
+FIELDS = ['rating_sum', 'rating_count', 'rating'] + [star_field(rating) for rating in STARS]
+
+
+def reconcile_batch(provider_ids):
+    """
+    Recompute the aggregates of ``provider_ids`` from one grouped query over
+    their reviews; returns how many providers had drifted.
+
+    The providers are locked before their reviews are read, so review writes
+    racing with the recount wait for it and then apply their delta on top.
+    """
+    with transaction.atomic():
+        providers = list(
+            ServiceProvider.objects.filter(pk__in=provider_ids).select_for_update().order_by('pk').only('pk', *FIELDS)
+        )
+        histograms = {}
+        for provider_id, rating, count in (
+            Review.objects.filter(provider_id__in=provider_ids).order_by()
+            .values('provider_id', 'rating').annotate(n=Count('pk'))
+            .values_list('provider_id', 'rating', 'n')
+        ):
+            histograms.setdefault(provider_id, {})[rating] = count
+
+        stale = []
+        for provider in providers:
+            histogram = histograms.get(provider.pk, {})
+            expected = {star_field(rating): histogram.get(rating, 0) for rating in STARS}
+            expected['rating_count'] = sum(histogram.values())
+            expected['rating_sum'] = sum(rating * count for rating, count in histogram.items())
+            expected['rating'] = rating_value(expected['rating_sum'], expected['rating_count'])
+            if any(getattr(provider, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(provider, field, value)
+                stale.append(provider)
+        ServiceProvider.objects.bulk_update(stale, FIELDS)
+        if stale:
+            sync_services([provider.pk for provider in stale])
+            caching.bump_on_commit()
+            leaderboard.mark_dirty()
+    return len(stale)
+
+
+def _reconcile_in_thread(provider_ids):
+    try:
+        return reconcile_batch(provider_ids)
+    finally:
+        connection.close()  # Each worker thread has its own connection
+
+
+def reconcile(provider_ids=None, batch_size=2000, workers=1):
+    """
+    Recompute the aggregates of ``provider_ids`` (all providers when None) in
+    batches of ``batch_size``, ``workers`` batches at a time. Returns the
+    number of providers whose stored values were off.
+    """
+    ids = ServiceProvider.objects.order_by('pk').values_list('pk', flat=True)
+    if provider_ids is not None:
+        ids = ids.filter(pk__in=list(provider_ids))
+    ids = list(ids)
+    batches = [ids[start:start + batch_size] for start in range(0, len(ids), batch_size)]
+    if workers <= 1 or len(batches) <= 1:
+        return sum(reconcile_batch(batch) for batch in batches)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_reconcile_in_thread, batches))
@@ -0,0 +1,155 @@
+# FixMate - Reference Data Cache
+#
+# Service categories change about once a month but are read on nearly every
+# request (category lists, nested provider categories, job category names).
+# Each worker keeps an immutable snapshot of them, plus the choice tables,
+# and serves lookups from memory. The snapshot records the version of the
+# 'categories' ReferenceDataVersion row it was built from; at most once per
+# REFERENCE_DATA_CHECK_INTERVAL it compares that with the row and reloads on
+# any difference. Category writes bump the row inside the writing
+# transaction and drop this process's snapshot immediately, so other workers
+# catch up within the interval and a rolled-back write is noticed as a
+# version mismatch too. An id the snapshot lacks costs one reload; if the
+# reloaded snapshot lacks it too, the id is remembered as unknown on that
+# snapshot (up to MAX_UNKNOWN ids), so it is not reloaded for again until
+# the snapshot is replaced.
+#
+# The objects handed out are shared between callers and must not be mutated.
+
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.conf import settings
+from django.db.models import F
+
+from .models import ReferenceDataVersion, ServiceCategory
+
+CATEGORIES = 'categories'
+MAX_UNKNOWN = 1024  # Unknown category ids remembered per snapshot
+
+
+@dataclass(frozen=True, slots=True)
+class Category:
+    id: int
+    name: str
+    description: str
+    icon: str
+    data: dict  # Serialized form, as ServiceCategorySerializer renders it
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    version: int
+    categories: MappingProxyType  # id -> Category
+    ordered: tuple  # Categories in primary key order
+    choices: MappingProxyType  # table name -> MappingProxyType(value -> label)
+    unknown: set  # Ids looked up and found missing after a reload; the one mutable part
+
+
+def _choice_tables():
+    from django.contrib.auth import get_user_model
+    from jobs.models import Job, JobApplication
+    from .models import Service, ServiceProvider
+
+    tables = {
+        'job_status': Job.STATUS_CHOICES,
+        'job_urgency': Job.URGENCY_CHOICES,
+        'application_status': JobApplication.STATUS_CHOICES,
+        'provider_validation': ServiceProvider.VALIDATION_STATUS_CHOICES,
+        'service_status': Service.STATUS_CHOICES,
+        'service_price_type': Service.PRICE_TYPE_CHOICES,
+        'user_type': get_user_model().USER_TYPES,
+    }
+    return MappingProxyType({name: MappingProxyType(dict(choices)) for name, choices in tables.items()})
+
+
+def current_version():
+    return ReferenceDataVersion.objects.filter(name=CATEGORIES).values_list('version', flat=True).first() or 0
+
+
+def bump():
+    """Invalidate every worker's snapshot; call inside the transaction that changes categories"""
+    if not ReferenceDataVersion.objects.filter(name=CATEGORIES).update(version=F('version') + 1):
+        ReferenceDataVersion.objects.get_or_create(name=CATEGORIES, defaults={'version': 1})
+    reference_cache.invalidate()
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._snapshot = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'REFERENCE_DATA_CHECK_INTERVAL', 5.0)
+
+    def load(self):
+        from .serializers import ServiceCategorySerializer
+
+        version = current_version()
+        rows = ServiceCategory.objects.order_by('pk')
+        ordered = tuple(
+            Category(id=row.pk, name=row.name, description=row.description, icon=row.icon,
+                     data=dict(ServiceCategorySerializer(row).data))
+            for row in rows
+        )
+        return Snapshot(
+            version=version,
+            categories=MappingProxyType({category.id: category for category in ordered}),
+            ordered=ordered,
+            choices=_choice_tables(),
+            unknown=set(),
+        )
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked < self.check_interval:
+            return snapshot
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current is not snapshot:
+                return current  # Another thread just reloaded
+            if current is None or current_version() != current.version:
+                current = self._snapshot = self.load()
+            self._checked = time.monotonic()
+        return current
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def reload(self):
+        with self._lock:
+            self._snapshot = self.load()
+            self._checked = time.monotonic()
+        return self._snapshot
+
+
+reference_cache = ReferenceCache()
+
+
+def get_category(category_id):
+    """The cached Category with ``category_id``, or None"""
+    if category_id is None:
+        return None
+    snapshot = reference_cache.snapshot()
+    category = snapshot.categories.get(category_id)
+    if category is None and category_id not in snapshot.unknown and len(snapshot.unknown) < MAX_UNKNOWN:
+        # Created since the last check (or inside the current transaction): one reload, then trust it
+        snapshot = reference_cache.reload()
+        category = snapshot.categories.get(category_id)
+        if category is None:
+            snapshot.unknown.add(category_id)
+    return category
+
+
+def get_categories():
+    """Every category in primary key order"""
+    return reference_cache.snapshot().ordered
+
+
+def choices(table):
+    """{value: label} of a choice table, e.g. choices('job_status')"""
+    return reference_cache.snapshot().choices[table]
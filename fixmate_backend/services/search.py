@@ -0,0 +1,251 @@
+# FixMate - Provider Full-Text Search
+#
+# Ranked search over provider business name, skills, category names and
+# description. On Postgres the documents live in a tsvector column on the
+# providers table (added by migration 0006, GIN indexed) that the signals in
+# services.signals keep current; queries go through websearch_to_tsquery and
+# ts_rank_cd with the fields weighted A (business name), B (skills and
+# categories) and C (description). Other databases, SQLite in tests among
+# them, get an in-process inverted index with the same API and weights, built
+# on first use and updated by the same signals.
+
+import heapq
+import itertools
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection
+
+from .models import ServiceProvider
+
+CONFIG = 'english'
+
+# Field weights, mirroring Postgres' default ts_rank weights for A, B and C
+WEIGHTS = {'business_name': 1.0, 'skills': 0.4, 'categories': 0.4, 'description': 0.2}
+
+UPDATE_VECTOR_SQL = """
+    UPDATE services_serviceprovider AS p SET search_vector =
+        setweight(to_tsvector('{config}', coalesce(p.business_name, '')), 'A') ||
+        setweight(to_tsvector('{config}', coalesce(p.skills, '')), 'B') ||
+        setweight(to_tsvector('{config}', coalesce((
+            SELECT string_agg(c.name, ' ')
+            FROM services_serviceprovider_categories pc
+            JOIN services_servicecategory c ON c.id = pc.servicecategory_id
+            WHERE pc.serviceprovider_id = p.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('{config}', coalesce(p.description, '')), 'C')
+""".format(config=CONFIG)
+
+
+def use_postgres():
+    return connection.vendor == 'postgresql'
+
+
+# Python fallback
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it of on or our the to we with you your'.split()
+)
+
+
+def stem(token):
+    """Crude suffix stripping so 'plumbing', 'plumber' and 'plumbers' meet 'plumb' roughly as Postgres does"""
+    for suffix in ('ings', 'ing', 'ers', 'er', 'es', 'ed', 's'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    return [stem(token) for token in TOKEN_RE.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """term -> {provider id: weighted term frequency}, plus each provider's category ids for filtering"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        self.postings = defaultdict(dict)
+        self.tiered = {}
+        self.terms = {}
+        self.categories = {}
+        self.built = False
+
+    def _add(self, provider_id, fields, category_ids):
+        weights = defaultdict(float)
+        for field, text in fields.items():
+            for term in tokenize(text):
+                weights[term] += WEIGHTS[field]
+        for term, weight in weights.items():
+            self.postings[term][provider_id] = weight
+            self.tiered.pop(term, None)
+        self.terms[provider_id] = list(weights)
+        self.categories[provider_id] = frozenset(category_ids)
+
+    def _remove(self, provider_id):
+        for term in self.terms.pop(provider_id, ()):
+            posting = self.postings.get(term)
+            self.tiered.pop(term, None)
+            if posting is not None:
+                posting.pop(provider_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.categories.pop(provider_id, None)
+
+    def load(self, provider_ids=None):
+        """(Re)index the given providers, or everything when ``provider_ids`` is None"""
+        providers = ServiceProvider.objects.order_by()
+        links = ServiceProvider.categories.through.objects.order_by()
+        if provider_ids is not None:
+            providers = providers.filter(pk__in=provider_ids)
+            links = links.filter(serviceprovider_id__in=provider_ids)
+
+        names = defaultdict(list)
+        category_ids = defaultdict(list)
+        for provider_id, category_id, name in links.values_list(
+                'serviceprovider_id', 'servicecategory_id', 'servicecategory__name').iterator():
+            names[provider_id].append(name)
+            category_ids[provider_id].append(category_id)
+
+        rows = providers.values_list('pk', 'business_name', 'skills', 'description').iterator(chunk_size=2000)
+        with self.lock:
+            if provider_ids is None:
+                self.clear()
+            else:
+                for provider_id in provider_ids:
+                    self._remove(provider_id)
+            for pk, business_name, skills, description in rows:
+                self._add(pk, {
+                    'business_name': business_name,
+                    'skills': skills,
+                    'categories': ' '.join(names[pk]),
+                    'description': description,
+                }, category_ids[pk])
+            if provider_ids is None:
+                self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            self.load()
+
+    def tiers(self, term):
+        """
+        The term's postings grouped by weight, best first, as (weight, provider ids
+        in ascending order, provider id set); cached until the term changes.
+        """
+        tiers = self.tiered.get(term)
+        if tiers is None:
+            groups = defaultdict(list)
+            for provider_id, weight in self.postings[term].items():
+                groups[weight].append(provider_id)
+            tiers = self.tiered[term] = [
+                (weight, sorted(ids), frozenset(ids)) for weight, ids in sorted(groups.items(), reverse=True)
+            ]
+        return tiers
+
+    def search(self, query, limit, category=None):
+        """
+        Top ``limit`` providers matching every term, scored by sum(tf * idf), ties by id.
+
+        Every provider in one combination of per-term weight tiers has the
+        same score, so combinations are visited best first and resolved with
+        set intersections; the walk stops once no remaining combination can
+        beat the current ``limit``-th result. Broad terms therefore do not
+        cost a scan of their postings.
+        """
+        self.ensure_built()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self.lock:
+            if not all(term in self.postings for term in terms):
+                return []
+            tiers = [self.tiers(term) for term in terms]
+            total = len(self.terms) or 1
+            idf = [math.log(1 + total / len(self.postings[term])) for term in terms]
+
+            def score(combo):
+                return sum(tiers[i][tier][0] * idf[i] for i, tier in enumerate(combo))
+
+            def members(combo):
+                # Only the ``limit`` smallest ids of a tier combination can make the cut
+                if len(combo) == 1:
+                    ids = tiers[0][combo[0]][1]
+                else:
+                    sets = sorted((tiers[i][tier][2] for i, tier in enumerate(combo)), key=len)
+                    ids = sets[0].intersection(*sets[1:])
+                if category is not None:
+                    ids = (pk for pk in ids if category in self.categories.get(pk, ()))
+                if len(combo) == 1:
+                    return list(itertools.islice(ids, limit))
+                return heapq.nsmallest(limit, ids)
+
+            start = (0,) * len(terms)
+            pending, visited, results = [(-score(start), start)], {start}, []
+            while pending:
+                negative_score, combo = heapq.heappop(pending)
+                if len(results) >= limit and -negative_score < results[limit - 1][0]:
+                    break
+                results.extend((-negative_score, pk) for pk in members(combo))
+                for i in range(len(combo)):
+                    successor = combo[:i] + (combo[i] + 1,) + combo[i + 1:]
+                    if successor[i] < len(tiers[i]) and successor not in visited:
+                        visited.add(successor)
+                        heapq.heappush(pending, (-score(successor), successor))
+        results.sort(key=lambda item: (-item[0], item[1]))
+        return [(pk, rank) for rank, pk in results[:limit]]
+
+
+index = InvertedIndex()
+
+
+# Public API
+
+def search(query, limit=50, category=None):
+    """Return up to ``limit`` (provider id, rank) pairs best match first; every term must match"""
+    if not query or not query.strip():
+        return []
+    if not use_postgres():
+        return index.search(query, limit, category)
+
+    sql = [
+        "SELECT p.id, ts_rank_cd(p.search_vector, q) AS rank",
+        "FROM services_serviceprovider p, websearch_to_tsquery(%s, %s) q",
+        "WHERE p.search_vector @@ q",
+    ]
+    params = [CONFIG, query]
+    if category is not None:
+        sql.append(
+            "AND p.id IN (SELECT serviceprovider_id FROM services_serviceprovider_categories"
+            " WHERE servicecategory_id = %s)"
+        )
+        params.append(category)
+    sql.append("ORDER BY rank DESC, p.id LIMIT %s")
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(' '.join(sql), params)
+        return cursor.fetchall()
+
+
+def reindex(provider_ids=None):
+    """Refresh the search documents of ``provider_ids`` (all providers when None)"""
+    if provider_ids is not None:
+        provider_ids = list(provider_ids)
+        if not provider_ids:
+            return
+    if use_postgres():
+        with connection.cursor() as cursor:
+            if provider_ids is None:
+                cursor.execute(UPDATE_VECTOR_SQL)
+            else:
+                cursor.execute(UPDATE_VECTOR_SQL + ' WHERE p.id = ANY(%s)', [provider_ids])
+    elif provider_ids is None:
+        index.load()
+    elif index.built:
+        index.load(provider_ids)
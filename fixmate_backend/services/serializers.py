@@ -1,17 +1,67 @@
 from rest_framework import serializers
-from .models import ServiceCategory, ServiceProvider, Review
+from . import reference
+from .models import ServiceCategory, ServiceProvider, Review, Service
 
 class ServiceCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ServiceCategory
         fields = '__all__'
 
+class CategoryNameField(serializers.Field):
+    """Name of the category whose id is at ``source`` (e.g. 'category_id'), from the reference cache"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        category = reference.get_category(value)
+        return category.name if category is not None else None
+
+class ProviderCategoriesField(serializers.Field):
+    """
+    A provider's categories as ServiceCategorySerializer renders them, built
+    from the reference cache. Only the link table is read: once per list
+    (ProviderListSerializer), or per provider when serialized on its own.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.update(read_only=True, source='*')
+        super().__init__(**kwargs)
+
+    def to_representation(self, provider):
+        category_ids = self.context.get('provider_category_ids', {}).get(provider.pk)
+        if category_ids is None:
+            category_ids = ServiceProvider.categories.through.objects.filter(
+                serviceprovider_id=provider.pk).values_list('servicecategory_id', flat=True)
+        categories = (reference.get_category(category_id) for category_id in category_ids)
+        return [category.data for category in categories if category is not None]
+
+class ProviderListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        providers = list(data.all() if hasattr(data, 'all') else data)
+        category_ids = {provider.pk: [] for provider in providers}
+        links = ServiceProvider.categories.through.objects.filter(serviceprovider_id__in=list(category_ids))
+        for provider_id, category_id in links.order_by('pk').values_list('serviceprovider_id', 'servicecategory_id'):
+            category_ids[provider_id].append(category_id)
+        self.context['provider_category_ids'] = category_ids
+        return super().to_representation(providers)
+
 class ServiceProviderSerializer(serializers.ModelSerializer):
-    categories = ServiceCategorySerializer(many=True, read_only=True)
+    categories = ProviderCategoriesField()
+    username = serializers.CharField(source='user.username', read_only=True)
     
     class Meta:
         model = ServiceProvider
-        fields = '__all__'
+        # Explicit so the internal aggregates (rating_sum, stars_*, slots_*, geohash) stay private
+        fields = ['id', 'user', 'username', 'categories', 'business_name', 'description', 'skills',
+                  'experience_years', 'hourly_rate', 'service_area', 'latitude', 'longitude', 'license_number',
+                  'insurance_verified', 'is_available', 'rating', 'rating_count', 'total_jobs',
+                  'validation_status', 'is_active', 'created_at', 'updated_at']
+        # Set by admins, reviews and jobs, never by the provider: matching, the feed and the leaderboard trust them
+        read_only_fields = ['user', 'insurance_verified', 'rating', 'rating_count', 'total_jobs',
+                            'validation_status', 'is_active', 'created_at', 'updated_at']
+        list_serializer_class = ProviderListSerializer
 
 class ReviewSerializer(serializers.ModelSerializer):
     customer_name = serializers.CharField(source='customer.get_full_name', read_only=True)
@@ -20,3 +70,32 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ['id', 'rating', 'comment', 'customer_name', 'created_at']
         read_only_fields = ['id', 'customer_name', 'created_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # customer_name needs only the name columns, joined in rather than a query per review
+        return queryset.select_related('customer').only(
+            'id', 'rating', 'comment', 'created_at', 'customer', 'customer__first_name', 'customer__last_name',
+        )
+
+class ServiceProviderSummarySerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = ServiceProvider
+        fields = ['id', 'business_name', 'username', 'rating', 'rating_count', 'experience_years',
+                  'service_area', 'is_available']
+
+class ServiceSerializer(serializers.ModelSerializer):
+    provider = ServiceProviderSummarySerializer(read_only=True)
+    category_name = CategoryNameField(source='category_id')
+
+    class Meta:
+        model = Service
+        fields = ['id', 'provider', 'category', 'category_name', 'title', 'description', 'price', 'price_type',
+                  'estimated_duration', 'requirements', 'status', 'is_featured', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'provider', 'is_featured', 'created_at', 'updated_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.select_related('provider__user')
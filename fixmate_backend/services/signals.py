@@ -0,0 +1,182 @@
+# FixMate - Services Signal Handlers
+#
+# Keep the provider search documents (services.search) in step with the
+# fields they are built from. Reindexing runs once the writer's transaction
+# commits so the in-process fallback index never sees rolled-back rows.
+# Providers are also located (services.geo) when their service area changes,
+# review writes are folded into the provider rating aggregates
+# (services.ratings), and any of these writes invalidates the cached public
+# listing (services.caching) and marks the featured leaderboard for a
+# refresh (services.leaderboard). Category writes also bump the reference
+# data version (services.reference), and availability rows are folded into
+# the providers' slot bitmaps (services.availability).
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import availability, caching, geo, leaderboard, ratings, reference, search
+from .models import ProviderAvailability, Review, Service, ServiceCategory, ServiceProvider
+
+SEARCH_FIELDS = ('business_name', 'skills', 'description')
+
+
+def locate(instance, place_field, update_fields=None):
+    """
+    Geocode ``place_field`` into latitude/longitude when the place text changed
+    (or on creation) and the coordinates were not set explicitly.
+    Relies on ``instance._located`` recorded at post_init.
+    """
+    fields = (place_field, 'latitude', 'longitude')
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return False
+    located = instance._located
+    place_changed = instance._state.adding or (
+        place_field in instance.__dict__ and instance.__dict__[place_field] != located.get(place_field)
+    )
+    coords_set = any(
+        field in instance.__dict__ and instance.__dict__[field] != located.get(field)
+        for field in ('latitude', 'longitude')
+    ) and instance.latitude is not None
+    if place_changed and not coords_set:
+        instance.latitude, instance.longitude = geo.geocode(getattr(instance, place_field)) or (None, None)
+    return True
+
+
+def remember_location(instance, place_field):
+    # Read straight from __dict__ so deferred fields (.only()/.defer()) are never loaded
+    instance._located = {field: instance.__dict__[field]
+                         for field in (place_field, 'latitude', 'longitude') if field in instance.__dict__}
+
+
+def _listing_changed():
+    caching.bump_on_commit()
+    leaderboard.mark_dirty()
+
+
+def _reindex_on_commit(provider_ids):
+    provider_ids = list(provider_ids)
+    if provider_ids:
+        transaction.on_commit(lambda: search.reindex(provider_ids))
+
+
+@receiver(post_init, sender=ServiceProvider)
+def remember_search_fields(sender, instance, **kwargs):
+    # Read straight from __dict__ so deferred fields (.only()/.defer()) are never loaded
+    instance._indexed_fields = {field: instance.__dict__[field] for field in SEARCH_FIELDS if field in instance.__dict__}
+    remember_location(instance, 'service_area')
+
+
+@receiver(pre_save, sender=ServiceProvider)
+def locate_provider(sender, instance, update_fields=None, **kwargs):
+    if locate(instance, 'service_area', update_fields):
+        instance.geohash = (
+            geo.encode(instance.latitude, instance.longitude) if instance.latitude is not None
+            and instance.longitude is not None else None
+        )
+
+
+@receiver(post_save, sender=ServiceProvider)
+def provider_saved(sender, instance, created, **kwargs):
+    indexed = instance._indexed_fields
+    changed = created or any(
+        field in instance.__dict__ and instance.__dict__[field] != indexed.get(field)
+        for field in SEARCH_FIELDS
+    )
+    if changed:
+        _reindex_on_commit([instance.pk])
+    _listing_changed()
+    instance._indexed_fields = {field: instance.__dict__[field] for field in SEARCH_FIELDS if field in instance.__dict__}
+    remember_location(instance, 'service_area')
+
+
+@receiver(post_delete, sender=ServiceProvider)
+def provider_deleted(sender, instance, **kwargs):
+    _reindex_on_commit([instance.pk])
+    _listing_changed()
+
+
+@receiver(m2m_changed, sender=ServiceProvider.categories.through)
+def provider_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Clearing a category's providers: remember them while they are still linked
+        instance._cleared_provider_ids = list(instance.providers.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        _listing_changed()
+        if not reverse:
+            _reindex_on_commit([instance.pk])
+        elif action == 'post_clear':
+            _reindex_on_commit(instance._cleared_provider_ids)
+        else:
+            _reindex_on_commit(pk_set or ())
+
+
+@receiver(post_init, sender=ServiceCategory)
+def remember_category_name(sender, instance, **kwargs):
+    instance._indexed_name = instance.__dict__.get('name')
+
+
+@receiver(post_save, sender=ServiceCategory)
+def category_saved(sender, instance, created, **kwargs):
+    reference.bump()
+    if not created and instance.__dict__.get('name') != instance._indexed_name:
+        _reindex_on_commit(instance.providers.values_list('pk', flat=True))
+    if not created:
+        _listing_changed()
+    instance._indexed_name = instance.__dict__.get('name')
+
+
+@receiver(post_delete, sender=ServiceCategory)
+def category_deleted(sender, instance, **kwargs):
+    reference.bump()
+    _listing_changed()
+
+
+@receiver(post_init, sender=Review)
+def remember_rating(sender, instance, **kwargs):
+    instance._rated = (instance.__dict__.get('provider_id'), instance.__dict__.get('rating'))
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        ratings.apply(instance.provider_id, add=instance.rating)
+    elif update_fields is None or {'rating', 'provider'} & set(update_fields):
+        old_provider_id, old_rating = instance._rated
+        new = (instance.provider_id, instance.rating)
+        if old_rating is not None and new != instance._rated:
+            if old_provider_id == instance.provider_id:
+                ratings.apply(instance.provider_id, add=instance.rating, remove=old_rating)
+            else:
+                ratings.apply(old_provider_id, remove=old_rating)
+                ratings.apply(instance.provider_id, add=instance.rating)
+    _listing_changed()
+    instance._rated = (instance.provider_id, instance.rating)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    provider_id, rating = instance._rated
+    if rating is not None:
+        ratings.apply(provider_id, remove=rating)
+    _listing_changed()
+
+
+@receiver(pre_save, sender=Service)
+def copy_provider_rating(sender, instance, **kwargs):
+    instance.provider_rating = (
+        ServiceProvider.objects.filter(pk=instance.provider_id).values_list('rating', flat=True).first() or 0
+    )
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def service_changed(sender, instance, **kwargs):
+    leaderboard.mark_dirty()
+
+
+@receiver(post_save, sender=ProviderAvailability)
+@receiver(post_delete, sender=ProviderAvailability)
+def availability_changed(sender, instance, **kwargs):
+    if availability.rebuild([instance.provider_id]):
+        caching.bump_on_commit()
@@ -1,3 +1,602 @@
-from django.test import TestCase
+import datetime
+import io
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import User
+from . import availability, caching, checks, geo, leaderboard, ratings, reference, search
+from .models import (
+    GeocodedPlace, ProviderAvailability, ReferenceDataVersion, Review, Service, ServiceCategory, ServiceProvider,
+)
+
+# In-process cache for tests that count queries: the database cache's own queries would be counted too
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class ProviderSearchTest(TestCase):
+    """Ranked full-text search over providers (in-process index on SQLite, tsvector on Postgres)"""
+
+    def setUp(self):
+        cache.clear()
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.electrical = ServiceCategory.objects.create(name='Electrical', description='Wiring')
+        self.providers = {}
+        for key, name, skills, description, category in [
+            ('ace', 'Ace Plumbers', 'pipes, boilers', 'Emergency callouts', self.plumbing),
+            ('bright', 'Bright Sparks', 'rewiring, lighting', 'Certified electricians, some plumbing', self.electrical),
+            ('handy', 'Handy Helpers', 'plumbing repairs, painting', 'General repairs', self.plumbing),
+        ]:
+            user = User.objects.create_user(key, f'{key}@example.com', user_type='provider')
+            provider = ServiceProvider.objects.create(
+                user=user, business_name=name, skills=skills, description=description, service_area='Leeds'
+            )
+            provider.categories.add(category)
+            self.providers[key] = provider
+        # Index updates follow committed writes; TestCase never commits
+        search.reindex()
+
+    def ids(self, query, **kwargs):
+        return [pk for pk, _ in search.search(query, **kwargs)]
+
+    def test_weighted_ranking(self):
+        # Business name beats skills and category, which beat description
+        ranked = self.ids('plumbing')
+        self.assertEqual(ranked, [self.providers['ace'].pk, self.providers['handy'].pk, self.providers['bright'].pk])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.ids('plumbing painting'), [self.providers['handy'].pk])
+        self.assertEqual(self.ids('plumbing roofing'), [])
+        self.assertEqual(self.ids('   '), [])
+
+    def test_category_filter(self):
+        self.assertEqual(self.ids('plumbing', category=self.electrical.pk), [self.providers['bright'].pk])
+
+    def test_reindex_after_commit(self):
+        provider = self.providers['bright']
+        with self.captureOnCommitCallbacks(execute=True):
+            provider.business_name = 'Bright Roofing'
+            provider.save()
+        self.assertEqual(self.ids('roofing'), [provider.pk])
+
+    def test_api(self):
+        response = APIClient().get('/api/services/providers/', {'search': 'plumbing painting'}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [self.providers['handy'].pk])
+        self.assertIn('search_rank', response.data['results'][0])
+
+
+class GeoSearchTest(TestCase):
+    """Providers and jobs are located from the geocoding table and found by radius or nearest"""
+
+    places = {
+        'leeds': (53.8008, -1.5491),
+        'bradford': (53.7960, -1.7594),
+        'york': (53.9590, -1.0815),
+        'london': (51.5072, -0.1276),
+    }
+
+    def setUp(self):
+        for name, (lat, lon) in self.places.items():
+            GeocodedPlace.objects.create(name=name, latitude=lat, longitude=lon)
+        self.providers = {}
+        for name in self.places:
+            user = User.objects.create_user(f'{name}-pro', f'{name}@example.com', user_type='provider')
+            self.providers[name] = ServiceProvider.objects.create(
+                user=user, business_name=name.title(), description='d', skills='s', service_area=name.title()
+            )
+
+    def test_geocoding_on_save(self):
+        provider = self.providers['leeds']
+        self.assertEqual((provider.latitude, provider.longitude), self.places['leeds'])
+        self.assertEqual(provider.geohash, geo.encode(*self.places['leeds']))
+
+        provider.service_area = '1 High Street, York'
+        provider.save()
+        provider.refresh_from_db()
+        self.assertEqual((provider.latitude, provider.longitude), self.places['york'])
+
+    def test_place_candidates(self):
+        self.assertEqual(geo.place_candidates('12 Park Row, Leeds LS1'),
+                         ['12 park row leeds ls1', 'leeds ls1', '12 park row', 'leeds', '12 park'])
+
+    def test_radius_and_nearest(self):
+        leeds = self.places['leeds']
+        within = geo.nearby(ServiceProvider.objects.all(), *leeds, radius_km=20)
+        self.assertEqual([pk for pk, _ in within], [self.providers['leeds'].pk, self.providers['bradford'].pk])
+        self.assertAlmostEqual(within[1][1], geo.haversine_km(*leeds, *self.places['bradford']))
+
+        nearest = geo.nearest(ServiceProvider.objects.all(), *leeds, k=3)
+        self.assertEqual([pk for pk, _ in nearest],
+                         [self.providers[name].pk for name in ('leeds', 'bradford', 'york')])
+
+    def test_cover_contains_every_point_in_the_box(self):
+        for lat, lon, radius in [(53.8, -1.55, 10), (0.01, 179.99, 50), (-33.9, 151.2, 3), (89.9, 10, 30)]:
+            box = geo.bounding_box(lat, lon, radius)
+            ranges = geo.cover(box)
+            self.assertLessEqual(len(ranges), geo.MAX_COVER_CELLS)
+            min_lat, max_lat, min_lon, max_lon = box
+            for i in range(11):
+                for j in range(11):
+                    point_lat = min_lat + (max_lat - min_lat) * i / 10
+                    point_lon = (min_lon + (max_lon - min_lon) * j / 10 + 180) % 360 - 180
+                    code = geo.encode(point_lat, point_lon)
+                    self.assertTrue(any(low <= code < high for low, high in ranges), (lat, lon, i, j))
+
+    def test_api(self):
+        client = APIClient()
+        response = client.get('/api/services/providers/nearby/', {'place': 'Leeds', 'radius_km': 20}, secure=True)
+        self.assertEqual([row['id'] for row in response.data],
+                         [self.providers['leeds'].pk, self.providers['bradford'].pk])
+        self.assertEqual(response.data[0]['distance_km'], 0)
+
+        response = client.get('/api/services/providers/nearby/', {'lat': 51.5, 'lon': -0.12, 'k': 1}, secure=True)
+        self.assertEqual([row['id'] for row in response.data], [self.providers['london'].pk])
+
+
+class RatingAggregateTest(TestCase):
+    """Provider rating aggregates follow review creates, edits and deletes"""
+
+    def setUp(self):
+        self.providers = [
+            ServiceProvider.objects.create(
+                user=User.objects.create_user(f'pro{i}', f'pro{i}@example.com', user_type='provider'),
+                description='', skills='', service_area='Leeds',
+            )
+            for i in range(2)
+        ]
+        self.customers = [
+            User.objects.create_user(f'cust{i}', f'cust{i}@example.com', user_type='customer') for i in range(3)
+        ]
+
+    def review(self, customer, rating, provider=None):
+        return Review.objects.create(provider=provider or self.providers[0], customer=customer, rating=rating)
+
+    def assertAggregates(self, provider, rating, count, histogram):
+        provider.refresh_from_db()
+        self.assertEqual(provider.rating, Decimal(rating))
+        self.assertEqual(provider.rating_count, count)
+        self.assertEqual(provider.rating_sum, sum(stars * n for stars, n in histogram.items()))
+        self.assertEqual(provider.rating_histogram, {stars: histogram.get(stars, 0) for stars in range(1, 6)})
+
+    def test_create_update_delete(self):
+        provider = self.providers[0]
+        first = self.review(self.customers[0], 5)
+        second = self.review(self.customers[1], 4)
+        self.review(self.customers[2], 4)
+        self.assertAggregates(provider, '4.33', 3, {5: 1, 4: 2})
+
+        second.rating = 1
+        second.save()
+        self.assertAggregates(provider, '3.33', 3, {5: 1, 4: 1, 1: 1})
+
+        first.delete()
+        self.assertAggregates(provider, '2.50', 2, {4: 1, 1: 1})
+
+        Review.objects.filter(provider=provider).delete()
+        self.assertAggregates(provider, '0', 0, {})
+
+    def test_moving_review_between_providers(self):
+        review = self.review(self.customers[0], 3)
+        review.provider = self.providers[1]
+        review.save()
+        self.assertAggregates(self.providers[0], '0', 0, {})
+        self.assertAggregates(self.providers[1], '3', 1, {3: 1})
+
+    def test_review_write_does_not_save_provider(self):
+        with self.assertNumQueries(3):  # INSERT review, UPDATE aggregates, UPDATE catalog services
+            self.review(self.customers[0], 5)
+
+    def test_reconcile(self):
+        self.review(self.customers[0], 5)
+        self.review(self.customers[1], 2)
+        ServiceProvider.objects.filter(pk=self.providers[0].pk).update(
+            rating=0, rating_sum=0, rating_count=0, stars_5=0, stars_2=7
+        )
+        self.assertEqual(ratings.reconcile(batch_size=1), 1)
+        self.assertAggregates(self.providers[0], '3.5', 2, {5: 1, 2: 1})
+        self.assertEqual(ratings.reconcile(), 0)
+
+    def test_reconcile_agrees_on_halves(self):
+        # 33 / 8 = 4.125: SQL rounds the half up, and the recount must too
+        for n, rating in enumerate([4] * 7 + [5]):
+            self.review(User.objects.create_user(f'tie{n}', f'tie{n}@example.com', user_type='customer'), rating)
+        self.assertAggregates(self.providers[0], '4.13', 8, {4: 7, 5: 1})
+        self.assertEqual(ratings.rating_value(33, 8), Decimal('4.13'))
+        self.assertEqual(ratings.reconcile(), 0)
+        self.assertAggregates(self.providers[0], '4.13', 8, {4: 7, 5: 1})
+
+    def test_reviews_endpoint(self):
+        provider = self.providers[0]
+        for customer, rating in zip(self.customers, (5, 3, 4)):
+            self.review(customer, rating)
+        Review.objects.filter(customer=self.customers[0]).update(comment='Great')
+        url = f'/api/services/providers/{provider.pk}/reviews/'
+        client = APIClient()
+        with self.assertNumQueries(2):  # Provider, then one page of reviews joined to their customers
+            page = client.get(url, {'limit': 2}, secure=True).json()
+        self.assertEqual(page['summary'], {
+            'average': '4.00', 'count': 3, 'histogram': {'1': 0, '2': 0, '3': 1, '4': 1, '5': 1},
+        })
+        self.assertEqual([review['rating'] for review in page['results']], [4, 3])
+        rest = client.get(page['next'], secure=True).json()
+        self.assertNotIn('summary', rest)
+        self.assertEqual([review['comment'] for review in rest['results']], ['Great'])
+        self.assertIsNone(rest['next'])
+
+        page = client.get(url, {'ordering': '-rating'}, secure=True).json()
+        self.assertEqual([review['rating'] for review in page['results']], [5, 4, 3])
+        self.assertEqual(client.get(url, {'ordering': 'comment'}, secure=True).status_code, 400)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ProviderListingTest(TestCase):
+    """Paginated, cached public provider listing"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.providers = []
+        for i in range(5):
+            provider = ServiceProvider.objects.create(
+                user=User.objects.create_user(f'pro{i}', f'pro{i}@example.com', user_type='provider'),
+                business_name=f'Provider {i}', description='', skills='', service_area='Leeds',
+            )
+            provider.categories.add(self.plumbing)
+            self.providers.append(provider)
+
+    def get(self, **params):
+        return self.client.get('/api/services/providers/', params, secure=True)
+
+    def test_pages_without_per_row_queries(self):
+        # Providers with their users, then the category links; categories come from the reference cache
+        reference.get_categories()
+        with self.assertNumQueries(2):
+            response = self.get(limit=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         [self.providers[4].pk, self.providers[3].pk])
+        self.assertEqual(response.data['results'][0]['username'], 'pro4')
+        self.assertEqual(response.data['results'][0]['categories'][0]['name'], 'Plumbing')
+
+        seen = [row['id'] for row in response.data['results']]
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url, secure=True)
+            seen += [row['id'] for row in response.data['results']]
+            next_url = response.data['next']
+        self.assertEqual(seen, [provider.pk for provider in reversed(self.providers)])
+
+    def test_cached_until_a_write_bumps_the_version(self):
+        self.get(category=self.plumbing.pk)
+        with self.assertNumQueries(0):
+            response = self.get(category=f' {self.plumbing.pk} ', utm_source='mail')
+        self.assertEqual(len(response.data['results']), 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.providers[0].categories.remove(self.plumbing)
+        self.assertEqual(len(self.get(category=self.plumbing.pk).data['results']), 4)
+
+        customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(provider=self.providers[4], customer=customer, rating=4)
+        self.assertEqual(self.get(limit=1).data['results'][0]['rating'], '4.00')
+
+    def test_normalized_key(self):
+        self.assertEqual(caching.cache_key({'search': ' Leaky   TAP ', 'other': 'x'}),
+                         caching.cache_key({'search': 'leaky tap'}))
+        self.assertNotEqual(caching.cache_key({'search': 'tap'}), caching.cache_key({'search': 'tap', 'limit': '5'}))
+
+    def test_trust_fields_are_read_only(self):
+        row = self.get(limit=1).data['results'][0]
+        for private in ('rating_sum', 'stars_5', 'slots_monday', 'geohash'):
+            self.assertNotIn(private, row)
+
+        provider = self.providers[0]
+        self.client.force_authenticate(provider.user)
+        url = f'/api/services/providers/{provider.pk}/'
+        response = self.client.patch(url, {'validation_status': 'validated', 'is_active': True, 'rating': '5.00',
+                                           'business_name': 'Renamed'}, format='json', secure=True)
+        self.assertEqual(response.status_code, 200)
+        provider.refresh_from_db()
+        self.assertEqual((provider.validation_status, provider.is_active, provider.rating, provider.business_name),
+                         ('pending', False, 0, 'Renamed'))
+        other = f'/api/services/providers/{self.providers[1].pk}/'
+        self.assertEqual(self.client.patch(other, {'business_name': 'Mine'}, format='json', secure=True).status_code,
+                         404)
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.get(category='plumbing').status_code, 400)
+        self.assertEqual(self.get(cursor='nonsense').status_code, 404)
+
+    def test_per_process_cache_is_refused_in_production(self):
+        with override_settings(DEBUG=False):
+            self.assertEqual([error.id for error in checks.check_shared_cache(None)], ['services.E001'])
+        with override_settings(DEBUG=True):
+            self.assertEqual(checks.check_shared_cache(None), [])
+        db_cache = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'fixmate_cache'}}
+        with override_settings(DEBUG=False, CACHES=db_cache):
+            self.assertEqual(checks.check_shared_cache(None), [])
+
+
+class ServiceCatalogTest(TestCase):
+    """Filtered, keyset-paginated service catalog"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.painting = ServiceCategory.objects.create(name='Painting', description='Walls')
+        self.providers = [
+            ServiceProvider.objects.create(
+                user=User.objects.create_user(f'pro{i}', f'pro{i}@example.com', user_type='provider'),
+                business_name=f'Provider {i}', description='', skills='', service_area='Leeds',
+            )
+            for i in range(2)
+        ]
+        customer = User.objects.create_user('cust', 'cust@example.com', user_type='customer')
+        Review.objects.create(provider=self.providers[1], customer=customer, rating=5)
+        self.services = [
+            Service.objects.create(provider=self.providers[i % 2], category=category, title=title,
+                                   description='', price=Decimal(price), status=service_status)
+            for i, (title, category, price, service_status) in enumerate([
+                ('Tap repair', self.plumbing, '40.00', 'active'),
+                ('Boiler service', self.plumbing, '90.00', 'active'),
+                ('Room painting', self.painting, '150.00', 'active'),
+                ('Drain unblocking', self.plumbing, '60.00', 'inactive'),
+            ])
+        ]
+
+    def titles(self, **params):
+        response = self.client.get('/api/services/', params, secure=True)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['title'] for row in response.data['results']]
+
+    def test_filters(self):
+        self.assertEqual(self.titles(category=self.plumbing.pk, ordering='price'), ['Tap repair', 'Boiler service'])
+        self.assertEqual(self.titles(min_price='50', max_price='100'), ['Boiler service'])
+        self.assertEqual(self.titles(status='inactive'), ['Drain unblocking'])
+        self.assertEqual(self.titles(provider=self.providers[0].pk, ordering='-price'), ['Room painting', 'Tap repair'])
+
+    def test_rating_ordering_follows_reviews(self):
+        self.assertEqual(self.titles(ordering='-provider__rating')[0], 'Boiler service')
+        customer = User.objects.create_user('cust2', 'cust2@example.com', user_type='customer')
+        Review.objects.create(provider=self.providers[0], customer=customer, rating=5)
+        Review.objects.filter(provider=self.providers[1]).delete()
+        self.assertEqual(self.titles(ordering='-rating'), ['Room painting', 'Tap repair', 'Boiler service'])
+
+    def test_keyset_pages(self):
+        response = self.client.get('/api/services/', {'ordering': 'price', 'limit': 2}, secure=True)
+        titles = [row['title'] for row in response.data['results']]
+        self.assertEqual(response.data['results'][0]['provider']['business_name'], 'Provider 0')
+        with self.assertNumQueries(1):
+            response = self.client.get(response.data['next'], secure=True)
+        titles += [row['title'] for row in response.data['results']]
+        self.assertEqual(titles, ['Tap repair', 'Boiler service', 'Room painting'])
+        self.assertIsNone(response.data['next'])
+
+    def test_bad_parameters(self):
+        for params in ({'ordering': 'title'}, {'min_price': 'cheap'}, {'status': 'deleted'}, {'category': 'x'}):
+            response = self.client.get('/api/services/', params, secure=True)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_providers_manage_their_own_services(self):
+        owner, other = (provider.user for provider in self.providers)
+        self.client.force_authenticate(owner)
+        response = self.client.post('/api/services/', {
+            'category': self.plumbing.pk, 'title': 'Leak check', 'description': 'Quick', 'price': '25.00',
+        }, secure=True)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['provider']['id'], self.providers[0].pk)
+
+        self.client.force_authenticate(other)
+        response = self.client.patch(f'/api/services/{response.data["id"]}/', {'price': '1.00'}, secure=True)
+        self.assertEqual(response.status_code, 404)
+
+
+class FeaturedLeaderboardTest(TestCase):
+    """Materialized featured-provider boards"""
+
+    def setUp(self):
+        cache.clear()
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.painting = ServiceCategory.objects.create(name='Painting', description='Walls')
+        self.providers = {}
+        for key, category, stars, jobs in [
+            ('top', self.plumbing, [5, 5, 5, 5], 40),
+            ('one_review', self.plumbing, [5], 0),
+            ('painter', self.painting, [4, 4], 10),
+            ('pending', self.plumbing, [5, 5, 5], 50),
+        ]:
+            provider = ServiceProvider.objects.create(
+                user=User.objects.create_user(key, f'{key}@example.com', user_type='provider'),
+                business_name=key, description='', skills='', service_area='Leeds', total_jobs=jobs,
+                validation_status='pending' if key == 'pending' else 'validated', is_active=key != 'pending',
+            )
+            provider.categories.add(category)
+            for i, rating in enumerate(stars):
+                customer = User.objects.create_user(f'{key}-c{i}', f'{key}-c{i}@example.com', user_type='customer')
+                Review.objects.create(provider=provider, customer=customer, rating=rating)
+            self.providers[key] = provider
+
+    def names(self, entries):
+        return [entry['business_name'] for entry in entries]
+
+    def test_boards(self):
+        self.assertEqual(leaderboard.refresh(), 3)
+        entries, computed_at = leaderboard.get_board()
+        # Unvalidated providers never appear; one five-star review is shrunk towards the mean
+        self.assertEqual(self.names(entries), ['top', 'painter', 'one_review'])
+        self.assertEqual([entry['rank'] for entry in entries], [1, 2, 3])
+        self.assertIsNotNone(computed_at)
+        self.assertEqual(self.names(leaderboard.get_board(self.painting.pk)[0]), ['painter'])
+        self.assertEqual(leaderboard.get_board(999), ([], None))
+
+    def test_featured_services_boost(self):
+        Service.objects.create(provider=self.providers['one_review'], category=self.plumbing, title='Taps',
+                               description='', price=Decimal('30'), is_featured=True)
+        leaderboard.refresh()
+        self.assertEqual(self.names(leaderboard.get_board(self.plumbing.pk)[0]), ['top', 'one_review'])
+        scores = {entry['business_name']: entry['score'] for entry in leaderboard.get_board()[0]}
+        self.assertGreater(scores['one_review'], scores['painter'])
+
+    def test_endpoints_are_one_lookup(self):
+        leaderboard.refresh()
+        client = APIClient()
+        with self.assertNumQueries(1):
+            response = client.get('/api/services/featured/', secure=True)
+        self.assertEqual(self.names(response.data['results']), ['top', 'painter', 'one_review'])
+        response = client.get('/api/services/providers/', {'featured': 'true', 'category': self.painting.pk},
+                              secure=True)
+        self.assertEqual(self.names(response.data['results']), ['painter'])
+
+    @override_settings(FEATURED_LEADERBOARD_REFRESH_INTERVAL=0)
+    def test_refreshed_after_writes(self):
+        leaderboard.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            ServiceProvider.objects.filter(pk=self.providers['top'].pk).update(is_active=False)
+            self.providers['painter'].categories.add(self.plumbing)
+        self.assertEqual(self.names(leaderboard.get_board(self.plumbing.pk)[0]), ['painter', 'one_review'])
+        self.assertFalse(leaderboard.is_dirty())
+
+    def test_one_refresh_per_interval(self):
+        leaderboard.refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.providers['painter'].categories.add(self.plumbing)
+        self.assertFalse(leaderboard.is_dirty())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.providers['one_review'].categories.remove(self.plumbing)
+        self.assertTrue(leaderboard.is_dirty())  # The interval is claimed by the first refresh
+
+        out = io.StringIO()
+        call_command('refresh_leaderboard', '--if-dirty', stdout=out)
+        self.assertIn('Refreshed', out.getvalue())
+        self.assertEqual(self.names(leaderboard.get_board(self.plumbing.pk)[0]), ['top', 'painter'])
+        out = io.StringIO()
+        call_command('refresh_leaderboard', '--if-dirty', stdout=out)
+        self.assertIn('up to date', out.getvalue())
+
+
+    def test_failed_background_refresh_releases_the_claim(self):
+        cache.add(leaderboard.CLAIM_KEY, True, 60)
+        with mock.patch.object(leaderboard, 'refresh', side_effect=DatabaseError('locked')), \
+                mock.patch.object(leaderboard, 'connection'):
+            with self.assertLogs('services.leaderboard', 'ERROR'):
+                leaderboard._refresh_in_background()
+        self.assertTrue(cache.add(leaderboard.CLAIM_KEY, True, 60))  # The next write can claim it again
+
+
+class ReferenceDataTest(TestCase):
+    """Process-local category snapshot validated against a version row"""
+
+    def setUp(self):
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes', icon='P')
+        reference.get_categories()
+
+    def test_lookups_are_free_and_shared(self):
+        with self.assertNumQueries(0):
+            first = reference.get_category(self.plumbing.pk)
+            second = reference.get_category(self.plumbing.pk)
+            self.assertEqual(reference.choices('job_status')['in_progress'], 'In Progress')
+        self.assertIs(first, second)
+        self.assertEqual(first.data['name'], 'Plumbing')
+        with self.assertNumQueries(0):
+            response = APIClient().get('/api/services/categories/', secure=True)
+        self.assertEqual([row['name'] for row in response.data], ['Plumbing'])
+
+    def test_writes_invalidate(self):
+        self.plumbing.name = 'Plumbing & Heating'
+        self.plumbing.save()
+        self.assertEqual(reference.get_category(self.plumbing.pk).name, 'Plumbing & Heating')
+
+    @override_settings(REFERENCE_DATA_CHECK_INTERVAL=0)
+    def test_other_workers_notice_the_version(self):
+        # A write from another process: only the version row tells this one
+        ServiceCategory.objects.filter(pk=self.plumbing.pk).update(name='Drains')
+        self.assertEqual(reference.get_category(self.plumbing.pk).name, 'Plumbing')
+        ReferenceDataVersion.objects.update_or_create(
+            name=reference.CATEGORIES, defaults={'version': reference.current_version() + 1}
+        )
+        self.assertEqual(reference.get_category(self.plumbing.pk).name, 'Drains')
+
+    def test_unknown_ids(self):
+        self.assertIsNone(reference.get_category(None))
+        self.assertIsNone(reference.get_category(10 ** 9))
+        with self.assertNumQueries(0):  # Remembered as unknown until the snapshot is replaced
+            self.assertIsNone(reference.get_category(10 ** 9))
+        created = ServiceCategory.objects.create(name='Roofing', description='Tiles')
+        self.assertEqual(reference.get_category(created.pk).name, 'Roofing')
+        self.assertEqual(APIClient().get('/api/services/categories/999999/', secure=True).status_code, 404)
+
+
+class AvailabilityBitmapTest(TestCase):
+    """Weekly 30-minute slot bitmaps kept in step with ProviderAvailability"""
+
+    def setUp(self):
+        self.plumbing = ServiceCategory.objects.create(name='Plumbing', description='Pipes')
+        self.providers = {}
+        for key, hours in [
+            ('days', {'tuesday': ('08:00', '17:00')}),
+            ('mornings', {'tuesday': ('07:45', '12:45'), 'wednesday': ('08:00', '12:00')}),
+            ('nights', {'tuesday': ('17:00', '00:00')}),
+        ]:
+            provider = ServiceProvider.objects.create(
+                user=User.objects.create_user(key, f'{key}@example.com', user_type='provider'),
+                business_name=key, description='', skills='', service_area='Leeds',
+            )
+            provider.categories.add(self.plumbing)
+            for day, (start, end) in hours.items():
+                ProviderAvailability.objects.create(
+                    provider=provider, day_of_week=day,
+                    start_time=datetime.time.fromisoformat(start), end_time=datetime.time.fromisoformat(end),
+                )
+            self.providers[key] = provider
+
+    def free(self, day, period, whole=True):
+        queryset = availability.free_providers(ServiceProvider.objects.order_by('pk'), day, period, whole)
+        return [provider.business_name for provider in queryset]
+
+    def test_window_mask(self):
+        self.assertEqual(availability.window_mask(datetime.time(8), datetime.time(9)), 0b11 << 16)
+        # Partial slots at either end are not offered
+        self.assertEqual(availability.window_mask(datetime.time(8, 10), datetime.time(9, 20)), 0b1 << 17)
+        # An end at midnight runs to the end of the day
+        self.assertEqual(availability.window_mask(datetime.time(23), datetime.time(0)), 0b11 << 46)
+
+    def test_sql_matching(self):
+        tuesday = datetime.date(2026, 10, 20)
+        self.assertEqual(self.free(tuesday, 'morning'), ['days', 'mornings'])
+        self.assertEqual(self.free('tuesday', 'afternoon'), ['days'])
+        self.assertEqual(self.free('tuesday', 'afternoon', whole=False), ['days', 'mornings'])
+        self.assertEqual(self.free('tuesday', 'evening'), ['nights'])
+        self.assertEqual(self.free('monday', 'morning'), [])
+
+    def test_kept_in_sync(self):
+        slot = ProviderAvailability.objects.get(provider=self.providers['days'])
+        slot.is_available = False
+        slot.save()
+        self.assertEqual(self.free('tuesday', 'afternoon'), [])
+        ProviderAvailability.objects.filter(provider=self.providers['mornings'], day_of_week='tuesday').delete()
+        self.assertEqual(self.free('tuesday', 'morning'), [])
+
+        ServiceProvider.objects.update(slots_wednesday=0)
+        self.assertEqual(availability.rebuild(), 1)
+        self.assertEqual(self.free('wednesday', 'morning'), ['mornings'])
+
+    def test_vectorized_matching(self):
+        ids, matrix = availability.load_matrix(ServiceProvider.objects.all())
+        free = availability.match(matrix, 'tuesday', availability.PERIODS['morning'])
+        self.assertEqual(list(ids[free]), [self.providers['days'].pk, self.providers['mornings'].pk])
+
+    def test_api(self):
+        client = APIClient()
+        response = client.get('/api/services/providers/available/',
+                              {'date': '2026-10-20', 'period': 'evening', 'category': self.plumbing.pk}, secure=True)
+        self.assertEqual([row['business_name'] for row in response.data['results']], ['nights'])
+        self.assertEqual(client.get('/api/services/providers/available/', {'day': 'tuesday'},
+                                    secure=True).status_code, 400)
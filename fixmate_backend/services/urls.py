@@ -7,6 +7,16 @@ router.register(r'categories', views.ServiceCategoryViewSet)
 router.register(r'providers', views.ServiceProviderViewSet)
 router.register(r'providers/(?P<provider_pk>\d+)/reviews', views.ReviewViewSet, basename='review')
 
+# The catalog lives at the app root, so its routes are spelled out: a router
+# prefix of '' would shadow the router's API root and the other prefixes
+service_list = views.ServiceViewSet.as_view({'get': 'list', 'post': 'create'})
+service_detail = views.ServiceViewSet.as_view({
+    'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy',
+})
+
 urlpatterns = [
+    path('', service_list, name='service-list'),
+    path('featured/', views.ServiceProviderViewSet.as_view({'get': 'featured'}), name='featured-providers'),
+    path('<int:pk>/', service_detail, name='service-detail'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,25 +1,212 @@
-from rest_framework import viewsets, permissions
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
-from .models import ServiceCategory, ServiceProvider, Review
-from .serializers import ServiceCategorySerializer, ServiceProviderSerializer, ReviewSerializer
+from fixmate_backend.pagination import KeysetPagination
+from . import availability, caching, geo, leaderboard, reference, search
+from .models import ServiceCategory, ServiceProvider, Review, Service
+from .serializers import ServiceCategorySerializer, ServiceProviderSerializer, ReviewSerializer, ServiceSerializer
+
+def nearby_providers_response(request, latitude, longitude, queryset=None):
+    """
+    Providers around a point: within ?radius_km= (default 10), or the ?k= nearest
+    within ?max_km= when k is given; at most ?limit= results, nearest first.
+    """
+    try:
+        k = request.query_params.get('k')
+        k = max(1, min(int(k), 100)) if k else None
+        radius_km = min(float(request.query_params.get('radius_km', 10)), 500.0)
+        max_km = min(float(request.query_params.get('max_km', 100)), 500.0)
+        limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+    except ValueError:
+        return Response({'error': 'k, radius_km, max_km and limit must be numbers'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = ServiceProvider.objects.all() if queryset is None else queryset
+    if k:
+        found = geo.nearest(queryset, latitude, longitude, k, max_km=max_km)
+    else:
+        found = geo.nearby(queryset, latitude, longitude, radius_km, limit=limit)
+
+    providers = queryset.select_related('user').in_bulk([pk for pk, _ in found])
+    matches = [(providers[pk], distance) for pk, distance in found if pk in providers]
+    data = ServiceProviderSerializer([provider for provider, _ in matches], many=True).data
+    for row, (_, distance) in zip(data, matches):
+        row['distance_km'] = round(distance, 2)
+    return Response(data)
+
 
 class ServiceCategoryViewSet(viewsets.ModelViewSet):
     queryset = ServiceCategory.objects.all()
     serializer_class = ServiceCategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    # Reads come from the reference cache (services.reference); writes go through the model as usual
+
+    def list(self, request, *args, **kwargs):
+        return Response([category.data for category in reference.get_categories()])
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            category = reference.get_category(int(kwargs['pk']))
+        except ValueError:
+            category = None
+        if category is None:
+            return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(category.data)
+
 class ServiceProviderViewSet(viewsets.ModelViewSet):
-    queryset = ServiceProvider.objects.all()
+    queryset = ServiceProvider.objects.select_related('user')
     serializer_class = ServiceProviderSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    max_search_results = 200
+    page_size = 20
+
+    def get_queryset(self):
+        if self.action in ('update', 'partial_update', 'destroy'):
+            # A provider edits only its own profile
+            return self.queryset.filter(user=self.request.user)
+        return self.queryset
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Keyset-paginated providers, newest first, optionally within ?category=;
+        with ?search= the best full-text matches instead (at most ?limit=), and
+        with ?featured=true the featured leaderboard.
+        Served through the versioned listing cache (services.caching).
+        """
+        try:
+            category = request.query_params.get('category')
+            category = int(category) if category else None
+            limit = request.query_params.get('limit')
+            limit = int(limit) if limit else None
+        except ValueError:
+            return Response({'error': 'limit and category must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('featured', '').lower() == 'true':
+            return self.featured(request)
+
+        query = request.query_params.get('search', '').strip()
+        if query:
+            build = lambda: self.search_page(query, category, limit)  # noqa: E731
+        else:
+            build = lambda: self.list_page(request, category)  # noqa: E731
+        origin = f'{request.scheme}://{request.get_host()}'
+        return Response(caching.get_or_build(request.query_params, build, origin=origin))
+
+    def list_page(self, request, category):
+        queryset = self.get_queryset()
+        if category is not None:
+            queryset = queryset.filter(categories=category)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'), page_size=self.page_size)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return {'next': paginator.get_next_link(), 'results': self.get_serializer(page, many=True).data}
+
+    def search_page(self, query, category, limit):
+        limit = max(1, min(limit or 50, self.max_search_results))
+        ranked = search.search(query, limit=limit, category=category)
+        providers = self.get_queryset().in_bulk([pk for pk, _ in ranked])
+        matches = [(providers[pk], rank) for pk, rank in ranked if pk in providers]
+        data = self.get_serializer([provider for provider, _ in matches], many=True).data
+        for row, (_, rank) in zip(data, matches):
+            row['search_rank'] = round(rank, 4)
+        return {'next': None, 'results': data}
+
+    @action(detail=False, methods=['get'])
+    def featured(self, request):
+        """The precomputed featured leaderboard, site-wide or for ?category="""
+        try:
+            category = request.query_params.get('category')
+            category = int(category) if category else None
+        except ValueError:
+            return Response({'error': 'category must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        entries, computed_at = leaderboard.get_board(category)
+        return Response({'category': category, 'computed_at': computed_at, 'next': None, 'results': entries})
+
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """
+        Providers free on ?date= (or ?day= weekday name) for a Job preferred_time
+        ?period=, optionally within ?category=; ?whole=false accepts partial overlap.
+        """
+        params = request.query_params
+        period = params.get('period')
+        if period not in availability.PERIODS:
+            return Response({'error': f'period must be one of {", ".join(availability.PERIODS)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            day = date.fromisoformat(params['date']) if params.get('date') else params.get('day', '').lower()
+            category = int(params['category']) if params.get('category') else None
+        except ValueError:
+            return Response({'error': 'date must be YYYY-MM-DD and category an integer'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(day, str) and day not in availability.DAYS:
+            return Response({'error': 'date or day is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        if category is not None:
+            queryset = queryset.filter(categories=category)
+        queryset = availability.free_providers(queryset, day, period, whole=params.get('whole') != 'false')
+        paginator = KeysetPagination(ordering=('-created_at', '-id'), page_size=self.page_size)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        """Providers near ?lat=&lon= (or a known ?place=), nearest first"""
+        place = request.query_params.get('place')
+        if place:
+            point = geo.geocode(place)
+            if point is None:
+                return Response({'error': 'Unknown place'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            try:
+                point = (float(request.query_params['lat']), float(request.query_params['lon']))
+            except (KeyError, ValueError):
+                return Response({'error': 'lat and lon, or place, are required'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            if not (-90 <= point[0] <= 90 and -180 <= point[1] <= 180):
+                return Response({'error': 'lat/lon out of range'}, status=status.HTTP_400_BAD_REQUEST)
+        return nearby_providers_response(request, *point, queryset=ServiceProvider.objects.all())
+
+    # Each ordering walks one (provider, ...) review index in a single direction
+    review_orderings = {
+        '-created_at': ('-created_at', '-id'),
+        'created_at': ('created_at', 'id'),
+        '-rating': ('-rating', '-created_at', '-id'),
+        'rating': ('rating', 'created_at', 'id'),
+    }
+    review_page_size = 10
 
     @action(detail=True, methods=['get'])
     def reviews(self, request, pk=None):
+        """
+        The provider's reviews, keyset-paginated by ?ordering= recency (default
+        newest first) or rating. The first page also carries a summary (average,
+        count, star histogram) read from the provider's rating aggregates.
+        """
+        ordering = request.query_params.get('ordering', '-created_at')
+        if ordering not in self.review_orderings:
+            return Response({'error': f'ordering must be one of {", ".join(self.review_orderings)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
         provider = self.get_object()
-        reviews = provider.reviews.all()
-        serializer = ReviewSerializer(reviews, many=True)
-        return Response(serializer.data)
+        reviews = ReviewSerializer.setup_eager_loading(Review.objects.filter(provider=provider))
+        paginator = KeysetPagination(ordering=self.review_orderings[ordering], page_size=self.review_page_size)
+        page = paginator.paginate_queryset(reviews, request, view=self)
+        data = {'next': paginator.get_next_link(), 'results': ReviewSerializer(page, many=True).data}
+        if not request.query_params.get(paginator.cursor_query_param):
+            data = {'summary': {
+                'average': str(provider.rating),  # A string, as the provider serializers render it
+                'count': provider.rating_count,
+                'histogram': provider.rating_histogram,
+            }, **data}
+        return Response(data)
 
 class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.all()
@@ -27,4 +214,79 @@ class ReviewViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        serializer.save(customer=self.request.user)
\ No newline at end of file
+        serializer.save(customer=self.request.user)
+
+class ServiceViewSet(viewsets.ModelViewSet):
+    """
+    The service catalog. Lists are keyset-paginated and filtered by ?category=,
+    ?provider=, ?min_price=/?max_price= and ?status= (default active), ordered by
+    ?ordering= price, provider rating or recency. Every ordering, with or without
+    a category, has a matching (status, [category,] column, id) index.
+    """
+    queryset = Service.objects.all()
+    serializer_class = ServiceSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    page_size = 20
+    orderings = {
+        'created_at': ('created_at', 'id'),
+        '-created_at': ('-created_at', '-id'),
+        'price': ('price', 'id'),
+        '-price': ('-price', '-id'),
+        'rating': ('provider_rating', 'id'),
+        '-rating': ('-provider_rating', '-id'),
+    }
+    ordering_aliases = {'provider__rating': 'rating', '-provider__rating': '-rating'}
+
+    def get_queryset(self):
+        queryset = ServiceSerializer.setup_eager_loading(Service.objects.all())
+        if self.action in ('update', 'partial_update', 'destroy'):
+            # Providers manage only their own services
+            queryset = queryset.filter(provider__user=self.request.user)
+        return queryset
+
+    def filter_catalog(self, queryset, params):
+        """Apply the list filters; raises ValueError for malformed values"""
+        status_filter = params.get('status', 'active')
+        if status_filter not in dict(Service.STATUS_CHOICES):
+            raise ValueError(f'status must be one of {", ".join(dict(Service.STATUS_CHOICES))}')
+        queryset = queryset.filter(status=status_filter)
+        for param, field in (('category', 'category_id'), ('provider', 'provider_id')):
+            if params.get(param):
+                try:
+                    queryset = queryset.filter(**{field: int(params[param])})
+                except ValueError:
+                    raise ValueError(f'{param} must be an integer')
+        try:
+            if params.get('min_price'):
+                queryset = queryset.filter(price__gte=Decimal(params['min_price']))
+            if params.get('max_price'):
+                queryset = queryset.filter(price__lte=Decimal(params['max_price']))
+        except InvalidOperation:
+            raise ValueError('min_price and max_price must be numbers')
+        query = params.get('search', '').strip()
+        if query:
+            # Services of the best full-text provider matches (services.search)
+            ranked = search.search(query, limit=ServiceProviderViewSet.max_search_results)
+            queryset = queryset.filter(provider_id__in=[pk for pk, _ in ranked])
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        ordering = request.query_params.get('ordering', '-created_at')
+        ordering = self.ordering_aliases.get(ordering, ordering)
+        if ordering not in self.orderings:
+            return Response({'error': f'ordering must be one of {", ".join(self.orderings)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            queryset = self.filter_catalog(self.get_queryset(), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = KeysetPagination(ordering=self.orderings[ordering], page_size=self.page_size)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def perform_create(self, serializer):
+        provider = ServiceProvider.objects.filter(user=self.request.user).first()
+        if provider is None:
+            raise PermissionDenied('Only providers can list services')
+        serializer.save(provider=provider)
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from fixmate_backend import bulk
 from .models import User, UserVerification
 
 @admin.register(User)
@@ -18,13 +19,13 @@ class UserAdmin(BaseUserAdmin):
     actions = ['approve_users', 'reject_users']
     
     def approve_users(self, request, queryset):
-        queryset.update(is_verified=True)
-        self.message_user(request, f"{queryset.count()} users have been approved.")
+        count = queryset.update(is_verified=True)
+        self.message_user(request, f"{count} users have been approved.")
     approve_users.short_description = "Approve selected users"
     
     def reject_users(self, request, queryset):
-        queryset.update(is_verified=False)
-        self.message_user(request, f"{queryset.count()} users have been rejected.")
+        count = queryset.update(is_verified=False)
+        self.message_user(request, f"{count} users have been rejected.")
     reject_users.short_description = "Reject selected users"
 
 @admin.register(UserVerification)
@@ -53,21 +54,16 @@ class UserVerificationAdmin(admin.ModelAdmin):
     actions = ['approve_verifications', 'reject_verifications']
     
     def approve_verifications(self, request, queryset):
-        from django.utils import timezone
-        queryset.update(verification_status='approved', reviewed_at=timezone.now())
-        # Also update the user's is_verified status
-        for verification in queryset:
-            verification.user.is_verified = True
-            verification.user.save()
-        self.message_user(request, f"{queryset.count()} verifications have been approved.")
+        count = self._review_verifications(queryset, approved=True)
+        self.message_user(request, f"{count} verifications have been approved.")
     approve_verifications.short_description = "Approve selected verifications"
     
     def reject_verifications(self, request, queryset):
-        from django.utils import timezone
-        queryset.update(verification_status='rejected', reviewed_at=timezone.now())
-        # Also update the user's is_verified status
-        for verification in queryset:
-            verification.user.is_verified = False
-            verification.user.save()
-        self.message_user(request, f"{queryset.count()} verifications have been rejected.")
-    reject_verifications.short_description = "Reject selected verifications"
\ No newline at end of file
+        count = self._review_verifications(queryset, approved=False)
+        self.message_user(request, f"{count} verifications have been rejected.")
+    reject_verifications.short_description = "Reject selected verifications"
+
+    def _review_verifications(self, queryset, approved):
+        # The same set-based path as the admin API's bulk action; counts the rows that changed
+        results = bulk.review_verifications(list(queryset.values_list('pk', flat=True)), approved)
+        return bulk.summarize(results)[bulk.UPDATED]
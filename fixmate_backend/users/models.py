@@ -23,6 +23,12 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta(AbstractUser.Meta):
+        swappable = 'AUTH_USER_MODEL'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='user_created_idx'),
+            models.Index(fields=['user_type', 'created_at', 'id'], name='user_type_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
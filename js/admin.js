@@ -10,6 +10,7 @@ class AdminManager {
         this.providers = [];
         this.jobs = [];
         this.reviews = [];
+        this.paging = {};  // Per table: the keyset page URLs before the current one, and the next one
         this.clearStaleUserData();
         this.init();
     }
@@ -287,8 +288,8 @@ class AdminManager {
             });
 
             if (response.ok) {
-                const activities = await response.json();
-                this.renderRecentActivity(activities);
+                const data = await response.json();
+                this.renderRecentActivity(data.results || data);
             } else {
                 activityList.innerHTML = '<div class="empty-state"><i class="fas fa-history"></i><h3>No Recent Activity</h3></div>';
             }
@@ -314,7 +315,7 @@ class AdminManager {
                 </div>
                 <div class="activity-content">
                     <p>${activity.description}</p>
-                    <small>${this.formatDate(activity.timestamp)}</small>
+                    <small>${this.formatDate(activity.created_at)}</small>
                 </div>
             </div>
         `).join('');
@@ -388,22 +389,77 @@ class AdminManager {
         `;
     }
 
+    // Keyset paging for the admin tables: Next follows the page's `next` link, Previous goes back
+    // through the page URLs visited before the current one
+    pageLoader(key) {
+        return {
+            users: url => this.loadUsers(url),
+            providers: url => this.loadAllProviders(url),
+            jobs: url => this.loadJobs(url),
+            reviews: url => this.loadReviews(url),
+        }[key];
+    }
+
+    resetPages(key) {
+        this.paging[key] = { history: [], current: null, next: null };
+    }
+
+    setPage(key, url, next) {
+        const paging = this.paging[key] || (this.paging[key] = { history: [], current: null, next: null });
+        paging.current = url;
+        paging.next = next || null;
+        this.renderPager(key);
+    }
+
+    renderPager(key) {
+        const pager = document.getElementById(`${key}-pager`);
+        const paging = this.paging[key];
+        if (!pager || !paging) return;
+        const hasPrevious = paging.history.length > 0;
+        pager.innerHTML = hasPrevious || paging.next ? `
+            <button class="btn btn-outline btn-small" onclick="adminManager.previousPage('${key}')" ${hasPrevious ? '' : 'disabled'}>
+                <i class="fas fa-chevron-left"></i> Previous
+            </button>
+            <span class="page-number">Page ${paging.history.length + 1}</span>
+            <button class="btn btn-outline btn-small" onclick="adminManager.nextPage('${key}')" ${paging.next ? '' : 'disabled'}>
+                Next <i class="fas fa-chevron-right"></i>
+            </button>
+        ` : '';
+    }
+
+    nextPage(key) {
+        const paging = this.paging[key];
+        if (!paging || !paging.next) return;
+        paging.history.push(paging.current);
+        this.pageLoader(key)(paging.next);
+    }
+
+    previousPage(key) {
+        const paging = this.paging[key];
+        if (!paging || paging.history.length === 0) return;
+        this.pageLoader(key)(paging.history.pop());
+    }
+
     // Users Management
-    async loadUsers() {
+    async loadUsers(url = null) {
         const usersTableBody = document.getElementById('users-table-body');
         if (!usersTableBody) return;
 
         this.showLoading(usersTableBody);
 
         try {
-            const response = await fetch(`${this.apiBase}/users/`, {
+            if (url === null) this.resetPages('users');
+            url = url || `${this.apiBase}/users/`;
+            const response = await fetch(url, {
                 headers: {
                     'Authorization': `Token ${this.token}`
                 }
             });
 
             if (response.ok) {
-                this.users = await response.json();
+                const data = await response.json();
+                this.users = data.results || data;
+                this.setPage('users', url, data.next);
                 this.renderUsers();
             } else {
                 usersTableBody.innerHTML = '<tr><td colspan="7" class="text-center">No users found</td></tr>';
@@ -474,8 +530,8 @@ class AdminManager {
             });
 
             if (response.ok) {
-                const pendingProviders = await response.json();
-                this.renderPendingValidations(pendingProviders);
+                const data = await response.json();
+                this.renderPendingValidations(data.results || data);
             } else {
                 validationList.innerHTML = '<div class="empty-state"><i class="fas fa-check-circle"></i><h3>No Pending Validations</h3></div>';
             }
@@ -518,21 +574,25 @@ class AdminManager {
         `).join('');
     }
 
-    async loadAllProviders() {
+    async loadAllProviders(url = null) {
         const providersTableBody = document.getElementById('providers-table-body');
         if (!providersTableBody) return;
 
         this.showLoading(providersTableBody);
 
         try {
-            const response = await fetch(`${this.apiBase}/providers/`, {
+            if (url === null) this.resetPages('providers');
+            url = url || `${this.apiBase}/providers/`;
+            const response = await fetch(url, {
                 headers: {
                     'Authorization': `Token ${this.token}`
                 }
             });
 
             if (response.ok) {
-                this.providers = await response.json();
+                const data = await response.json();
+                this.providers = data.results || data;
+                this.setPage('providers', url, data.next);
                 this.renderProviders();
             } else {
                 providersTableBody.innerHTML = '<tr><td colspan="7" class="text-center">No providers found</td></tr>';
@@ -582,21 +642,25 @@ class AdminManager {
     }
 
     // Jobs Management
-    async loadJobs() {
+    async loadJobs(url = null) {
         const jobsTableBody = document.getElementById('jobs-table-body');
         if (!jobsTableBody) return;
 
         this.showLoading(jobsTableBody);
 
         try {
-            const response = await fetch(`${this.apiBase}/jobs/`, {
+            if (url === null) this.resetPages('jobs');
+            url = url || `${this.apiBase}/jobs/`;
+            const response = await fetch(url, {
                 headers: {
                     'Authorization': `Token ${this.token}`
                 }
             });
 
             if (response.ok) {
-                this.jobs = await response.json();
+                const data = await response.json();
+                this.jobs = data.results || data;
+                this.setPage('jobs', url, data.next);
                 this.renderJobs();
             } else {
                 jobsTableBody.innerHTML = '<tr><td colspan="8" class="text-center">No jobs found</td></tr>';
@@ -647,21 +711,25 @@ class AdminManager {
     }
 
     // Reviews Management
-    async loadReviews() {
+    async loadReviews(url = null) {
         const reviewsTableBody = document.getElementById('reviews-table-body');
         if (!reviewsTableBody) return;
 
         this.showLoading(reviewsTableBody);
 
         try {
-            const response = await fetch(`${this.apiBase}/reviews/`, {
+            if (url === null) this.resetPages('reviews');
+            url = url || `${this.apiBase}/reviews/`;
+            const response = await fetch(url, {
                 headers: {
                     'Authorization': `Token ${this.token}`
                 }
             });
 
             if (response.ok) {
-                this.reviews = await response.json();
+                const data = await response.json();
+                this.reviews = data.results || data;
+                this.setPage('reviews', url, data.next);
                 this.renderReviews();
             } else {
                 reviewsTableBody.innerHTML = '<tr><td colspan="8" class="text-center">No reviews found</td></tr>';
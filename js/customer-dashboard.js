@@ -385,28 +385,89 @@ class CustomerDashboard {
     }
 
     async uploadJobImages(jobId, imageFiles) {
-        const formData = new FormData();
-        imageFiles.forEach(file => {
-            formData.append('images', file);
-        });
+        // Chunked, resumable upload (see jobs/uploads.py): describe the photos, PUT their chunks
+        // a few at a time, then finalize the batch so the photos are added together
+        const files = imageFiles.filter(file => file.size > 0);
+        if (files.length === 0) return;
+        const baseUrl = `${this.apiBase}/jobs/${jobId}/upload-images/`;
 
         try {
-            const response = await fetch(`${this.apiBase}/jobs/${jobId}/upload-images/`, {
+            const described = await Promise.all(files.map(async file => ({
+                name: file.name,
+                size: file.size,
+                sha256: await this.sha256Hex(await file.arrayBuffer())
+            })));
+            const response = await fetch(baseUrl, {
                 method: 'POST',
                 headers: {
+                    'Content-Type': 'application/json',
                     'Authorization': `Token ${this.token}`
                 },
-                body: formData
+                body: JSON.stringify({ files: described })
             });
-
             if (!response.ok) {
                 console.error('Image upload failed');
+                return;
+            }
+            const batch = await response.json();
+
+            const chunks = [];
+            batch.uploads.forEach((upload, index) => {
+                for (let start = 0; start < upload.size; start += batch.chunk_size) {
+                    chunks.push({ upload, file: files[index], start, end: Math.min(start + batch.chunk_size, upload.size) });
+                }
+            });
+            const sendNext = async () => {
+                while (chunks.length > 0) {
+                    await this.putImageChunk(baseUrl, chunks.shift());
+                }
+            };
+            await Promise.all(Array.from({ length: 3 }, sendNext));
+
+            const finalized = await fetch(`${baseUrl}${batch.batch}/finalize/`, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Token ${this.token}`
+                }
+            });
+            if (!finalized.ok) {
+                console.error('Image upload failed');
             }
         } catch (error) {
             console.error('Image upload error:', error);
         }
     }
 
+    async putImageChunk(baseUrl, { upload, file, start, end }, attempts = 3) {
+        // Network errors and 5xx are retried; the server keeps the chunks that already arrived
+        for (let attempt = 1; ; attempt++) {
+            let response = null;
+            try {
+                response = await fetch(`${baseUrl}${upload.id}/`, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/octet-stream',
+                        'Content-Range': `bytes ${start}-${end - 1}/${upload.size}`,
+                        'Authorization': `Token ${this.token}`
+                    },
+                    body: file.slice(start, end)
+                });
+            } catch (error) {
+                if (attempt >= attempts) throw error;
+            }
+            if (response && response.ok) return;
+            if (response && (response.status < 500 || attempt >= attempts)) {
+                throw new Error(`Chunk ${start}-${end - 1} of ${file.name} was rejected`);
+            }
+            await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+        }
+    }
+
+    async sha256Hex(buffer) {
+        const digest = await crypto.subtle.digest('SHA-256', buffer);
+        return Array.from(new Uint8Array(digest), byte => byte.toString(16).padStart(2, '0')).join('');
+    }
+
     validateJobForm() {
         let isValid = true;
         
@@ -468,7 +529,8 @@ class CustomerDashboard {
 
             const response = await fetch(url);
             if (response.ok) {
-                const providers = await response.json();
+                const page = await response.json();
+                const providers = page.results || page;
                 this.renderProviders(providers);
             } else {
                 providersList.innerHTML = '<p class="text-center">No providers found.</p>';
@@ -819,13 +881,11 @@ class CustomerDashboard {
     async cancelJob(jobId) {
         if (confirm('Are you sure you want to cancel this job?')) {
             try {
-                const response = await fetch(`${this.apiBase}/jobs/${jobId}/`, {
-                    method: 'PATCH',
+                const response = await fetch(`${this.apiBase}/jobs/${jobId}/cancel/`, {
+                    method: 'POST',
                     headers: {
-                        'Content-Type': 'application/json',
                         'Authorization': `Token ${this.token}`
-                    },
-                    body: JSON.stringify({ status: 'cancelled' })
+                    }
                 });
                 
                 if (response.ok) {
@@ -859,7 +919,7 @@ class CustomerDashboard {
                     let proposalText = 'Proposals for this job:\n\n';
                     proposals.forEach(proposal => {
                         proposalText += `Provider: ${proposal.provider_name || proposal.provider}\n`;
-                        proposalText += `Proposal: ${proposal.proposal}\n`;
+                        proposalText += `Proposal: ${proposal.message}\n`;
                         proposalText += `Status: ${proposal.status}\n\n`;
                     });
                     alert(proposalText);
@@ -226,7 +226,8 @@ class FixMateApp {
         try {
             const response = await fetch(`${this.apiBase}/services/providers/?featured=true`);
             if (response.ok) {
-                const providers = await response.json();
+                const page = await response.json();
+                const providers = page.results || page;
                 this.renderFeaturedProviders(providers);
             } else {
                 providersGrid.innerHTML = '<p class="text-center">Unable to load providers at this time.</p>';
@@ -8,6 +8,11 @@ class ProviderDashboard {
         this.currentServices = [];
         this.currentJobs = [];
         this.currentProposals = [];
+        this.availableJobs = [];
+        this.availableJobsQuery = null;
+        this.availableJobsAsOf = null;  // Server time of the last feed load, the next ?since=
+        this.availableJobsLoadedAt = 0;
+        this.feedFullReloadMs = 5 * 60 * 1000;  // Reload the whole feed at least this often
         this.clearStaleUserData();
         this.init();
     }
@@ -264,8 +269,8 @@ class ProviderDashboard {
             });
 
             if (response.ok) {
-                const activities = await response.json();
-                this.renderRecentActivity(activities);
+                const data = await response.json();
+                this.renderRecentActivity(data.results || data);
             } else {
                 recentActivityList.innerHTML = '<p class="text-center">No recent activity.</p>';
             }
@@ -300,6 +305,9 @@ class ProviderDashboard {
     getActivityIcon(type) {
         const icons = {
             'job_completed': 'check-circle',
+            'job_created': 'briefcase',
+            'provider_validation': 'user-check',
+            'review_posted': 'star',
             'proposal_accepted': 'handshake',
             'new_message': 'message',
             'job_started': 'play-circle',
@@ -484,26 +492,34 @@ class ProviderDashboard {
         const budget = document.getElementById('job-budget-filter')?.value || '';
 
         try {
-            let url = `${this.apiBase}/jobs/available/?`;
             const params = new URLSearchParams();
             
             if (search) params.append('search', search);
             if (category) params.append('category', category);
             if (location) params.append('location', location);
             if (budget) params.append('budget_range', budget);
-            
-            url += params.toString();
 
-            const response = await fetch(url, {
-                headers: {
-                    'Authorization': `Token ${this.token}`
+            // Same filters as the last load: only fetch what changed since it, with a full reload now and then
+            const query = params.toString();
+            const refreshing = query === this.availableJobsQuery && this.availableJobsAsOf !== null
+                && Date.now() - this.availableJobsLoadedAt < this.feedFullReloadMs;
+            if (refreshing) params.append('since', this.availableJobsAsOf);
+
+            const feed = await this.fetchJobFeed(`${this.apiBase}/jobs/available/?${params.toString()}`);
+            if (feed) {
+                if (refreshing) {
+                    // Drop jobs taken or cancelled since the last load; new ones go first
+                    const gone = new Set([...feed.closed, ...feed.jobs.map(job => job.id)]);
+                    this.availableJobs = feed.jobs.concat(this.availableJobs.filter(job => !gone.has(job.id)));
+                } else {
+                    this.availableJobs = feed.jobs;
+                    this.availableJobsLoadedAt = Date.now();
                 }
-            });
-
-            if (response.ok) {
-                const jobs = await response.json();
-                this.renderAvailableJobs(jobs);
+                this.availableJobsQuery = query;
+                this.availableJobsAsOf = feed.asOf;
+                this.renderAvailableJobs(this.availableJobs);
             } else {
+                this.availableJobsQuery = null;
                 availableJobsList.innerHTML = '<p class="text-center">No available jobs found.</p>';
             }
         } catch (error) {
@@ -512,6 +528,27 @@ class ProviderDashboard {
         }
     }
 
+    async fetchJobFeed(url) {
+        // Every page of the feed, following `next`; null if a page fails
+        const feed = { jobs: [], closed: [], asOf: null };
+        while (url) {
+            const response = await fetch(url, {
+                headers: {
+                    'Authorization': `Token ${this.token}`
+                }
+            });
+            if (!response.ok) return null;
+            const page = await response.json();
+            feed.jobs.push(...(page.results || []));
+            if (feed.asOf === null) {
+                feed.asOf = page.as_of;
+                feed.closed = page.closed || [];
+            }
+            url = page.next;
+        }
+        return feed;
+    }
+
     renderAvailableJobs(jobs) {
         const availableJobsList = document.getElementById('available-jobs-list');
         if (!availableJobsList) return;
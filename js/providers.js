@@ -98,12 +98,11 @@ class ProvidersSearch {
 
     async loadFeaturedProviders() {
         try {
-            // Load featured services instead of providers
+            // Precomputed featured provider leaderboard
             const response = await fetch(`${this.apiBase}/services/featured/`);
             if (response.ok) {
-                const services = await response.json();
-                // Extract unique providers from featured services
-                const providers = this.extractProvidersFromServices(services);
+                const board = await response.json();
+                const providers = board.results;
                 this.renderProviders(providers);
                 this.updateResultsCount(providers.length);
             } else {